@@ -0,0 +1,381 @@
+import argparse
+import csv
+import hashlib
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+from Scenario import build_simulator
+
+try:
+    import resource
+except ImportError:  # Windows: sin memoria máxima del proceso
+    resource = None
+
+# Directorio de los resultados de referencia (golden.json) y de las corridas del benchmark
+BENCHMARK_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+GOLDEN_FILE = os.path.join(BENCHMARK_DIRECTORY, 'golden.json')
+RESULTS_FILE = os.path.join(BENCHMARK_DIRECTORY, 'results.csv')
+BASELINE_FILE = os.path.join(BENCHMARK_DIRECTORY, 'baseline.csv')
+
+# Escenario base de las curvas de escalamiento; cada eje varía un parámetro dejando el resto en la base
+BASE_CONFIG = {'simulator_time': 1800, 'seed': 0}
+SCALING_AXES = {
+    'number_of_trains': [3, 5, 8],
+    'number_of_wagons': [3, 5, 8],
+    'random_stations': [5, 10, 20],
+    'demand_multiplier': [0.5, 1, 2, 4],
+    'engine': ['tick', 'event'],
+}
+
+# Corridas de referencia con semilla fija, ejecutadas con la implementación base (motor por pasos,
+# movimiento pasajero a pasajero, pasajeros como objetos y reportes CSV); golden.json guarda sus resultados
+GOLDEN_CONFIG = {'simulator_time': 900, 'seed': 12345}
+GOLDEN_REFERENCES = {
+    'tick': {},
+    'tick_fifo': {'boarding_policy': 'fifo'},
+    'tick_random_stations': {'random_stations': 7, 'demand_multiplier': 2},
+    'tick_high_demand': {'simulator_time': 1800, 'demand_multiplier': 3},
+    'tick_fifo_2h': {'simulator_time': 7200, 'boarding_policy': 'fifo'},
+}
+
+# Opciones que cambian la implementación sin cambiar el modelo: cada caso es (referencia, opciones) y
+# sus resultados se comparan con los guardados para la corrida de referencia
+GOLDEN_CASES = {
+    'tick_vectorized': ('tick', {'vectorized_movement': True}),
+    'tick_compact_fifo': ('tick_fifo', {'compact_passengers': True}),
+    'tick_npz_reports': ('tick', {'report_formats': ('csv', 'npz')}),
+    'tick_random_stations_optimized': ('tick_random_stations', {'vectorized_movement': True, 'compact_passengers': True}),
+    'tick_vectorized_high_demand': ('tick_high_demand', {'vectorized_movement': True}),
+    'tick_optimized_high_demand': ('tick_high_demand', {'vectorized_movement': True, 'compact_passengers': True, 'report_formats': ('csv', 'npz')}),
+    'event': ('tick_fifo_2h', {'engine': 'event'}),
+}
+
+# Tolerancia relativa al comparar métricas reales con golden.json
+GOLDEN_TOLERANCE = 1e-9
+
+# Casos que solo coinciden en distribución con su referencia: métricas comparadas y su tolerancia
+# relativa (los reportes no se comparan). En el motor por eventos la cinemática de los trenes es exacta,
+# pero las llegadas de pasajeros se sortean por lotes (ver EventSimulator)
+GOLDEN_METRIC_TOLERANCES = {
+    'event': {'median_waiting_time': 0, 'headway': 0, 'simulated_hours': 0,
+              'arrived_passengers': 0.05, 'average_move_distance': 0.05, 'average_travel_time': 0.02},
+}
+
+# Comparaciones con la implementación de referencia: con demanda alta (trenes llenos) y varias
+# semillas, cada caso ejecuta el recorrido pasajero a pasajero y la opción optimizada, cuyos
+# resultados deben ser idénticos
+EQUIVALENCE_CONFIG = {'simulator_time': 1800, 'demand_multiplier': 3}
+EQUIVALENCE_SEEDS = (1, 2, 3)
+EQUIVALENCE_CASES = {
+    'vectorized_movement': {'vectorized_movement': True},
+}
+
+
+def scaling_scenarios(axes=None, base=None):
+    """
+    Retorna la lista de escenarios (nombre, configuración) de las curvas de escalamiento: uno por
+    cada valor de cada eje, con el resto de los parámetros en la configuración base.
+
+    Parámetros:
+        axes: Diccionario parámetro de Scenario.build_simulator -> valores (por defecto, SCALING_AXES).
+        base: Configuración base (por defecto, BASE_CONFIG).
+    """
+    axes = SCALING_AXES if axes is None else axes
+    base = BASE_CONFIG if base is None else base
+    return [(f"{name}={value}", dict(base, **{name: value})) for name, values in axes.items() for value in values]
+
+
+def peak_memory_mb():
+    """Memoria máxima (RSS) usada hasta ahora por el proceso, en MB, o None si no se puede medir."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux entrega kilobytes y macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_benchmark(task):
+    """
+    Ejecuta un escenario sin animación (en un proceso nuevo, para que la memoria máxima sea la del
+    escenario) y retorna su fila de resultados: ticks simulados, tiempo de la corrida más rápida,
+    ticks por segundo, pasajeros procesados (llegados y fallidos) por segundo y memoria máxima.
+
+    Parámetros:
+        task: Tupla (nombre, configuración de Scenario.build_simulator, repeticiones).
+    """
+    name, config, repeat = task
+    times = []
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(repeat):
+            simulator = build_simulator(**config)
+            start = time.perf_counter()
+            metrics = simulator.execute_simulation_logic(directory, verbose=False)
+            times.append(time.perf_counter() - start)
+    run_time = min(times)
+    passengers = metrics['arrived_passengers'] + metrics['failed_passengers']
+    return {
+        'scenario': name,
+        'ticks': simulator.simulator_time,
+        'stations': len(simulator.stations),
+        'run_time': run_time,
+        'ticks_per_second': simulator.simulator_time / run_time,
+        'passengers': passengers,
+        'passengers_per_second': passengers / run_time,
+        'peak_memory_mb': peak_memory_mb(),
+    }
+
+
+def run_in_fresh_processes(function, tasks):
+    """
+    Ejecuta function sobre cada tarea, de a una y cada una en un proceso nuevo: los tiempos no
+    compiten por núcleos, la memoria máxima no arrastra la de tareas anteriores y los contadores
+    globales (identificadores de vagones y pasajeros) parten de cero en cada tarea.
+    """
+    with get_context().Pool(processes=1, maxtasksperchild=1) as pool:
+        return list(pool.imap(function, tasks))
+
+
+def run_benchmarks(scenarios=None, repeat=1, verbose=True):
+    """
+    Ejecuta los escenarios (por defecto, scaling_scenarios()) y retorna sus filas de resultados.
+
+    Parámetros:
+        scenarios: Lista de (nombre, configuración).
+        repeat: Repeticiones de cada escenario; se reporta la más rápida.
+        verbose: Si es True, imprime cada fila al terminar.
+    """
+    scenarios = scaling_scenarios() if scenarios is None else scenarios
+    results = []
+    for row in run_in_fresh_processes(run_benchmark, [(name, config, repeat) for name, config in scenarios]):
+        if verbose:
+            memory = f"{row['peak_memory_mb']:.0f} MB" if row['peak_memory_mb'] is not None else "-"
+            print(f"{row['scenario']}: {row['ticks_per_second']:.0f} ticks/s, "
+                  f"{row['passengers_per_second']:.0f} pasajeros/s, memoria máxima {memory}")
+        results.append(row)
+    return results
+
+
+def write_results(results, filename=RESULTS_FILE):
+    """Escribe las filas de resultados en un CSV y retorna su ruta."""
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    with open(filename, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+    return filename
+
+
+def read_results(filename):
+    """Lee un CSV de resultados escrito por write_results."""
+    with open(filename, newline='') as csvfile:
+        return list(csv.DictReader(csvfile))
+
+
+def compare_results(results, baseline):
+    """
+    Compara los resultados con los de una corrida de referencia (mismos escenarios) y retorna, por
+    escenario presente en ambas, un diccionario con los ticks por segundo de cada una y la aceleración
+    (speedup > 1 significa más rápido que la referencia).
+    """
+    baseline_rows = {row['scenario']: row for row in baseline}
+    comparison = []
+    for row in results:
+        reference = baseline_rows.get(row['scenario'])
+        if reference is None:
+            continue
+        baseline_rate = float(reference['ticks_per_second'])
+        comparison.append({
+            'scenario': row['scenario'],
+            'baseline_ticks_per_second': baseline_rate,
+            'ticks_per_second': float(row['ticks_per_second']),
+            'speedup': float(row['ticks_per_second']) / baseline_rate if baseline_rate else math.nan,
+        })
+    return comparison
+
+
+# Golden Results
+def file_digest(filename):
+    """Retorna el SHA-256 del archivo."""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as report:
+        for block in iter(lambda: report.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def run_golden_case(task):
+    """
+    Ejecuta un caso con semilla fija y retorna (nombre, resultado), con las métricas de generate_report
+    y el SHA-256 de los CSV de pasajeros llegados y fallidos.
+
+    Parámetros:
+        task: Tupla (nombre, configuración de Scenario.build_simulator).
+    """
+    name, config = task
+    with tempfile.TemporaryDirectory() as directory:
+        simulator = build_simulator(**config)
+        metrics = simulator.execute_simulation_logic(directory, verbose=False)
+        reports = {report: file_digest(os.path.join(directory, f"{report}.csv"))
+                   for report in ('passenger_report', 'fail_passenger_report')}
+    # Pasar por JSON deja las métricas con los mismos tipos que al leer golden.json
+    return name, {'metrics': json.loads(json.dumps(metrics)), 'reports': reports}
+
+
+def golden_tasks(references=None):
+    """Retorna las tareas (nombre, configuración completa) de las corridas de referencia."""
+    references = GOLDEN_REFERENCES if references is None else references
+    return [(name, dict(GOLDEN_CONFIG, **options)) for name, options in references.items()]
+
+
+def write_golden(filename=GOLDEN_FILE, references=None):
+    """
+    Ejecuta las corridas de referencia y guarda sus configuraciones y resultados en filename.
+    Se debe regenerar solo cuando un cambio modifica el comportamiento a propósito.
+    """
+    tasks = golden_tasks(references)
+    results = dict(run_in_fresh_processes(run_golden_case, tasks))
+    golden = {
+        name: {'config': {key: list(value) if isinstance(value, tuple) else value for key, value in config.items()}, **results[name]}
+        for name, config in tasks
+    }
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    with open(filename, 'w', encoding='utf-8') as goldenfile:
+        json.dump(golden, goldenfile, ensure_ascii=False, indent=1, sort_keys=True)
+    return filename
+
+
+def compare_values(expected, actual, path=''):
+    """
+    Compara recursivamente dos resultados y retorna la lista de diferencias (ruta: esperado != obtenido).
+    Los números reales se comparan con tolerancia relativa GOLDEN_TOLERANCE; el resto, exactamente.
+    """
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        differences = []
+        for key in sorted(set(expected) | set(actual), key=str):
+            if key not in actual or key not in expected:
+                differences.append(f"{path}/{key}: {'falta' if key not in actual else 'sobra'}")
+            else:
+                differences.extend(compare_values(expected[key], actual[key], f"{path}/{key}"))
+        return differences
+    if isinstance(expected, float) or isinstance(actual, float):
+        if isinstance(expected, (int, float)) and isinstance(actual, (int, float)) and (
+                math.isclose(expected, actual, rel_tol=GOLDEN_TOLERANCE, abs_tol=GOLDEN_TOLERANCE)
+                or (math.isnan(expected) and math.isnan(actual))):
+            return []
+    elif expected == actual:
+        return []
+    return [f"{path}: {expected!r} != {actual!r}"]
+
+
+def compare_metrics(expected, actual, tolerances):
+    """
+    Compara las métricas indicadas con su tolerancia relativa (0: exactas) y retorna la lista de
+    diferencias (ruta: esperado != obtenido).
+    """
+    differences = []
+    for key, tolerance in tolerances.items():
+        if not math.isclose(expected[key], actual[key], rel_tol=max(tolerance, GOLDEN_TOLERANCE), abs_tol=GOLDEN_TOLERANCE):
+            differences.append(f"/metrics/{key}: {expected[key]!r} != {actual[key]!r} (tolerancia {tolerance:.0%})")
+    return differences
+
+
+def check_golden(filename=GOLDEN_FILE, cases=None, verbose=True):
+    """
+    Vuelve a ejecutar las corridas de referencia guardadas en filename (con sus configuraciones
+    guardadas) y los casos optimizados sobre esas configuraciones, y compara métricas y reportes con
+    los resultados de referencia: exactamente, o con GOLDEN_METRIC_TOLERANCES para los casos que solo
+    coinciden en distribución. Retorna un diccionario caso -> lista de diferencias (vacía si coincide).
+
+    Parámetros:
+        filename: Archivo golden.json escrito por write_golden.
+        cases: Diccionario nombre -> (referencia, opciones) (por defecto, GOLDEN_CASES).
+        verbose: Si es True, imprime el estado de cada caso.
+    """
+    cases = GOLDEN_CASES if cases is None else cases
+    with open(filename, encoding='utf-8') as goldenfile:
+        golden = json.load(goldenfile)
+    missing = sorted({reference for reference, _ in cases.values()} - set(golden))
+    if missing:
+        raise ValueError(f"{filename} no tiene las referencias {', '.join(missing)}; regenérelo con --update-golden")
+
+    tasks = [(name, golden[name]['config']) for name in golden]
+    tasks += [(name, dict(golden[reference]['config'], **options)) for name, (reference, options) in cases.items()]
+    references = {name: name for name in golden}
+    references.update({name: reference for name, (reference, _) in cases.items()})
+    differences = {}
+    for name, result in run_in_fresh_processes(run_golden_case, tasks):
+        reference = golden[references[name]]
+        if name in GOLDEN_METRIC_TOLERANCES:
+            differences[name] = compare_metrics(reference['metrics'], result['metrics'], GOLDEN_METRIC_TOLERANCES[name])
+        else:
+            differences[name] = compare_values({'metrics': reference['metrics'], 'reports': reference['reports']}, result)
+        if verbose:
+            status = "OK" if not differences[name] else f"{len(differences[name])} diferencias"
+            against = "" if references[name] == name else f" (referencia {references[name]})"
+            print(f"Golden {name}{against}: {status}")
+            for difference in differences[name][:10]:
+                print(f"  {difference}")
+    return differences
+
+
+def check_equivalence(cases=None, seeds=EQUIVALENCE_SEEDS, verbose=True):
+    """
+    Ejecuta cada caso de EQUIVALENCE_CASES y la configuración de referencia (sin sus opciones) con las
+    mismas semillas, y compara métricas y reportes. Retorna un diccionario caso -> lista de diferencias
+    (vacía si el caso coincide en todas las semillas).
+
+    Parámetros:
+        cases: Diccionario nombre -> opciones de Scenario.build_simulator (por defecto, EQUIVALENCE_CASES).
+        seeds: Semillas de las corridas.
+        verbose: Si es True, imprime el estado de cada caso.
+    """
+    cases = EQUIVALENCE_CASES if cases is None else cases
+    differences = {}
+    for name, case in cases.items():
+        tasks = [((seed, variant), dict(EQUIVALENCE_CONFIG, seed=seed, **options))
+                 for seed in seeds for variant, options in (('reference', {}), ('optimized', case))]
+        results = dict(run_in_fresh_processes(run_golden_case, tasks))
+        differences[name] = [f"semilla {seed}{difference}" for seed in seeds
+                             for difference in compare_values(results[(seed, 'reference')], results[(seed, 'optimized')])]
+        if verbose:
+            status = "OK" if not differences[name] else f"{len(differences[name])} diferencias"
+            print(f"Equivalencia {name}: {status}")
+            for difference in differences[name][:10]:
+                print(f"  {difference}")
+    return differences
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark de escalamiento y verificación de resultados golden.")
+    parser.add_argument('--update-golden', action='store_true', help="regenera benchmarks/golden.json con las corridas de referencia")
+    parser.add_argument('--golden-only', action='store_true', help="solo verifica los resultados golden y las equivalencias")
+    parser.add_argument('--save-baseline', action='store_true', help="guarda los resultados como referencia (benchmarks/baseline.csv)")
+    parser.add_argument('--repeat', type=int, default=1, help="repeticiones de cada escenario (se reporta la más rápida)")
+    parser.add_argument('--simulator-time', type=int, default=BASE_CONFIG['simulator_time'], help="segundos simulados por escenario")
+    args = parser.parse_args()
+
+    if args.update_golden:
+        print(f"Resultados golden guardados en {write_golden()}")
+        sys.exit(0)
+
+    failed = [name for name, differences in check_golden().items() if differences]
+    failed += [name for name, differences in check_equivalence().items() if differences]
+    if args.golden_only:
+        sys.exit(1 if failed else 0)
+
+    base = dict(BASE_CONFIG, simulator_time=args.simulator_time)
+    results = run_benchmarks(scaling_scenarios(base=base), repeat=args.repeat)
+    print(f"Resultados exportados a {write_results(results)}")
+    if args.save_baseline:
+        print(f"Referencia guardada en {write_results(results, BASELINE_FILE)}")
+    elif os.path.exists(BASELINE_FILE):
+        for row in compare_results(results, read_results(BASELINE_FILE)):
+            print(f"{row['scenario']}: {row['ticks_per_second']:.0f} ticks/s "
+                  f"(referencia {row['baseline_ticks_per_second']:.0f}, x{row['speedup']:.2f})")
+    if failed:
+        print(f"Casos golden o de equivalencia con diferencias: {', '.join(failed)}")
+        sys.exit(1)
@@ -0,0 +1,59 @@
+class RandomBoardingPolicy:
+    """Elige a los pasajeros que abordan de forma uniforme entre todos los del andén."""
+
+    def select(self, platform, count, target_station=None, rng=None):
+        """
+        Retira del andén y retorna los pasajeros que abordan.
+
+        Parámetros:
+            platform: Andén (Platform) de la estación.
+            count: Número de pasajeros que abordan (no mayor que len(platform)).
+            target_station: Estación que se asignará al vagón al acoplarse al siguiente tren.
+            rng: numpy.random.Generator usado para sortear (None usa el módulo random).
+        """
+        return [platform.pop_random(rng) for _ in range(count)]
+
+
+class FifoBoardingPolicy:
+    """Aborda primero a los pasajeros que llegaron antes al andén."""
+
+    def select(self, platform, count, target_station=None, rng=None):
+        """Retira del andén y retorna los count pasajeros más antiguos."""
+        return [platform.pop_oldest() for _ in range(count)]
+
+
+class DestinationFirstBoardingPolicy:
+    """
+    Aborda primero a los pasajeros cuyo destino es la estación que se asignará al vagón
+    (no necesitan cambiarse de vagón dentro del tren) y completa el cupo en orden de llegada.
+    """
+
+    def select(self, platform, count, target_station=None, rng=None):
+        """Retira del andén y retorna hasta count pasajeros, primero los del destino del vagón."""
+        passengers = []
+        while len(passengers) < count and platform.count_for(target_station):
+            passengers.append(platform.popleft(target_station))
+        while len(passengers) < count:
+            passengers.append(platform.pop_oldest())
+        return passengers
+
+
+BOARDING_POLICIES = {
+    'random': RandomBoardingPolicy,
+    'fifo': FifoBoardingPolicy,
+    'destination_first': DestinationFirstBoardingPolicy,
+}
+
+
+def get_boarding_policy(policy):
+    """
+    Retorna una instancia de política de abordaje a partir de su nombre ('random', 'fifo'
+    o 'destination_first'). Si se entrega un objeto con método select, se retorna tal cual.
+    """
+    if policy is None:
+        return RandomBoardingPolicy()
+    if isinstance(policy, str):
+        if policy not in BOARDING_POLICIES:
+            raise ValueError(f"Política de abordaje desconocida: {policy}. Opciones: {', '.join(BOARDING_POLICIES)}")
+        return BOARDING_POLICIES[policy]()
+    return policy
@@ -0,0 +1,412 @@
+import io
+import itertools
+import json
+import os
+from collections import Counter, deque
+import numpy as np
+from BoardingPolicy import BOARDING_POLICIES
+from Demand import DemandProfile
+from Passenger import Passenger
+from PassengerTable import PassengerTable
+from Platform import Platform
+from Station import Station
+from Wagon import Wagon
+
+# Identificador y versión del formato de los archivos de checkpoint
+CHECKPOINT_FORMAT = 'metro-continuo-checkpoint'
+CHECKPOINT_VERSION = 1
+
+# Parámetros que se pueden cambiar al restaurar un checkpoint (ramas "qué pasaría si")
+RESTORE_OVERRIDES = ('simulator_time', 'boarding_rate', 'boarding_policy', 'vectorized_movement',
+                     'record_trajectories', 'trajectory_directory', 'seed', 'report_formats', 'profile', 'profile_csv')
+
+# Códigos de dirección de los pasajeros
+DIRECTION_CODES = PassengerTable.DIRECTION_CODES
+DIRECTIONS = {code: direction for direction, code in DIRECTION_CODES.items()}
+
+
+def _pack(groups):
+    """
+    Aplana una lista de listas de enteros en un arreglo y los desplazamientos de cada grupo
+    (el grupo i ocupa values[offsets[i]:offsets[i + 1]]).
+    """
+    offsets = np.zeros(len(groups) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(group) for group in groups])
+    values = np.fromiter(itertools.chain.from_iterable(groups), dtype=np.int64, count=int(offsets[-1]))
+    return values, offsets
+
+
+def _unpack(values, offsets):
+    """Inverso de _pack: retorna la lista de listas de enteros."""
+    values = values.tolist()
+    offsets = offsets.tolist()
+    return [values[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def _positions(trajectories):
+    """Retorna las últimas posiciones (con NaN de relleno), su número y el total de posiciones de cada Trajectory."""
+    buffers = np.full((len(trajectories), 2), np.nan)
+    lengths = np.zeros(len(trajectories), dtype=np.int8)
+    counts = np.zeros(len(trajectories), dtype=np.int64)
+    for i, trajectory in enumerate(trajectories):
+        values = list(trajectory)
+        buffers[i, :len(values)] = values
+        lengths[i] = len(values)
+        counts[i] = len(trajectory)
+    return buffers, lengths, counts
+
+
+def _restore_positions(trajectory, buffer, length, count):
+    """Repone las últimas posiciones y el total de posiciones de una Trajectory."""
+    trajectory._buffer = deque(buffer[:length].tolist(), maxlen=trajectory._buffer.maxlen)
+    trajectory.count = int(count)
+
+
+def save_checkpoint(simulator, filename):
+    """
+    Guarda el estado del simulador (motor por pasos) en un único archivo .npz comprimido: los
+    parámetros, las estaciones y el estado de los generadores aleatorios en un bloque JSON, y los
+    vagones, trenes y pasajeros como arreglos columnares que se referencian entre sí por índice.
+    Así el grafo de objetos (con ciclos entre pasajeros, vagones, trenes y estaciones) se guarda
+    sin pickle. El archivo se escribe en un temporal y se renombra, de modo que un corte a mitad
+    de la escritura no deja un checkpoint corrupto. Retorna la ruta del archivo.
+
+    Con el movimiento vectorizado, los arreglos de MovementKernel se sincronizan y se descartan
+    antes de guardar, de modo que la corrida que sigue y la restaurada parten del mismo estado.
+
+    Parámetros:
+        simulator: Simulator a guardar (EventSimulator no está soportado).
+        filename: Ruta del archivo .npz.
+    """
+    from Simulator import Simulator
+    if type(simulator) is not Simulator:
+        raise ValueError(f"Los checkpoints solo están soportados para Simulator, no para {type(simulator).__name__}")
+
+    for train in simulator.trains:
+        train.invalidate_movement()
+
+    stations = simulator.stations
+    trains = simulator.trains
+    station_indices = {station: i for i, station in enumerate(stations)}
+    train_indices = {train: i for i, train in enumerate(trains)}
+    train_wagons = [wagon for train in trains for wagon in train.wagons]
+    station_wagons = [wagon for station in stations for wagon in station.wagons]
+    wagons = train_wagons + station_wagons
+    wagon_indices = {wagon: i for i, wagon in enumerate(wagons)}
+
+    # Pasajeros: cada objeto recibe una fila, y cada contenedor guarda la lista de filas de sus pasajeros
+    passengers = []
+    passenger_rows = {}
+
+    def rows(container):
+        result = []
+        for passenger in container:
+            row = passenger_rows.get(passenger)
+            if row is None:
+                row = passenger_rows[passenger] = len(passengers)
+                passengers.append(passenger)
+            result.append(row)
+        return result
+
+    wagon_passengers = [rows(wagon.passengers) for wagon in wagons]
+    train_passengers = [rows(train.passengers) for train in trains]
+    queue_keys = []
+    queue_passengers = []
+    for station in stations:
+        # Cada destino en el orden de su PassengerContainer, del que dependen los sorteos de abordaje
+        for destination, container in station.passengers.containers.items():
+            queue_keys.append((station_indices[station], station_indices[destination]))
+            queue_passengers.append(rows(container))
+    arrived_passengers = [rows(station.arrived_passengers) for station in stations]
+    fail_passengers = [rows(station.fail_passengers_arrived) for station in stations]
+
+    arrays = {}
+    wagon_positions = _positions([wagon.positions for wagon in wagons])
+    arrays['wagon_position_buffer'], arrays['wagon_position_length'], arrays['wagon_position_count'] = wagon_positions
+    arrays['wagon_number'] = np.array([wagon.wagon_number for wagon in wagons], dtype=np.int64)
+    arrays['wagon_state'] = np.array([wagon.state for wagon in wagons], dtype=np.int8)
+    arrays['wagon_speed'] = np.array([wagon.speed for wagon in wagons], dtype=float)
+    arrays['wagon_waiting_time'] = np.array([wagon.waiting_time for wagon in wagons], dtype=np.int64)
+    arrays['wagon_waiting_times'], arrays['wagon_waiting_offsets'] = _pack([wagon.waiting_time_list for wagon in wagons])
+    arrays['wagon_train_index'] = np.array([-1 if wagon.train_index is None else wagon.train_index for wagon in wagons], dtype=np.int64)
+    arrays['wagon_assigned_station'] = np.array([station_indices.get(wagon.assigned_station, -1) for wagon in wagons], dtype=np.int64)
+    arrays['wagon_is_initial'] = np.array([wagon.is_initial_wagon for wagon in wagons], dtype=bool)
+    arrays['wagon_free_cells'] = np.array([(wagon._front_free_cell, wagon._back_free_cell) for wagon in wagons], dtype=np.int64).reshape(-1, 2)
+    arrays['wagon_matrix'] = np.array([wagon.passenger_matrix for wagon in wagons], dtype=np.int32)
+    arrays['wagon_passengers'], arrays['wagon_passenger_offsets'] = _pack(wagon_passengers)
+
+    train_positions = _positions([train.positions for train in trains])
+    arrays['train_position_buffer'], arrays['train_position_length'], arrays['train_position_count'] = train_positions
+    arrays['train_wagons'], arrays['train_wagon_offsets'] = _pack([[wagon_indices[wagon] for wagon in train.wagons] for train in trains])
+    arrays['train_headway'] = np.array([train.headway for train in trains], dtype=float)
+    arrays['train_cycles'] = np.array([train.cycles for train in trains], dtype=np.int64)
+    arrays['train_acquired_wagons'] = np.array([train.acquired_wagons for train in trains], dtype=np.int64)
+    arrays['train_active'] = np.array([train.active for train in trains], dtype=bool)
+    arrays['train_passengers'], arrays['train_passenger_offsets'] = _pack(train_passengers)
+    arrays['train_coupling_stations'], arrays['train_coupling_offsets'] = _pack(
+        [[station_indices[station] for station in simulator.train_coupling_stations.get(train, ())] for train in trains]
+    )
+
+    arrays['station_wagons'], arrays['station_wagon_offsets'] = _pack([[wagon_indices[wagon] for wagon in station.wagons] for station in stations])
+    arrays['queue_keys'] = np.array(queue_keys, dtype=np.int64).reshape(-1, 2)
+    arrays['queue_passengers'], arrays['queue_offsets'] = _pack(queue_passengers)
+    arrays['arrived_passengers'], arrays['arrived_offsets'] = _pack(arrived_passengers)
+    arrays['fail_passengers'], arrays['fail_offsets'] = _pack(fail_passengers)
+
+    cells = [passenger.wagon_position if isinstance(passenger.wagon_position, tuple) else (-1, -1) for passenger in passengers]
+    arrays['passenger_id'] = np.array([passenger.passenger_id for passenger in passengers], dtype=np.int64)
+    arrays['passenger_start_station'] = np.array([station_indices[passenger.start_station] for passenger in passengers], dtype=np.int64)
+    arrays['passenger_end_station'] = np.array([station_indices[passenger.end_station] for passenger in passengers], dtype=np.int64)
+    arrays['passenger_travel_time'] = np.array([passenger.travel_time for passenger in passengers], dtype=np.int64)
+    arrays['passenger_ticks'] = np.array([
+        (passenger.start_tick,
+         -1 if passenger.boarding_tick is None else passenger.boarding_tick,
+         -1 if passenger.alighting_tick is None else passenger.alighting_tick)
+        for passenger in passengers
+    ], dtype=np.int64).reshape(-1, 3)
+    arrays['passenger_train'] = np.array([train_indices.get(passenger.current_train, -1) for passenger in passengers], dtype=np.int64)
+    arrays['passenger_wagon'] = np.array([wagon_indices.get(passenger.current_wagon, -1) for passenger in passengers], dtype=np.int64)
+    arrays['passenger_cell'] = np.array(cells, dtype=np.int64).reshape(-1, 2)
+    arrays['passenger_flags'] = np.array([
+        (passenger.boarded_recently, DIRECTION_CODES[passenger.direction], passenger.assigned_direction,
+         isinstance(passenger.move_count, float))
+        for passenger in passengers
+    ], dtype=np.int8).reshape(-1, 4)
+    # Los metros desplazados son enteros hasta el primer abordaje; la última bandera conserva el tipo para los reportes
+    arrays['passenger_move_count'] = np.array([passenger.move_count for passenger in passengers], dtype=float)
+
+    if simulator.passenger_table is not None:
+        for name, column in simulator.passenger_table.columns.items():
+            arrays[f'table_{name}'] = column
+
+    policy_name = next((name for name, policy in BOARDING_POLICIES.items() if type(simulator.boarding_policy) is policy), None)
+    random_streams = simulator.random_streams
+    meta = {
+        'format': CHECKPOINT_FORMAT,
+        'version': CHECKPOINT_VERSION,
+        'simulator': type(simulator).__name__,
+        'next_frame': simulator.next_frame,
+        'current_tick': simulator.current_tick,
+        'parameters': {
+            'speed': simulator.speed,
+            'number_of_trains': len(trains),
+            # Cada estación crea un vagón inicial; el resto de la flota se reparte entre los trenes
+            'number_of_wagons': (len(wagons) - len(stations)) // len(trains),
+            'wagon_length_m': simulator.wagon_length_m,
+            'wagon_width_m': simulator.wagon_width_m,
+            'simulator_time': simulator.simulator_time,
+            'acceleration': simulator.acceleration,
+            'deceleration': simulator.deceleration,
+            'position_limit': simulator.position_limit,
+            'interval': simulator.interval,
+            'passenger_per_meter': trains[0].passenger_per_meter,
+            'passenger_creation_time': simulator.passenger_creation_time,
+            'compact_passengers': simulator.passenger_table is not None,
+            'boarding_rate': simulator.boarding_rate,
+            'boarding_policy': policy_name,
+            'vectorized_movement': simulator.movement_kernel is not None,
+            'report_formats': list(simulator.report_formats),
+            'demand': simulator.demand.to_dict() if simulator.demand is not None else None,
+        },
+        'stations': [
+            {'name': station.name, 'position': station.position, 'station_capacity': station.station_capacity,
+             'passenger_flows': list(station.passenger_flows)}
+            for station in stations
+        ],
+        'random_streams': {
+            'entropy': random_streams.root.entropy,
+            'spawn_key': list(random_streams.root.spawn_key),
+            'generators': [[list(purpose), generator.bit_generator.state] for purpose, generator in random_streams.generators.items()],
+        },
+        'train_ids': [train.train_id for train in trains],
+        'wagon_counter': Wagon.wagon_counter,
+        'passenger_counter': next(Passenger._id_counter),
+        'passenger_table_size': simulator.passenger_table.size if simulator.passenger_table is not None else None,
+    }
+    # next() consume un identificador: el contador se repone para no alterar la corrida
+    Passenger._id_counter = itertools.count(meta['passenger_counter'])
+    arrays['meta'] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    temporary = f"{filename}.tmp"
+    with open(temporary, 'wb') as file:
+        file.write(buffer.getbuffer())
+    os.replace(temporary, filename)
+    return filename
+
+
+def read_checkpoint_meta(filename):
+    """Retorna el bloque de metadatos (diccionario) de un checkpoint, validando su formato y versión."""
+    with np.load(filename) as data:
+        return _read_meta(data, filename)
+
+
+def _read_meta(data, filename):
+    """Decodifica y valida los metadatos de un archivo .npz abierto."""
+    if 'meta' not in data.files:
+        raise ValueError(f"{filename} no es un checkpoint de la simulación")
+    meta = json.loads(data['meta'].tobytes().decode())
+    if meta.get('format') != CHECKPOINT_FORMAT:
+        raise ValueError(f"{filename} no es un checkpoint de la simulación")
+    if meta.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Versión de checkpoint no soportada: {meta.get('version')} (se esperaba {CHECKPOINT_VERSION})")
+    return meta
+
+
+def load_checkpoint(filename, **overrides):
+    """
+    Crea un simulador nuevo con el estado guardado en un checkpoint, listo para continuar con
+    execute_simulation_logic (o update) desde el tick siguiente al guardado. Cada llamada crea un
+    simulador independiente, por lo que varias ramas pueden partir del mismo checkpoint.
+
+    Parámetros:
+        filename: Ruta del archivo .npz escrito por save_checkpoint.
+        overrides: Parámetros que cambian en la rama restaurada (ver RESTORE_OVERRIDES): simulator_time,
+            boarding_rate, boarding_policy, vectorized_movement, record_trajectories, trajectory_directory,
+            seed, report_formats, profile y profile_csv. Con seed, los generadores aleatorios parten de la nueva semilla en lugar del estado guardado.
+    """
+    from Simulator import Simulator
+    unknown = set(overrides) - set(RESTORE_OVERRIDES)
+    if unknown:
+        raise ValueError(f"Parámetros no modificables al restaurar: {', '.join(sorted(unknown))}. Opciones: {', '.join(RESTORE_OVERRIDES)}")
+
+    with np.load(filename) as data:
+        meta = _read_meta(data, filename)
+        arrays = {name: data[name] for name in data.files if name != 'meta'}
+
+    parameters = dict(meta['parameters'])
+    if parameters['boarding_policy'] is None and 'boarding_policy' not in overrides:
+        raise ValueError("El checkpoint usa una política de abordaje propia; entréguela con boarding_policy")
+    random_state = meta['random_streams']
+    reseed = 'seed' in overrides
+    if not reseed:
+        overrides['seed'] = np.random.SeedSequence(random_state['entropy'], spawn_key=random_state['spawn_key'])
+    parameters.update(overrides)
+    if parameters.get('demand') is not None:
+        parameters['demand'] = DemandProfile.from_dict(parameters['demand'])
+
+    stations = [
+        Station(definition['name'], definition['position'], parameters['wagon_length_m'], parameters['wagon_width_m'],
+                definition['station_capacity'], definition['passenger_flows'], parameters['passenger_per_meter'])
+        for definition in meta['stations']
+    ]
+    simulator = Simulator(
+        parameters.pop('speed'), parameters.pop('number_of_trains'), parameters.pop('number_of_wagons'),
+        parameters.pop('wagon_length_m'), parameters.pop('wagon_width_m'), parameters.pop('simulator_time'),
+        stations, parameters.pop('acceleration'), parameters.pop('deceleration'), parameters.pop('position_limit'),
+        parameters.pop('interval'), parameters.pop('passenger_per_meter'), parameters.pop('passenger_creation_time'),
+        **parameters
+    )
+    trains = simulator.trains
+
+    # Los vagones creados por el constructor reciben el estado de los vagones guardados
+    wagons = [wagon for train in trains for wagon in train.wagons] + [wagon for station in stations for wagon in station.wagons]
+    if len(wagons) != len(arrays['wagon_number']):
+        raise ValueError("El checkpoint no coincide con la flota que crea el simulador")
+    for train in trains:
+        train.wagons = []
+    for station in stations:
+        station.wagons = []
+
+    waiting_times = _unpack(arrays['wagon_waiting_times'], arrays['wagon_waiting_offsets'])
+    matrices = arrays['wagon_matrix'].tolist()
+    for i, wagon in enumerate(wagons):
+        wagon.wagon_number = int(arrays['wagon_number'][i])
+        wagon.wagon_id = f"Wagon{wagon.wagon_number}"
+        wagon.state = int(arrays['wagon_state'][i])
+        wagon.speed = float(arrays['wagon_speed'][i])
+        wagon.waiting_time = int(arrays['wagon_waiting_time'][i])
+        wagon.waiting_time_list = waiting_times[i]
+        train_index = int(arrays['wagon_train_index'][i])
+        wagon.train_index = None if train_index < 0 else train_index
+        wagon.train_slot = None
+        wagon.current_station = None
+        wagon.station_slot = None
+        station_index = int(arrays['wagon_assigned_station'][i])
+        wagon._color_counts = None
+        wagon.assigned_station = None if station_index < 0 else stations[station_index]
+        wagon.is_initial_wagon = bool(arrays['wagon_is_initial'][i])
+        wagon._front_free_cell, wagon._back_free_cell = (int(value) for value in arrays['wagon_free_cells'][i])
+        wagon.passenger_matrix = matrices[i]
+        _restore_positions(wagon.positions, arrays['wagon_position_buffer'][i], arrays['wagon_position_length'][i], arrays['wagon_position_count'][i])
+
+    for i, (train, wagon_rows) in enumerate(zip(trains, _unpack(arrays['train_wagons'], arrays['train_wagon_offsets']))):
+        train.wagons = [wagons[row] for row in wagon_rows]
+        train.headway = float(arrays['train_headway'][i])
+        train.cycles = int(arrays['train_cycles'][i])
+        train.acquired_wagons = int(arrays['train_acquired_wagons'][i])
+        train.active = bool(arrays['train_active'][i])
+        train.train_id = meta['train_ids'][i]
+        _restore_positions(train.positions, arrays['train_position_buffer'][i], arrays['train_position_length'][i], arrays['train_position_count'][i])
+        train.rebuild_station_index()
+    for station, wagon_rows in zip(stations, _unpack(arrays['station_wagons'], arrays['station_wagon_offsets'])):
+        for row in wagon_rows:
+            station.add_wagon(wagons[row])
+
+    # Pasajeros
+    passengers = []
+    ticks = arrays['passenger_ticks'].tolist()
+    cells = arrays['passenger_cell'].tolist()
+    flags = arrays['passenger_flags'].tolist()
+    columns = zip(
+        arrays['passenger_id'].tolist(), arrays['passenger_start_station'].tolist(), arrays['passenger_end_station'].tolist(),
+        arrays['passenger_travel_time'].tolist(), ticks, arrays['passenger_train'].tolist(), arrays['passenger_wagon'].tolist(),
+        cells, flags, arrays['passenger_move_count'].tolist()
+    )
+    for passenger_id, start, end, travel_time, tick, train, wagon, cell, flag, move_count in columns:
+        passenger = Passenger.__new__(Passenger)
+        passenger.passenger_id = passenger_id
+        passenger.start_station = stations[start]
+        passenger.end_station = stations[end]
+        passenger.travel_time = travel_time
+        passenger.start_tick = tick[0]
+        passenger.boarding_tick = None if tick[1] < 0 else tick[1]
+        passenger.alighting_tick = None if tick[2] < 0 else tick[2]
+        passenger.current_train = None if train < 0 else trains[train]
+        passenger.current_wagon = None if wagon < 0 else wagons[wagon]
+        passenger.wagon_position = (cell[0], cell[1]) if cell[0] >= 0 else 0
+        passenger.boarded_recently = bool(flag[0])
+        passenger.direction = DIRECTIONS[flag[1]]
+        passenger.assigned_direction = bool(flag[2])
+        passenger.move_count = move_count if flag[3] else int(move_count)
+        passengers.append(passenger)
+
+    for wagon, rows in zip(wagons, _unpack(arrays['wagon_passengers'], arrays['wagon_passenger_offsets'])):
+        wagon.passengers.replace(passengers[row] for row in rows)
+    for train, rows in zip(trains, _unpack(arrays['train_passengers'], arrays['train_passenger_offsets'])):
+        train.passengers.replace(passengers[row] for row in rows)
+    for station in stations:
+        station.passengers = Platform()
+    for (station_index, destination_index), rows in zip(arrays['queue_keys'].tolist(), _unpack(arrays['queue_passengers'], arrays['queue_offsets'])):
+        stations[station_index].passengers.load(stations[destination_index], [passengers[row] for row in rows])
+    for station, rows in zip(stations, _unpack(arrays['arrived_passengers'], arrays['arrived_offsets'])):
+        station.arrived_passengers = [passengers[row] for row in rows]
+    for station, rows in zip(stations, _unpack(arrays['fail_passengers'], arrays['fail_offsets'])):
+        station.fail_passengers_arrived = [passengers[row] for row in rows]
+
+    if simulator.passenger_table is not None:
+        simulator.passenger_table.columns = {name: arrays[f'table_{name}'].copy() for name in PassengerTable.COLUMNS}
+        simulator.passenger_table.size = meta['passenger_table_size']
+
+    # Estado de la simulación
+    coupling_stations = _unpack(arrays['train_coupling_stations'], arrays['train_coupling_offsets'])
+    simulator.train_coupling_stations = {train: [stations[i] for i in indices] for train, indices in zip(trains, coupling_stations)}
+    simulator.coupling_crossings = Counter(station for indices in simulator.train_coupling_stations.values() for station in indices)
+    simulator.current_tick = meta['current_tick']
+    simulator.next_frame = meta['next_frame']
+    if simulator.arrival_schedule is not None:
+        # La programación se vuelve a compilar con la misma semilla; los cursores siguen desde el tick guardado
+        simulator.arrival_schedule.seek(simulator.next_frame)
+    if simulator.trajectory_recorder is not None:
+        simulator.trajectory_recorder.tick = simulator.current_tick
+    if not reseed:
+        for purpose, state in random_state['generators']:
+            simulator.random_streams.get(*purpose).bit_generator.state = state
+    # Los contadores globales siguen desde los valores guardados, igual que en la corrida original
+    Wagon.wagon_counter = meta['wagon_counter']
+    Passenger._id_counter = itertools.count(meta['passenger_counter'])
+    return simulator
@@ -0,0 +1,33 @@
+from bisect import bisect_left, bisect_right
+
+
+class CrossingIndex:
+    """
+    Índice ordenado de puntos de estación (desacople, inicio de acople, ...). Permite obtener
+    con una búsqueda binaria las estaciones cuyo punto quedó dentro del intervalo recorrido
+    por un tren en un paso, sin recorrer todas las estaciones.
+    """
+
+    def __init__(self, points):
+        """
+        Parámetros:
+            points: Iterable de pares (posición, estación). Los pares con posición None se omiten.
+        """
+        entries = sorted(
+            ((position, order, station) for order, (position, station) in enumerate(points) if position is not None),
+            key=lambda entry: (entry[0], entry[1])
+        )
+        self.positions = [position for position, _, _ in entries]
+        self.stations = [station for _, _, station in entries]
+
+    def crossed(self, previous_position, current_position, include_start=False):
+        """
+        Retorna las estaciones cuyo punto está en el intervalo (previous_position, current_position],
+        o en [previous_position, current_position] si include_start es True.
+        """
+        if include_start:
+            start = bisect_left(self.positions, previous_position)
+        else:
+            start = bisect_right(self.positions, previous_position)
+        end = bisect_right(self.positions, current_position)
+        return self.stations[start:end]
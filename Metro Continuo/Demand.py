@@ -0,0 +1,161 @@
+import numpy as np
+
+
+class DemandProfile:
+    """
+    Demanda de pasajeros variable en el tiempo: una secuencia de matrices origen-destino, una por
+    intervalo de bin_seconds segundos (por ejemplo, 96 matrices de 15 minutos para un día completo
+    con sus horas punta). Cada matriz tiene el mismo formato que passenger_flows (filas: estación de
+    origen, columnas: estación de destino, en pasajeros por hora). El tiempo del perfil parte con la
+    creación de pasajeros del simulador; después del último intervalo se mantiene su demanda.
+    """
+
+    def __init__(self, matrices, bin_seconds=900):
+        """
+        Parámetros:
+            matrices: Secuencia de matrices origen-destino (intervalo x origen x destino), en pasajeros por hora.
+            bin_seconds: Duración de cada intervalo en segundos.
+        """
+        matrices = np.asarray(matrices, dtype=float)
+        if matrices.ndim != 3 or matrices.shape[1] != matrices.shape[2] or len(matrices) == 0:
+            raise ValueError(f"Se esperaba una secuencia no vacía de matrices cuadradas; se recibió la forma {matrices.shape}")
+        if (matrices < 0).any():
+            raise ValueError("Los flujos de pasajeros no pueden ser negativos")
+        self.matrices = matrices
+        self.bin_seconds = int(bin_seconds)
+
+    @classmethod
+    def constant(cls, passenger_flows):
+        """Perfil de un solo intervalo con la matriz horaria dada (la demanda constante de las estaciones)."""
+        return cls([passenger_flows], 3600)
+
+    @classmethod
+    def from_factors(cls, passenger_flows, factors, bin_seconds=900):
+        """
+        Perfil que multiplica una matriz horaria base por un factor en cada intervalo, por ejemplo
+        factores mayores que 1 en las horas punta y menores en el valle.
+        """
+        passenger_flows = np.asarray(passenger_flows, dtype=float)
+        return cls(np.asarray(factors, dtype=float)[:, None, None] * passenger_flows, bin_seconds)
+
+    @property
+    def number_of_stations(self):
+        return self.matrices.shape[1]
+
+    def scaled(self, demand_multiplier):
+        """Retorna el perfil con todos los flujos multiplicados por demand_multiplier."""
+        return DemandProfile(self.matrices * demand_multiplier, self.bin_seconds)
+
+    def to_dict(self):
+        """Representación serializable en JSON (ver from_dict)."""
+        return {'matrices': self.matrices.tolist(), 'bin_seconds': self.bin_seconds}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['matrices'], data['bin_seconds'])
+
+    def compile(self, start_tick, end_tick, arrivals_rng, destinations_rng):
+        """
+        Sortea de una vez todas las llegadas de los ticks [start_tick, end_tick) y retorna su
+        ArrivalSchedule. En cada intervalo, los conteos por tick y estación son Poisson con la tasa
+        del intervalo (flujo total de la fila / 3600) y los destinos se sortean con una sola búsqueda
+        binaria sobre las distribuciones acumuladas de todas las filas, apiladas como en
+        Simulator.initialize_passenger_creation.
+
+        Parámetros:
+            start_tick: Primer tick con llegadas (el tick 0 del perfil).
+            end_tick: Tick siguiente al último.
+            arrivals_rng: Generador de los conteos.
+            destinations_rng: Generador de los destinos.
+        """
+        num_stations = self.number_of_stations
+        rates = self.matrices.sum(axis=2) / 3600
+        totals = self.matrices.sum(axis=2, keepdims=True)
+        cdf = np.cumsum(np.divide(self.matrices, totals, out=np.zeros_like(self.matrices), where=totals > 0), axis=2)
+        cdf[:, :, -1] = np.where(totals[:, :, 0] > 0, 1.0, 0.0)
+
+        length = max(end_tick - start_tick, 0)
+        counts = np.zeros((length, num_stations), dtype=np.int32)
+        destinations = []
+        for first in range(0, length, self.bin_seconds):
+            last = min(first + self.bin_seconds, length)
+            time_bin = min(first // self.bin_seconds, len(self.matrices) - 1)
+            bin_counts = arrivals_rng.poisson(rates[time_bin], size=(last - first, num_stations))
+            counts[first:last] = bin_counts
+            # Orígenes de las llegadas del intervalo, ordenadas por tick y luego por estación
+            origins = np.repeat(np.tile(np.arange(num_stations), last - first), bin_counts.ravel())
+            stacked_cdf = (cdf[time_bin] + np.arange(num_stations)[:, None]).ravel()
+            stacked_indices = np.searchsorted(stacked_cdf, origins + destinations_rng.random(len(origins)), side='right')
+            destinations.append(np.minimum(stacked_indices - origins * num_stations, num_stations - 1))
+
+        destinations = np.concatenate(destinations) if destinations else np.zeros(0, dtype=np.int64)
+        origins = np.repeat(np.tile(np.arange(num_stations), length), counts.ravel())
+        # Ordenar por estación conservando el orden por tick dentro de cada estación
+        order = np.argsort(origins, kind='stable')
+        splits = np.cumsum(counts.sum(axis=0))[:-1]
+        return ArrivalSchedule(counts, np.split(destinations[order], splits), start_tick)
+
+
+class ArrivalSchedule:
+    """
+    Llegadas de pasajeros precompiladas (ver DemandProfile.compile): los conteos por tick y estación
+    y, por estación, los destinos de sus llegadas en orden de tick. Durante la simulación se recorren
+    con un cursor por estación, por lo que crear los pasajeros de un tick no sortea nada.
+    """
+
+    def __init__(self, counts, destinations, start_tick):
+        """
+        Parámetros:
+            counts: Arreglo (tick x estación) con el número de llegadas de cada tick desde start_tick.
+            destinations: Por estación, arreglo con los índices de destino de sus llegadas en orden de tick.
+            start_tick: Tick de la primera fila de counts.
+        """
+        self.counts = counts
+        self.destinations = destinations
+        self.start_tick = start_tick
+        self.cursors = [0] * counts.shape[1]
+
+    def __len__(self):
+        """Número total de llegadas de la programación."""
+        return int(self.counts.sum())
+
+    def seek(self, tick):
+        """Deja los cursores en la primera llegada del tick dado (por ejemplo, al restaurar un checkpoint)."""
+        row = min(max(tick - self.start_tick, 0), len(self.counts))
+        self.cursors = self.counts[:row].sum(axis=0).tolist()
+
+    def arrivals(self, tick):
+        """
+        Retorna la lista de (índice de estación, destinos) de las llegadas del tick y avanza los
+        cursores. Se debe llamar una vez por tick, en orden.
+        """
+        row = tick - self.start_tick
+        if row < 0 or row >= len(self.counts):
+            return []
+        counts = self.counts[row]
+        arrivals = []
+        for station_index in np.flatnonzero(counts).tolist():
+            start = self.cursors[station_index]
+            end = start + int(counts[station_index])
+            arrivals.append((station_index, self.destinations[station_index][start:end]))
+            self.cursors[station_index] = end
+        return arrivals
+
+    def arrivals_between(self, start_tick, end_tick):
+        """
+        Retorna la lista de (índice de estación, ticks de llegada, destinos) de las llegadas de los
+        ticks [start_tick, end_tick), en orden de tick, y avanza los cursores. Los lotes se deben
+        pedir en orden y sin superponerse.
+        """
+        first = min(max(start_tick - self.start_tick, 0), len(self.counts))
+        last = min(max(end_tick - self.start_tick, 0), len(self.counts))
+        counts = self.counts[first:last]
+        arrivals = []
+        for station_index in np.flatnonzero(counts.sum(axis=0)).tolist():
+            station_counts = counts[:, station_index]
+            ticks = np.repeat(np.arange(first, last) + self.start_tick, station_counts)
+            start = self.cursors[station_index]
+            end = start + len(ticks)
+            arrivals.append((station_index, ticks, self.destinations[station_index][start:end]))
+            self.cursors[station_index] = end
+        return arrivals
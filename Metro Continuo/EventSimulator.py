@@ -0,0 +1,544 @@
+import heapq
+import itertools
+import math
+from bisect import bisect_right
+from collections import deque
+import numpy as np
+from BoardingPolicy import FifoBoardingPolicy, get_boarding_policy
+from Passenger import Passenger
+from Simulator import Simulator
+
+
+class EventSimulator(Simulator):
+    """
+    Motor de simulación por eventos discretos, alternativo al motor de pasos fijos de un segundo
+    (Simulator.update). En lugar de recorrer todos los trenes, vagones y pasajeros en cada tick,
+    mantiene una cola de prioridad con los eventos de desacople, detención y descenso/abordaje,
+    acople, transferencia al tren y lotes de llegada de pasajeros, y salta de un evento al siguiente:
+
+      - Las posiciones de los trenes se calculan en forma cerrada con la misma aritmética que
+        set_train_coordinates, y los cruces con los puntos de desacople e inicio de acople se
+        obtienen con CrossingIndex, de modo que cada tren solo tiene programado su próximo cruce.
+      - Las fases de desaceleración y aceleración tienen un número fijo de pasos, por lo que la
+        detención y la transferencia se programan directamente.
+      - Los pasajeros registran sus ticks de llegada y abordaje, y el tiempo de viaje se deriva al bajar.
+      - Los pasajeros llegan en lotes de arrival_batch_time segundos con su tick de llegada sorteado.
+        Cada lote queda pendiente, y sus pasajeros se crean y suben al andén (con el control de capacidad
+        de la estación) al alcanzar su tick de llegada, antes de cada abordaje y al final de run. El
+        abordaje respeta la tasa de boarding_rate pasajeros por tick, en orden de llegada: el único
+        boarding_policy admitido es 'fifo' (el valor por defecto en este motor).
+      - El movimiento de pasajeros dentro de los trenes se calcula siempre con un MovementKernel compartido
+        por todos los trenes (con el mismo resultado que el recorrido pasajero a pasajero), en un solo lote
+        por intervalo: justo antes de cada cambio de composición de un tren (y al final de la simulación)
+        se avanzan todos los trenes hasta ese tick con MovementKernel.advance.
+
+    Tolerancia respecto del motor por pasos con boarding_policy='fifo': los tiempos de espera de los
+    vagones (y su mediana) coinciden exactamente, porque dependen solo de la cinemática de los trenes
+    (incluida la omisión de vagones que reproduce skipped_wagons). El número de pasajeros llegados, los
+    metros desplazados y los tiempos de viaje coinciden en distribución pero no pasajero a pasajero,
+    porque las llegadas se sortean por lotes (otra secuencia aleatoria). El andén no incluye llegadas
+    futuras: como en create_passengers, el control de capacidad del tick de llegada cuenta a los pasajeros
+    que llegaron antes y no han abordado, aplicando antes los abordajes hasta ese tick si el andén está
+    lleno. Con los parámetros de main.py y dos horas simuladas, el total de pasajeros llegados y los
+    metros promedio difieren en menos de 5% y el tiempo de viaje promedio en menos de 2% (Benchmark.py
+    lo verifica con GOLDEN_METRIC_TOLERANCES).
+    """
+
+    # Orden de las fases dentro de un mismo tick, igual al del motor por pasos
+    PHASE_WAIT_START = 0
+    PHASE_COUPLE = 1
+    PHASE_TRANSFER = 2
+    PHASE_ARRIVALS = 3
+    PHASE_DECOUPLE = 4
+
+    # Fases que mide el profiler: cada tipo de evento, y el movimiento de pasajeros de advance_movement,
+    # que se descuenta del evento que lo provoca
+    PROFILE_PHASES = ('decouple', 'wait_start', 'couple', 'transfer', 'arrivals', 'passenger_movement')
+
+    def __init__(self, *args, arrival_batch_time=60, boarding_policy='fifo', **kwargs):
+        """
+        Inicializa la simulación con los mismos parámetros que Simulator. vectorized_movement se ignora:
+        el movimiento de pasajeros siempre se calcula con MovementKernel.
+
+        Parámetros adicionales:
+            arrival_batch_time: Duración (en segundos) de cada lote de llegadas de pasajeros.
+            boarding_policy: Debe ser 'fifo' (o una FifoBoardingPolicy): el abordaje por tick de llegada
+                es el único que este motor reproduce, por lo que otra política lanza ValueError.
+        """
+        if not isinstance(get_boarding_policy(boarding_policy), FifoBoardingPolicy):
+            raise ValueError(f"EventSimulator solo admite boarding_policy='fifo' (aborda en orden de llegada); se recibió {boarding_policy!r}")
+        kwargs['vectorized_movement'] = True
+        super().__init__(*args, boarding_policy=boarding_policy, **kwargs)
+        self.arrival_batch_time = arrival_batch_time
+        self.current_tick = 0
+        self.events = []
+        self.event_counter = itertools.count()
+        self.train_versions = {train: 0 for train in self.trains}
+        # Último tick hasta el que se calculó el movimiento de pasajeros (de todos los trenes)
+        self.movement_tick = -1
+        # Llegadas sorteadas que aún no alcanzan su tick, como (tick de llegada, estación de destino), y
+        # pasajeros en el andén, como (tick de llegada, pasajero), en orden de llegada
+        self.pending_arrivals = {station: deque() for station in self.stations}
+        self.platform_queues = {station: deque() for station in self.stations}
+        self.stop_ticks = {}
+        self.wait_start_ticks = {}
+        self.transfer_ticks = {}
+        self.waiting_adjustments = {}
+        self.skipped_tick = None
+        self.skipped_by_station = {}
+        self.boarding_cursors = {}
+        # Pasos de desaceleración o aceleración ya aplicados a los vagones en estación (ver place_station_wagons),
+        # y posición final de la aceleración de los vagones transferidos, con el tick de la transferencia
+        self.motion_steps = {}
+        self.transferred_positions = {}
+        self.deceleration_steps = self.count_speed_steps(self.speed, self.deceleration)
+        self.acceleration_steps = self.count_speed_steps(self.speed, self.acceleration)
+        # Tipo del evento en curso, al que el profiler atribuye el tiempo previo a advance_train
+        self.profiled_event = None
+
+        for station in self.stations:
+            for wagon in station.wagons:
+                if wagon.state == 2:
+                    self.stop_ticks[wagon] = -1
+                    self.boarding_cursors[wagon] = [0, 0]
+
+        for train in self.trains:
+            self.schedule_train_events(train, -1)
+        self.schedule(math.ceil(self.passenger_creation_time), self.PHASE_ARRIVALS, 'arrivals', None)
+
+    # Event Queue
+    def schedule(self, tick, phase, kind, payload):
+        """Agrega un evento a la cola si ocurre dentro del tiempo de simulación."""
+        if tick is not None and tick < self.simulator_time:
+            heapq.heappush(self.events, (tick, phase, next(self.event_counter), kind, payload))
+
+    def schedule_train_events(self, train, tick):
+        """
+        Programa los próximos cruces del tren (desacople de su último vagón e inicio de acople)
+        posteriores al tick dado. Los eventos programados antes para el tren quedan invalidados.
+        """
+        self.train_versions[train] += 1
+        version = self.train_versions[train]
+        self.schedule(self.next_decoupling_tick(train, tick), self.PHASE_DECOUPLE, 'decouple', (train, version))
+        self.schedule(self.next_coupling_tick(train, tick), self.PHASE_COUPLE, 'couple', (train, version))
+
+    # Closed-form Kinematics
+    @staticmethod
+    def count_speed_steps(speed, rate):
+        """Número de pasos de un segundo para pasar de 0 a speed (o de speed a 0) con la tasa dada."""
+        steps = 0
+        current_speed = speed
+        while current_speed > 0:
+            current_speed = max(0, current_speed - rate)
+            steps += 1
+        return steps
+
+    def train_position_at(self, train, tick):
+        """Posición del tren en el tick dado, con la misma aritmética que set_train_coordinates."""
+        calculate_time = tick - train.headway
+        if calculate_time < 0:
+            return 0
+        return (calculate_time * self.speed + self.wagon_length_m * train.acquired_wagons) % self.position_limit
+
+    def decouples_at(self, train, tick):
+        """
+        Retorna las estaciones cuyo punto de desacople cruza el último vagón del tren en el tick dado,
+        con las mismas condiciones que handle_decoupling_event.
+        """
+        if tick < 1 or not train.wagons:
+            return []
+        current_train_position = self.train_position_at(train, tick)
+        if current_train_position == 0:
+            return []
+        offset = self.wagon_length_m * (len(train.wagons) - 1)
+        current_position = current_train_position - offset
+        previous_position = self.train_position_at(train, tick - 1) - offset
+        if current_position < previous_position:
+            return []
+        return self.decoupling_index.crossed(previous_position, current_position)
+
+    def couples_at(self, train, tick):
+        """
+        Retorna las estaciones cuyo punto de inicio de acople cruza el tren en el tick dado,
+        con las mismas condiciones que update_train_coupling_crossings.
+        """
+        if tick < 1:
+            return []
+        return self.coupling_index.crossed(self.train_position_at(train, tick - 1), self.train_position_at(train, tick), include_start=True)
+
+    def next_crossing_tick(self, train, tick, index, offset, crosses_at):
+        """
+        Calcula el primer tick posterior a tick en que crosses_at(train, t) no es vacío.
+        Estima el tick con la distancia al siguiente punto del índice (considerando la vuelta al
+        límite de posición) y lo verifica con la aritmética exacta; si la estimación falla,
+        recorre los ticks de una vuelta completa.
+        """
+        if not index.positions:
+            return None
+        start = max(tick, math.ceil(train.headway) - 1)
+        position = self.train_position_at(train, start) - offset
+        next_point = bisect_right(index.positions, position)
+        if next_point < len(index.positions):
+            distance = index.positions[next_point] - position
+        else:
+            distance = self.position_limit - position + index.positions[0]
+        estimate = start + max(1, math.ceil(distance / self.speed))
+        for candidate in (estimate - 1, estimate, estimate + 1):
+            if candidate > tick and crosses_at(train, candidate):
+                if candidate - 1 <= tick or not crosses_at(train, candidate - 1):
+                    return candidate
+        lap = math.ceil(self.position_limit / self.speed) + 2
+        for candidate in range(tick + 1, start + lap + 1):
+            if crosses_at(train, candidate):
+                return candidate
+        return None
+
+    def next_decoupling_tick(self, train, tick):
+        """Próximo tick en que el último vagón del tren cruza un punto de desacople."""
+        if not train.wagons:
+            return None
+        offset = self.wagon_length_m * (len(train.wagons) - 1)
+        return self.next_crossing_tick(train, tick, self.decoupling_index, offset, self.decouples_at)
+
+    def next_coupling_tick(self, train, tick):
+        """Próximo tick en que el tren cruza un punto de inicio de acople."""
+        return self.next_crossing_tick(train, tick, self.coupling_index, 0, self.couples_at)
+
+    # Train Synchronization
+    def advance_movement(self, tick):
+        """
+        Calcula en un solo lote el movimiento de pasajeros de todos los trenes desde el último tick
+        calculado hasta el tick dado (inclusive). Como la composición de un tren solo cambia en eventos
+        que antes llaman a advance_train, avanzar a todos los trenes a la vez da el mismo resultado que
+        avanzarlos por separado.
+        """
+        steps = tick - self.movement_tick
+        if steps <= 0:
+            return
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.lap(self.profiled_event, 0)
+        computed = self.movement_kernel.advance(steps)
+        self.movement_tick = tick
+        if profiler is not None:
+            profiler.lap('passenger_movement', computed)
+
+    def advance_train(self, train, tick):
+        """
+        Calcula el movimiento de pasajeros hasta el tick dado (inclusive) y actualiza la posición del
+        tren y sus vagones en ese tick.
+        """
+        self.advance_movement(tick)
+        self.set_train_coordinates(train, tick)
+
+    # Event Handling
+    def handle_decouple(self, train, tick):
+        """Desacopla el último vagón del tren en la estación cruzada y programa su detención."""
+        self.advance_train(train, tick)
+        train_index = self.trains.index(train)
+        for station in self.decouples_at(train, tick):
+            last_wagon = train.pop_last_wagon()
+            last_wagon.state = 1
+            last_wagon.train_index = train_index
+            station.add_wagon(last_wagon)
+            self.motion_steps[last_wagon] = 0
+            self.wait_start_ticks[last_wagon] = tick + self.deceleration_steps + 1
+            self.schedule(self.wait_start_ticks[last_wagon], self.PHASE_WAIT_START, 'wait_start', last_wagon)
+        self.schedule_train_events(train, tick)
+
+    def handle_wait_start(self, wagon, tick):
+        """
+        El vagón se detiene en la estación: aplica la desaceleración, baja a los pasajeros
+        y aborda a los pasajeros del andén.
+        """
+        if self.wait_start_ticks.get(wagon) != tick:
+            return
+        del self.wait_start_ticks[wagon]
+        del self.motion_steps[wagon]
+        while wagon.speed > 0:
+            self.deceleration_wagon(wagon)
+        wagon.speed = 0
+        wagon.state = 2
+        self.stop_ticks[wagon] = tick - 1
+        self.boarding_cursors[wagon] = [tick, 0]
+        self.handle_alighting_passengers(wagon, wagon.current_station)
+        self.admit_arrivals(wagon.current_station, tick - 1)
+        self.board_waiting_passengers(wagon, wagon.current_station, tick)
+
+    def handle_couple(self, train, tick):
+        """Inicia la aceleración de los vagones detenidos en las estaciones cuyo punto cruzó el tren."""
+        for station in self.couples_at(train, tick):
+            skipped = self.skipped_wagons(station, tick)
+            self.admit_arrivals(station, tick - 1)
+            for wagon in list(station.wagons):
+                stop_tick = self.stop_ticks.get(wagon)
+                if wagon.state != 2 or stop_tick is None or stop_tick >= tick or wagon in skipped:
+                    continue
+                self.board_waiting_passengers(wagon, station, tick)
+                wagon.waiting_time_list.append(tick - stop_tick + self.waiting_adjustments.pop(wagon, 0))
+                wagon.waiting_time = 0
+                wagon.state = 3
+                for passenger in wagon.passengers:
+                    passenger.boarded_recently = False
+                del self.stop_ticks[wagon]
+                del self.boarding_cursors[wagon]
+                self.motion_steps[wagon] = 0
+                self.transfer_ticks[wagon] = tick + self.acceleration_steps
+                self.schedule(self.transfer_ticks[wagon], self.PHASE_TRANSFER, 'transfer', wagon)
+        self.schedule_train_events(train, tick)
+
+    def handle_transfer(self, wagon, tick):
+        """Termina la aceleración del vagón y lo acopla al siguiente tren."""
+        if self.transfer_ticks.get(wagon) != tick:
+            return
+        self.skipped_wagons(wagon.current_station, tick)
+        if self.transfer_ticks[wagon] != tick:
+            return
+        del self.transfer_ticks[wagon]
+        del self.motion_steps[wagon]
+        while wagon.speed < self.speed:
+            self.acceleration_wagon(wagon)
+        self.stop_acceleration(wagon)
+        self.transferred_positions[wagon] = (tick, wagon.positions[-1])
+        # Mismo tren que elegirá get_next_train_for_wagon, sin modificar wagon.train_index
+        next_train = self.trains[0 if wagon.train_index is None else (wagon.train_index + 1) % len(self.trains)]
+        self.advance_train(next_train, tick)
+        self.process_wagon_transfer(wagon)
+        self.schedule_train_events(next_train, tick)
+
+    def skipped_wagons(self, station, tick):
+        """
+        Reproduce una particularidad del motor por pasos: Simulator.update recorre station.wagons
+        mientras process_wagon_transfer remueve vagones de la lista, por lo que el vagón que sigue
+        a uno que se transfiere no se procesa en ese tick. Calcula (una vez por estación y tick)
+        los vagones omitidos y les aplica el efecto: un paso más de desaceleración o de aceleración,
+        o un segundo de espera no contado y sin posibilidad de acoplarse en ese tick.
+        """
+        if self.skipped_tick != tick:
+            self.skipped_tick = tick
+            self.skipped_by_station = {}
+        if station in self.skipped_by_station:
+            return self.skipped_by_station[station]
+
+        skipped = set()
+        wagons = list(station.wagons)
+        i = 0
+        while i < len(wagons):
+            if self.transfer_ticks.get(wagons[i]) == tick:
+                wagons.pop(i)
+                if i < len(wagons):
+                    skipped.add(wagons[i])
+            i += 1
+
+        for wagon in skipped:
+            if wagon.state == 1:
+                self.wait_start_ticks[wagon] += 1
+                self.schedule(self.wait_start_ticks[wagon], self.PHASE_WAIT_START, 'wait_start', wagon)
+            elif wagon.state == 2:
+                self.waiting_adjustments[wagon] = self.waiting_adjustments.get(wagon, 0) - 1
+            elif wagon.state == 3:
+                self.transfer_ticks[wagon] += 1
+                self.schedule(self.transfer_ticks[wagon], self.PHASE_TRANSFER, 'transfer', wagon)
+
+        self.skipped_by_station[station] = skipped
+        return skipped
+
+    def handle_arrivals(self, tick):
+        """
+        Genera las llegadas de pasajeros de todas las estaciones para el lote [tick, tick + arrival_batch_time):
+        conteos de Poisson, destinos y ticks de llegada se sortean con una llamada vectorizada cada uno.
+        Con una demanda variable, el lote se lee de la programación precompilada (self.arrival_schedule).
+        """
+        end = min(tick + self.arrival_batch_time, self.simulator_time)
+        if self.arrival_schedule is not None:
+            for station_index, arrival_ticks, destination_indices in self.arrival_schedule.arrivals_between(tick, end):
+                self.add_arrivals(self.stations[station_index], arrival_ticks.tolist(), destination_indices.tolist())
+            self.schedule(end, self.PHASE_ARRIVALS, 'arrivals', None)
+            return
+
+        counts = self.random_streams.get('arrivals').poisson(self.passenger_creation_rates * (end - tick))
+        total = int(counts.sum())
+        if total:
+            num_stations = len(self.stations)
+            origins = np.repeat(np.arange(num_stations), counts)
+            stacked_indices = np.searchsorted(self.stacked_destination_cdf, origins + self.random_streams.get('destinations').random(total), side='right')
+            destination_indices = np.minimum(stacked_indices - origins * num_stations, num_stations - 1)
+            arrival_ticks = self.random_streams.get('arrival_ticks').integers(tick, end, size=total)
+
+            start = 0
+            for station, count in zip(self.stations, counts.tolist()):
+                if count:
+                    order = np.argsort(arrival_ticks[start:start + count], kind='stable') + start
+                    self.add_arrivals(station, arrival_ticks[order].tolist(), destination_indices[order].tolist())
+                start += count
+
+        self.schedule(end, self.PHASE_ARRIVALS, 'arrivals', None)
+
+    def add_arrivals(self, station, arrival_ticks, destination_indices):
+        """
+        Agrega las llegadas de un lote (en orden de tick) a las pendientes de la estación. Los pasajeros
+        se crean al alcanzar su tick de llegada (ver admit_arrivals).
+        """
+        pending = self.pending_arrivals[station]
+        for arrival_tick, destination_index in zip(arrival_ticks, destination_indices):
+            end_station = self.stations[destination_index]
+            if end_station != station:
+                pending.append((arrival_tick, end_station))
+
+    def admit_arrivals(self, station, tick):
+        """
+        Crea y sube al andén, en orden de llegada, los pasajeros pendientes de la estación que llegan hasta
+        el tick dado (inclusive), si el andén tiene capacidad en su tick de llegada; si no, la llegada se
+        descarta, como en create_passengers. Como el abordaje se calcula en los eventos, con el andén lleno
+        se aplican antes los abordajes hasta el tick de llegada de los vagones detenidos en la estación.
+        """
+        pending = self.pending_arrivals[station]
+        queue = self.platform_queues[station]
+        while pending and pending[0][0] <= tick:
+            arrival_tick, end_station = pending.popleft()
+            if len(station.passengers) >= station.station_capacity:
+                self.board_stopped_wagons(station, arrival_tick)
+                if len(station.passengers) >= station.station_capacity:
+                    continue
+            passenger = Passenger(station, end_station)
+            passenger.start_timer(arrival_tick)
+            station.passengers.append(passenger)
+            queue.append((arrival_tick, passenger))
+
+    def board_waiting_passengers(self, wagon, station, tick):
+        """
+        Aborda al vagón detenido los pasajeros del andén que llegaron antes del tick dado.
+        Cada pasajero aborda en el primer tick posterior a su llegada con cupo disponible
+        (boarding_rate por tick, desde que el vagón se detuvo), siempre que ese tick no sea posterior al actual.
+        Solo considera a los pasajeros ya subidos al andén (ver admit_arrivals).
+        """
+        queue = self.platform_queues[station]
+        cursor = self.boarding_cursors[wagon]
+        while queue and queue[0][0] < tick and len(wagon.passengers) < wagon.wagon_space_for_passenger:
+            arrival_tick, passenger = queue[0]
+            boarding_tick = max(arrival_tick + 1, cursor[0])
+            if boarding_tick > cursor[0]:
+                cursor[0], cursor[1] = boarding_tick, 0
+            elif cursor[1] >= self.boarding_rate:
+                boarding_tick = cursor[0] + 1
+                cursor[0], cursor[1] = boarding_tick, 0
+            if boarding_tick > tick:
+                break
+            cursor[1] += 1
+
+            queue.popleft()
+            station.passengers.remove(passenger)
+            passenger.current_wagon = wagon
+            passenger.current_train = None
+            self.add_passenger_to_ordered_position(wagon, passenger)
+            passenger.boarded_recently = True
+            passenger.board(boarding_tick)
+
+    def board_stopped_wagons(self, station, tick):
+        """Aplica los abordajes hasta el tick dado de los vagones detenidos en la estación, en su orden."""
+        for wagon in list(station.wagons):
+            if wagon in self.boarding_cursors:
+                self.board_waiting_passengers(wagon, station, tick)
+
+    # Simulation Execution
+    def run(self, until=None):
+        """
+        Procesa los eventos en orden hasta el tick until (por defecto, el final de la simulación),
+        sincroniza el movimiento de pasajeros de todos los trenes hasta ese tick y sube al andén a los
+        pasajeros que llegaron hasta entonces.
+        """
+        until = self.simulator_time if until is None else min(until, self.simulator_time)
+        profiler = self.profiler
+        while self.events and self.events[0][0] < until:
+            tick, _, _, kind, payload = heapq.heappop(self.events)
+            self.current_tick = tick
+            if self.trajectory_recorder is not None:
+                self.trajectory_recorder.tick = tick
+            if profiler is not None:
+                profiler.start_tick(tick)
+                self.profiled_event = kind
+
+            if kind in ('decouple', 'couple'):
+                train, version = payload
+                if version != self.train_versions[train]:
+                    continue
+                if kind == 'decouple':
+                    self.handle_decouple(train, tick)
+                else:
+                    self.handle_couple(train, tick)
+            elif kind == 'wait_start':
+                self.handle_wait_start(payload, tick)
+            elif kind == 'transfer':
+                self.handle_transfer(payload, tick)
+            elif kind == 'arrivals':
+                self.handle_arrivals(tick)
+
+            if profiler is not None:
+                if kind in ('decouple', 'couple'):
+                    profiler.lap(kind, train=self.trains.index(payload[0]))
+                elif kind == 'wait_start' and payload.current_station is not None:
+                    profiler.lap(kind, station=self.stations.index(payload.current_station))
+                else:
+                    profiler.lap(kind)
+
+        self.current_tick = until - 1
+        if profiler is not None:
+            profiler.start_tick(until - 1)
+            self.profiled_event = 'passenger_movement'
+        for train in self.trains:
+            self.advance_train(train, until - 1)
+        for station in self.stations:
+            self.admit_arrivals(station, until - 1)
+
+    def place_station_wagons(self, frame):
+        """
+        Deja los vagones en estación en la posición y el estado que tienen al final del tick frame en el
+        motor por pasos, para los renderizadores y TraceRecorder (run solo los actualiza en sus eventos):
+
+          - Un vagón que desacelera aplicó deceleration_steps - (wait_start_tick - 1 - frame) pasos, y se
+            detiene (estado 2) en el tick wait_start_tick - 1, como en handle_deceleration_event.
+          - Un vagón que acelera aplicó acceleration_steps - (transfer_tick - frame) pasos.
+          - Un vagón transferido en el tick frame conserva la posición final de su aceleración, ya que el
+            motor por pasos lo transfiere después de fijar las coordenadas de los trenes.
+
+        Los pasos omitidos por skipped_wagons ya están descontados, porque postergan wait_start_tick y
+        transfer_tick. handle_wait_start y handle_transfer aplican luego solo los pasos restantes.
+        """
+        for wagon, wait_start_tick in self.wait_start_ticks.items():
+            steps = self.deceleration_steps - (wait_start_tick - 1 - frame)
+            while self.motion_steps[wagon] < steps:
+                self.deceleration_wagon(wagon)
+                self.motion_steps[wagon] += 1
+            if wagon.speed <= 0:
+                wagon.speed = 0
+                wagon.state = 2
+        for wagon, transfer_tick in self.transfer_ticks.items():
+            steps = self.acceleration_steps - (transfer_tick - frame)
+            while self.motion_steps[wagon] < steps:
+                self.acceleration_wagon(wagon)
+                self.motion_steps[wagon] += 1
+        for wagon, (transfer_tick, position) in self.transferred_positions.items():
+            if transfer_tick == frame:
+                wagon.positions.append(position)
+        self.transferred_positions.clear()
+
+    def update(self, frame):
+        """
+        Avanza la simulación por eventos hasta el tick frame (inclusive) y deja los vagones en estación y
+        los andenes como en el motor por pasos: ubica los vagones (ver place_station_wagons) y aplica los
+        abordajes hasta frame, que run solo calcula en los eventos.
+        """
+        self.run(frame + 1)
+        self.place_station_wagons(frame)
+        for station in self.stations:
+            self.board_stopped_wagons(station, frame)
+
+    def execute_simulation_logic(self, output_directory=None, verbose=True):
+        """
+        Ejecuta la simulación por eventos sin animación, genera el reporte final y retorna sus métricas.
+        """
+        self.run()
+        if self.trajectory_recorder is not None:
+            self.trajectory_recorder.flush()
+        self.sync_trains()
+        return self.generate_report(output_directory, verbose)
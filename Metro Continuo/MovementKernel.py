@@ -0,0 +1,380 @@
+import numpy as np
+
+
+class MovementKernel:
+    """
+    Núcleo vectorizado del movimiento de pasajeros dentro de los trenes. Mantiene el estado de todos los
+    pasajeros de uno o varios trenes en arreglos de NumPy (celda, dirección, destino, metros movidos) y la
+    ocupación de todas sus celdas en un arreglo plano, y avanza a todos los pasajeros en un solo paso con
+    las mismas prioridades de movimiento que Train.handle_moving_passengers.
+
+    Las celdas de todos los vagones se numeran de forma plana (vagón, fila, columna), de modo que cada
+    movimiento es un desplazamiento del índice de celda. Las celdas candidatas de cada pasajero (hasta tres,
+    en orden de prioridad) dependen solo de si está en su vagón de destino, de su dirección, de si su vagón
+    es el primero o el último de su tren y de su fila y columna; se precalculan en tablas por dimensión de vagón.
+    Como un pasajero nunca pasa más allá del primer o último vagón de su tren, varios trenes pueden
+    compartir los mismos arreglos y avanzar con las mismas operaciones.
+
+    Cada tren ocupa un bloque contiguo de los arreglos. El bloque se construye a partir de los objetos
+    (Wagon y Passenger) la primera vez que se usa y es la fuente de verdad mientras no cambie la composición
+    del tren; sync escribe el estado de vuelta en los objetos e invalidate además marca el bloque para
+    reconstruirlo en el paso siguiente (los trenes lo llaman antes de acoplar o desacoplar). Los bloques de
+    los demás trenes se conservan, por lo que un acople solo reconstruye el tren que cambió.
+
+    El resultado de cada paso es el mismo del recorrido secuencial. Allí los pasajeros se procesan de a
+    uno, vagón por vagón y en el orden de cada vagón, y cada uno ve las celdas que ocuparon o liberaron los
+    anteriores. Aquí cada pasajero elige su primera candidata con espacio según la ocupación que le dejan
+    los pasajeros anteriores en ese orden (ver resolve_moves), y los traslados entre vagones reproducen el
+    orden de los pasajeros de cada vagón (swap-remove de PassengerContainer), de modo que el paso
+    siguiente recorre a los pasajeros en el mismo orden que Train.handle_moving_passengers.
+    """
+
+    # Tipos de vagón según sus vecinos en el tren
+    MIDDLE_WAGON = 0
+    FRONT_WAGON = 1
+    BACK_WAGON = 2
+    SINGLE_WAGON = 3
+
+    # Tablas de movimiento por dimensión de vagón (ver movement_tables)
+    _tables = {}
+
+    # Arreglos por pasajero y por vagón de cada bloque (ver build_block)
+    PASSENGER_ARRAYS = ('cells', 'left', 'assigned', 'move_counts', 'destinations', 'destination_missing', 'slots')
+    WAGON_ARRAYS = ('wagon_kinds', 'wagon_stations')
+
+    def __init__(self, trains, passenger_per_meter):
+        """
+        Parámetros:
+            trains: Lista de trenes (Train) cuyos pasajeros mueve el núcleo.
+            passenger_per_meter: Capacidad de pasajeros por celda.
+        """
+        self.trains = trains
+        self.capacity = passenger_per_meter
+        self.train_numbers = {train: number for number, train in enumerate(trains)}
+        self.station_codes = {}
+        self.cells_per_wagon = None
+        self.wagons = []
+        self.passengers = []
+        # Trenes cuyo bloque se debe reconstruir y trenes cuyos objetos no están al día
+        self.stale = set(range(len(trains)))
+        self.dirty = set()
+
+    @staticmethod
+    def candidate_moves(at_destination, left, wagon_kind, row, col, num_rows, num_columns):
+        """
+        Retorna la lista de movimientos candidatos (desplazamiento de vagón, fila, columna, metros)
+        en orden de prioridad, con la misma lógica que Train.handle_moving_passengers.
+        """
+        has_previous = wagon_kind in (MovementKernel.MIDDLE_WAGON, MovementKernel.BACK_WAGON)
+        has_next = wagon_kind in (MovementKernel.MIDDLE_WAGON, MovementKernel.FRONT_WAGON)
+        last_row, last_col = num_rows - 1, num_columns - 1
+
+        if at_destination:
+            # Abajo y luego en su dirección (el paso lateral no suma metros en la última fila)
+            moves = [(0, 1, 0, 1), (0, 0, -1 if left else 1, 1 if row != last_row else 0)]
+        elif not left:
+            if col < last_col:
+                # Diagonal arriba a la derecha, derecha, diagonal abajo a la derecha
+                moves = [(0, -1, 1, 1), (0, 0, 1, 1), (0, 1, 1, 1)]
+            elif has_next:
+                # Primera columna del siguiente vagón: misma fila, arriba, abajo
+                moves = [(1, 0, -last_col, 1), (1, -1, -last_col, 1), (1, 1, -last_col, 1)]
+            else:
+                moves = []
+        elif col == 0:
+            # Última columna del vagón anterior: misma fila, arriba, abajo
+            moves = [(-1, 0, last_col, 1), (-1, -1, last_col, 1), (-1, 1, last_col, 1)] if has_previous else []
+        elif row == 0:
+            moves = [(0, 1, -1, 1), (0, 0, -1, 1)]
+        elif row == last_row:
+            moves = [(0, -1, -1, 1), (0, 0, -1, 1)]
+        else:
+            moves = [(0, 0, -1, 1), (0, 1, -1, 1), (0, -1, -1, 1)]
+
+        return [(dw, dr, dc, meters) for dw, dr, dc, meters in moves
+                if 0 <= row + dr < num_rows and 0 <= col + dc < num_columns]
+
+    @classmethod
+    def movement_tables(cls, num_rows, num_columns):
+        """
+        Tablas de movimiento para vagones de num_rows x num_columns, indexadas por
+        (prioridad, clave de estado): desplazamiento del índice de celda, validez y metros.
+        La clave de estado es ((en destino * 2 + izquierda) * 4 + tipo de vagón) * celdas + celda del vagón.
+        """
+        tables = cls._tables.get((num_rows, num_columns))
+        if tables is not None:
+            return tables
+
+        cells = num_rows * num_columns
+        keys = 16 * cells
+        offsets = np.zeros((3, keys), dtype=np.int64)
+        valid = np.zeros((3, keys), dtype=bool)
+        meters = np.zeros((3, keys), dtype=np.float64)
+        for at_destination in (0, 1):
+            for left in (0, 1):
+                for wagon_kind in range(4):
+                    for row in range(num_rows):
+                        for col in range(num_columns):
+                            key = ((at_destination * 2 + left) * 4 + wagon_kind) * cells + row * num_columns + col
+                            moves = cls.candidate_moves(at_destination, left, wagon_kind, row, col, num_rows, num_columns)
+                            for priority, (dw, dr, dc, meter) in enumerate(moves):
+                                offsets[priority, key] = dw * cells + dr * num_columns + dc
+                                valid[priority, key] = True
+                                meters[priority, key] = meter
+
+        tables = cls._tables[(num_rows, num_columns)] = (offsets, valid, meters)
+        return tables
+
+
+    # Blocks
+    def refresh(self):
+        """Reconstruye los bloques de los trenes marcados (todos la primera vez) y vuelve a unir los arreglos."""
+        if not self.stale:
+            return
+        if self.cells_per_wagon is None:
+            wagon = next((wagon for train in self.trains for wagon in train.wagons), None)
+            if wagon is None:
+                return
+            self.num_rows = int(wagon.wagon_width_m)
+            self.num_columns = int(wagon.wagon_length_m)
+            self.cells_per_wagon = self.num_rows * self.num_columns
+            self.offsets, self.valid, self.meters = self.movement_tables(self.num_rows, self.num_columns)
+
+        blocks = [self.build_block(train) if number in self.stale else self.block(number)
+                  for number, train in enumerate(self.trains)]
+        self.stale = set()
+
+        wagon_counts = [len(block['wagons']) for block in blocks]
+        passenger_counts = [len(block['passengers']) for block in blocks]
+        self.wagon_offsets = np.concatenate(([0], np.cumsum(wagon_counts))).tolist()
+        self.passenger_offsets = np.concatenate(([0], np.cumsum(passenger_counts))).tolist()
+        self.wagons = [wagon for block in blocks for wagon in block['wagons']]
+        self.passengers = [passenger for block in blocks for passenger in block['passengers']]
+        self.members = [block['members'] for block in blocks]
+        for name in self.PASSENGER_ARRAYS + self.WAGON_ARRAYS + ('occupancy',):
+            setattr(self, name, np.concatenate([block[name] for block in blocks]))
+        # Las celdas de cada bloque son locales a su tren: se desplazan según la posición del bloque
+        self.cells += np.repeat(np.array(self.wagon_offsets[:-1], dtype=np.int64) * self.cells_per_wagon, passenger_counts)
+        self.wagon_trains = [number for number, count in enumerate(wagon_counts) for _ in range(count)]
+        self.occupied = [number for number, count in enumerate(passenger_counts) if count]
+
+    def build_block(self, train):
+        """Construye el bloque de un tren a partir de sus vagones y pasajeros actuales."""
+        wagons = list(train.wagons)
+        count = len(wagons)
+        if count == 1:
+            wagon_kinds = [self.SINGLE_WAGON]
+        elif count > 1:
+            wagon_kinds = [self.FRONT_WAGON] + [self.MIDDLE_WAGON] * (count - 2) + [self.BACK_WAGON]
+        else:
+            wagon_kinds = []
+        station_codes = self.station_codes
+        wagon_stations = [station_codes.setdefault(wagon.assigned_station, len(station_codes)) for wagon in wagons]
+        passengers = [passenger for wagon in wagons for passenger in wagon.passengers]
+        sizes = [len(wagon.passengers) for wagon in wagons]
+        members = []
+        start = 0
+        for size in sizes:
+            members.append(list(range(start, start + size)))
+            start += size
+
+        wagon_index = np.repeat(np.arange(count, dtype=np.int64), sizes)
+        positions = np.array([passenger.wagon_position for passenger in passengers], dtype=np.int64).reshape(-1, 2)
+        destinations = np.array([station_codes.setdefault(passenger.end_station, len(station_codes)) for passenger in passengers], dtype=np.int64)
+        return {
+            'wagons': wagons,
+            'passengers': passengers,
+            'members': members,
+            'cells': wagon_index * self.cells_per_wagon + positions[:, 0] * self.num_columns + positions[:, 1],
+            'left': np.array([passenger.direction == 'left' for passenger in passengers], dtype=bool),
+            'assigned': np.array([passenger.assigned_direction for passenger in passengers], dtype=bool),
+            'move_counts': np.array([passenger.move_count for passenger in passengers], dtype=np.float64),
+            'destinations': destinations,
+            # Pasajeros cuyo vagón de destino no está en su tren (la composición no cambia mientras el bloque es válido)
+            'destination_missing': ~np.isin(destinations, wagon_stations),
+            # Lugar de cada pasajero en la lista de pasajeros de su vagón
+            'slots': np.concatenate([np.arange(size, dtype=np.int64) for size in sizes]) if sizes else np.zeros(0, dtype=np.int64),
+            'wagon_kinds': np.array(wagon_kinds, dtype=np.int64),
+            'wagon_stations': np.array(wagon_stations, dtype=np.int64),
+            'occupancy': np.array([wagon.passenger_matrix for wagon in wagons], dtype=np.int64).reshape(-1),
+        }
+
+    def block(self, number):
+        """Retorna el bloque vigente de un tren, con sus celdas locales al tren."""
+        first_wagon, last_wagon = self.wagon_offsets[number], self.wagon_offsets[number + 1]
+        first, last = self.passenger_offsets[number], self.passenger_offsets[number + 1]
+        block = {name: getattr(self, name)[first:last] for name in self.PASSENGER_ARRAYS}
+        block.update({name: getattr(self, name)[first_wagon:last_wagon] for name in self.WAGON_ARRAYS})
+        block['cells'] = block['cells'] - first_wagon * self.cells_per_wagon
+        block['occupancy'] = self.occupancy[first_wagon * self.cells_per_wagon:last_wagon * self.cells_per_wagon]
+        block['wagons'] = self.wagons[first_wagon:last_wagon]
+        block['passengers'] = self.passengers[first:last]
+        block['members'] = self.members[number]
+        return block
+
+    # Movement
+    def step(self):
+        """Avanza un segundo el movimiento de todos los pasajeros de los trenes y retorna cuántos se movieron."""
+        self.refresh()
+        if not self.passengers:
+            return 0
+        self.dirty.update(self.occupied)
+
+        cells, left, assigned = self.cells, self.left, self.assigned
+        cells_per_wagon = self.cells_per_wagon
+        wagon_index = cells // cells_per_wagon
+        at_destination = self.destinations == self.wagon_stations[wagon_index]
+        away = ~at_destination
+        # Sin vagón de destino en el tren, el pasajero sin dirección asignada va hacia la izquierda
+        left |= away & self.destination_missing & ~assigned
+        assigned |= away & ~left
+
+        keys = (at_destination * 8 + left * 4 + self.wagon_kinds[wagon_index]) * cells_per_wagon + (cells - wagon_index * cells_per_wagon)
+        valid = np.take(self.valid, keys, axis=1)
+        targets = cells + np.take(self.offsets, keys, axis=1)
+        # Orden del recorrido secuencial: vagón por vagón y, en cada vagón, el orden de su lista de pasajeros
+        order_keys = wagon_index * len(cells) + self.slots
+
+        priorities = self.resolve_moves(targets, valid, order_keys)
+        movers = np.flatnonzero(priorities >= 0)
+        if len(movers):
+            priorities = priorities[movers]
+            destinations = targets[priorities, movers]
+            num_cells = len(self.occupancy)
+            self.occupancy += np.bincount(destinations, minlength=num_cells) - np.bincount(cells[movers], minlength=num_cells)
+            self.move_counts[movers] += self.meters[priorities, keys[movers]]
+            cells[movers] = destinations
+            transfers = movers[destinations // cells_per_wagon != wagon_index[movers]]
+            if len(transfers):
+                self.transfer(transfers[np.argsort(order_keys[transfers])], wagon_index)
+
+        # En el vagón de destino, quien no pudo moverse invierte su dirección
+        stuck = at_destination
+        stuck[movers] = False
+        left ^= stuck
+        return len(movers)
+
+    def advance(self, steps):
+        """
+        Avanza steps segundos seguidos (por ejemplo, el intervalo entre dos eventos de EventSimulator) y
+        retorna los pasos calculados. Si dos pasos seguidos no mueven a nadie, el estado queda alternando
+        entre los dos últimos (solo cambia la dirección de quienes no pueden moverse en su vagón de destino),
+        por lo que el resto del intervalo se resuelve según su paridad sin calcularlo.
+        """
+        idle = 0
+        for done in range(1, steps + 1):
+            idle = 0 if self.step() else idle + 1
+            if idle == 2:
+                if (steps - done) % 2:
+                    self.step()
+                    done += 1
+                return done
+        return steps
+
+    def resolve_moves(self, targets, valid, order_keys):
+        """
+        Retorna, por pasajero, la prioridad de la candidata a la que se mueve en el paso (-1 si no se mueve),
+        igual que en el recorrido secuencial: cada pasajero toma su primera candidata con menos de
+        passenger_per_meter pasajeros según la ocupación que le dejan los pasajeros anteriores en
+        order_keys.
+
+        Las cadenas de celdas liberadas hacen que la elección de un pasajero dependa de las de todos los
+        anteriores, por lo que este es el único tramo secuencial del paso: se recorre solo a los pasajeros
+        con alguna candidata válida, en orden, sobre listas de enteros (las candidatas no válidas apuntan
+        a una celda centinela siempre llena).
+        """
+        priorities = np.full(len(order_keys), -1, dtype=np.int64)
+        active = np.flatnonzero(valid.any(axis=0))
+        if not len(active):
+            return priorities
+        active = active[np.argsort(order_keys[active])]
+        capacity = self.capacity
+        sentinel = len(self.occupancy)
+        occupancy = self.occupancy.tolist() + [capacity]
+        first, second, third = np.where(valid[:, active], targets[:, active], sentinel).tolist()
+
+        choices = []
+        for start, a, b, c in zip(self.cells[active].tolist(), first, second, third):
+            if occupancy[a] < capacity:
+                target, priority = a, 0
+            elif occupancy[b] < capacity:
+                target, priority = b, 1
+            elif occupancy[c] < capacity:
+                target, priority = c, 2
+            else:
+                choices.append(-1)
+                continue
+            occupancy[start] -= 1
+            occupancy[target] += 1
+            choices.append(priority)
+
+        priorities[active] = choices
+        return priorities
+
+    def transfer(self, passengers, wagon_index):
+        """
+        Reproduce en las listas de pasajeros de los vagones los traslados entre vagones del paso, en el
+        orden del recorrido secuencial: el pasajero sale de su vagón con swap-remove (como
+        PassengerContainer.remove) y entra al final de la lista del vagón de destino.
+
+        Parámetros:
+            passengers: Índices de los pasajeros trasladados, en el orden del recorrido secuencial.
+            wagon_index: Vagón de cada pasajero al inicio del paso.
+        """
+        slots = self.slots
+        for passenger, source, target in zip(passengers.tolist(), wagon_index[passengers].tolist(),
+                                             (self.cells[passengers] // self.cells_per_wagon).tolist()):
+            number = self.wagon_trains[source]
+            first_wagon = self.wagon_offsets[number]
+            first = self.passenger_offsets[number]
+            members = self.members[number]
+            source_members = members[source - first_wagon]
+            slot = int(slots[passenger])
+            last = source_members.pop()
+            if last != passenger - first:
+                source_members[slot] = last
+                slots[first + last] = slot
+            target_members = members[target - first_wagon]
+            slots[passenger] = len(target_members)
+            target_members.append(passenger - first)
+
+    # Synchronization
+    def sync(self, train=None):
+        """
+        Escribe el estado de los arreglos en los pasajeros y vagones del tren dado (o de todos los trenes).
+        """
+        numbers = list(self.dirty) if train is None else [self.train_numbers[train]]
+        for number in numbers:
+            if number in self.dirty:
+                self.sync_block(number)
+
+    def sync_block(self, number):
+        """Escribe el bloque de un tren en sus pasajeros y vagones."""
+        self.dirty.discard(number)
+        first_wagon, last_wagon = self.wagon_offsets[number], self.wagon_offsets[number + 1]
+        first, last = self.passenger_offsets[number], self.passenger_offsets[number + 1]
+        wagons = self.wagons[first_wagon:last_wagon]
+        passengers = self.passengers[first:last]
+        wagon_index, wagon_cells = np.divmod(self.cells[first:last] - first_wagon * self.cells_per_wagon, self.cells_per_wagon)
+        rows, cols = np.divmod(wagon_cells, self.num_columns)
+        for passenger, wagon, row, col, left, assigned, move_count in zip(
+                passengers, wagon_index.tolist(), rows.tolist(), cols.tolist(), self.left[first:last].tolist(),
+                self.assigned[first:last].tolist(), self.move_counts[first:last].tolist()):
+            passenger.current_wagon = wagons[wagon]
+            passenger.wagon_position = (row, col)
+            passenger.direction = 'left' if left else 'right'
+            passenger.assigned_direction = assigned
+            passenger.move_count = move_count
+
+        cells_per_wagon = self.cells_per_wagon
+        matrices = self.occupancy[first_wagon * cells_per_wagon:last_wagon * cells_per_wagon].reshape(-1, self.num_rows, self.num_columns).tolist()
+        for wagon, matrix, members in zip(wagons, matrices, self.members[number]):
+            wagon.passenger_matrix = matrix
+            wagon._front_free_cell = 0
+            wagon._back_free_cell = 0
+            wagon.replace_passengers([passengers[member] for member in members])
+
+    def invalidate(self, train):
+        """Sincroniza los objetos del tren y marca su bloque, que se reconstruye en el siguiente paso."""
+        self.sync(train)
+        self.stale.add(self.train_numbers[train])
@@ -1,42 +1,85 @@
-import uuid
+import itertools
 
 class Passenger:
     """
     Clase que representa un pasajero, almacenando información sobre su viaje,
     sus estaciones de origen y destino, y su estado durante el trayecto.
+    Usa __slots__ para reducir la memoria por pasajero en simulaciones con alta demanda.
+    Los tiempos se guardan como ticks (llegada al andén, abordaje y descenso) y el tiempo
+    de viaje se deriva de ellos, sin actualizar a cada pasajero en cada paso de la simulación.
     """
-    
+
+    __slots__ = (
+        'passenger_id', 'start_station', 'end_station', 'travel_time', 'start_tick',
+        'boarding_tick', 'alighting_tick', 'current_train',
+        'current_wagon', 'wagon_position', 'boarded_recently', 'direction',
+        'assigned_direction', 'move_count'
+    )
+
+    movement_speed = 1
+    _id_counter = itertools.count()
+
     def __init__(self, start_station, end_station):
         """
-        Inicializa una instancia de Passenger asignándole un identificador único
+        Inicializa una instancia de Passenger asignándole un identificador entero único
         y definiendo las estaciones de origen y destino.
 
         Parámetros:
             start_station: Estación de origen del pasajero.
             end_station: Estación de destino del pasajero.
         """
-        self.name = str(uuid.uuid4())
+        self.passenger_id = next(Passenger._id_counter)
         self.start_station = start_station
         self.end_station = end_station
         self.travel_time = 0
+        self.start_tick = 0
+        self.boarding_tick = None
+        self.alighting_tick = None
         self.current_train = None
         self.current_wagon = None
         self.wagon_position = 0
-        self.movement_speed = 1
         self.boarded_recently = True
         self.direction = 'right'
         self.assigned_direction = False
         self.move_count = 0
 
-    def start_timer(self):
-        """Reinicia el contador del tiempo de viaje."""
-        self.travel_time = 0
+    @property
+    def name(self):
+        """Identificador del pasajero como texto."""
+        return str(self.passenger_id)
 
-    def update_timer(self, time_increment):
+    def start_timer(self, tick=0):
         """
-        Incrementa el contador del tiempo de viaje.
+        Registra el tick en que el pasajero llega al andén y reinicia el tiempo de viaje.
 
         Parámetros:
-            time_increment: Valor a sumar al tiempo de viaje.
+            tick: Tick de llegada del pasajero a la estación de origen.
         """
-        self.travel_time += time_increment
+        self.start_tick = tick
+        self.travel_time = 0
+
+    def board(self, tick):
+        """Registra el tick en que el pasajero sube al vagón."""
+        self.boarding_tick = tick
+
+    def alight(self, tick):
+        """Registra el tick en que el pasajero baja del vagón y fija su tiempo de viaje."""
+        self.alighting_tick = tick
+        self.travel_time = self.get_travel_time(tick)
+
+    def get_travel_time(self, tick):
+        """
+        Retorna el tiempo de viaje (ticks a bordo desde el abordaje) hasta el tick dado,
+        o hasta el descenso si el pasajero ya bajó. Es 0 si aún no aborda.
+        """
+        if self.boarding_tick is None:
+            return 0
+        if self.alighting_tick is not None:
+            tick = self.alighting_tick
+        return tick - self.boarding_tick
+
+    def get_platform_waiting_time(self):
+        """Retorna los ticks que el pasajero esperó en el andén antes de abordar (None si no ha abordado)."""
+        if self.boarding_tick is None:
+            return None
+        return self.boarding_tick - self.start_tick
@@ -0,0 +1,80 @@
+import random
+
+
+class PassengerContainer:
+    """
+    Contenedor de pasajeros indexado por slot. Cada pasajero ocupa una posición de una lista
+    y un diccionario guarda su slot, de modo que agregar, buscar y retirar pasajeros cuesta O(1).
+    Para retirar se mueve el último pasajero al slot liberado (swap-remove), por lo que el orden
+    de iteración no se conserva tras una eliminación.
+    """
+
+    def __init__(self, passengers=()):
+        """
+        Inicializa el contenedor con los pasajeros dados.
+
+        Parámetros:
+            passengers: Iterable de pasajeros iniciales.
+        """
+        self._items = []
+        self._slots = {}
+        self.extend(passengers)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __contains__(self, passenger):
+        return passenger in self._slots
+
+    def append(self, passenger):
+        """Agrega un pasajero al final del contenedor."""
+        self._slots[passenger] = len(self._items)
+        self._items.append(passenger)
+
+    def extend(self, passengers):
+        """Agrega todos los pasajeros del iterable."""
+        for passenger in passengers:
+            self.append(passenger)
+
+    def remove(self, passenger):
+        """
+        Retira al pasajero en O(1): el último pasajero del contenedor ocupa su slot.
+        Lanza KeyError si el pasajero no está en el contenedor.
+        """
+        slot = self._slots.pop(passenger)
+        last = self._items.pop()
+        if last is not passenger:
+            self._items[slot] = last
+            self._slots[last] = slot
+
+    def pop_random(self, rng=None):
+        """
+        Retira y retorna un pasajero elegido de forma uniforme.
+
+        Parámetros:
+            rng: numpy.random.Generator; si es None se usa el módulo random.
+        """
+        index = random.randrange(len(self._items)) if rng is None else int(rng.integers(len(self._items)))
+        return self.pop(index)
+
+    def pop(self, index):
+        """Retira y retorna en O(1) el pasajero del slot dado (el último pasajero ocupa su slot)."""
+        passenger = self._items[index]
+        self.remove(passenger)
+        return passenger
+
+    def clear(self):
+        """Vacía el contenedor."""
+        self._items = []
+        self._slots = {}
+
+    def replace(self, passengers):
+        """Reemplaza el contenido del contenedor por la lista de pasajeros dada."""
+        self.clear()
+        self.extend(passengers)
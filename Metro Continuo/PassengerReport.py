@@ -0,0 +1,131 @@
+import csv
+import os
+import shutil
+import tempfile
+import zipfile
+import numpy as np
+
+# Formatos de salida del reporte de pasajeros
+REPORT_FORMATS = ('csv', 'npz')
+
+
+class PassengerReportWriter:
+    """
+    Escribe el reporte de pasajeros (llegados o fallidos) por lotes de columnas de NumPy, sin armar
+    una lista de filas en memoria. Cada lote se escribe de inmediato en el CSV y, si se pide el formato
+    columnar, se agrega a archivos temporales por columna que al cerrar se empaquetan en un .npz
+    (un .npy por columna, legible con numpy.load). La memoria usada depende del tamaño del lote,
+    no del número de pasajeros.
+    """
+
+    CSV_HEADERS = ["Tiempo de viaje", "Metros desplazados", "Estaciones desplazadas", "Tiempo de espera en andén", "Tiempo total"]
+
+    # Columnas del .npz y sus tipos
+    COLUMNS = {
+        'travel_time': np.int64,
+        'move_count': np.float64,
+        'station_difference': np.int64,
+        'waiting_time': np.int64,
+        'total_time': np.int64,
+        'start_station': np.int32,
+        'end_station': np.int32,
+    }
+
+    def __init__(self, filename, station_names, formats=('csv',)):
+        """
+        Parámetros:
+            filename: Ruta del reporte sin extensión; se escriben filename.csv y/o filename.npz.
+            station_names: Nombres de las estaciones en el orden de la línea. Las estaciones desplazadas
+                se cuentan en ese orden, dando la vuelta al final de la línea.
+            formats: Formatos a escribir: 'csv', 'npz' o ambos.
+        """
+        unknown = set(formats) - set(REPORT_FORMATS)
+        if unknown:
+            raise ValueError(f"Formato de reporte desconocido: {', '.join(sorted(unknown))}. Opciones: {', '.join(REPORT_FORMATS)}")
+        self.filename = filename
+        self.station_names = list(station_names)
+        self.formats = tuple(formats)
+        self.rows = 0
+        self.paths = []
+        self._csvfile = None
+        self._writer = None
+        self._column_files = None
+
+        if 'csv' in self.formats:
+            self._csvfile = open(f"{filename}.csv", 'w', newline='')
+            self._writer = csv.writer(self._csvfile)
+            self._writer.writerow(self.CSV_HEADERS)
+        if 'npz' in self.formats:
+            self._column_files = {name: tempfile.TemporaryFile() for name in self.COLUMNS}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, start_stations, end_stations, travel_times, move_counts, waiting_times):
+        """
+        Escribe un lote de pasajeros. Todos los argumentos son arreglos (o secuencias) del mismo largo.
+
+        Parámetros:
+            start_stations, end_stations: Índices de las estaciones de origen y destino.
+            travel_times: Tiempos de viaje.
+            move_counts: Metros desplazados.
+            waiting_times: Tiempos de espera en el andén.
+        """
+        start_stations = np.asarray(start_stations, dtype=np.int64)
+        end_stations = np.asarray(end_stations, dtype=np.int64)
+        travel_times = np.asarray(travel_times, dtype=np.int64)
+        move_counts = np.asarray(move_counts, dtype=np.float64)
+        waiting_times = np.asarray(waiting_times, dtype=np.int64)
+        station_differences = (end_stations - start_stations) % max(len(self.station_names), 1)
+        total_times = travel_times + waiting_times
+
+        if self._writer is not None:
+            self._writer.writerows(zip(
+                travel_times.tolist(), move_counts.tolist(), station_differences.tolist(),
+                waiting_times.tolist(), total_times.tolist()
+            ))
+        if self._column_files is not None:
+            columns = {
+                'travel_time': travel_times,
+                'move_count': move_counts,
+                'station_difference': station_differences,
+                'waiting_time': waiting_times,
+                'total_time': total_times,
+                'start_station': start_stations,
+                'end_station': end_stations,
+            }
+            for name, dtype in self.COLUMNS.items():
+                self._column_files[name].write(columns[name].astype(dtype, copy=False).tobytes())
+        self.rows += len(travel_times)
+
+    def close(self):
+        """Cierra el CSV y arma el .npz a partir de las columnas temporales. Retorna las rutas escritas."""
+        if self._csvfile is not None:
+            self._csvfile.close()
+            self._csvfile = None
+            self.paths.append(f"{self.filename}.csv")
+        if self._column_files is not None:
+            path = f"{self.filename}.npz"
+            with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for name, dtype in self.COLUMNS.items():
+                    column_file = self._column_files[name]
+                    column_file.seek(0)
+                    header = {'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)), 'fortran_order': False, 'shape': (self.rows,)}
+                    with archive.open(f"{name}.npy", 'w', force_zip64=True) as entry:
+                        np.lib.format.write_array_header_1_0(entry, header)
+                        shutil.copyfileobj(column_file, entry)
+                    column_file.close()
+                with archive.open("station_names.npy", 'w') as entry:
+                    np.lib.format.write_array(entry, np.array(self.station_names, dtype=str))
+            self._column_files = None
+            self.paths.append(path)
+        return self.paths
+
+
+def report_basename(filename):
+    """Retorna la ruta del reporte sin la extensión .csv o .npz."""
+    root, extension = os.path.splitext(filename)
+    return root if extension in ('.csv', '.npz') else filename
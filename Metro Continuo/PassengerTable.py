@@ -0,0 +1,110 @@
+import numpy as np
+
+
+class PassengerTable:
+    """
+    Tabla compacta de pasajeros almacenada como columnas de NumPy (struct-of-arrays).
+    Guarda una fila por pasajero con identificador entero, códigos int8 de estado y dirección,
+    posición int16, índices int32 de estaciones y vagón, tiempo de viaje, ticks de llegada,
+    abordaje y descenso (-1 si no ocurrieron) y metros desplazados.
+    Se usa para archivar a los pasajeros que terminan su viaje sin mantener vivos sus objetos.
+    """
+
+    # Códigos de estado
+    WAITING = 0
+    ON_BOARD = 1
+    ARRIVED = 2
+    FAILED = 3
+
+    # Códigos de dirección
+    DIRECTION_CODES = {'right': 0, 'left': 1}
+
+    COLUMNS = {
+        'passenger_id': np.int64,
+        'state': np.int8,
+        'direction': np.int8,
+        'row': np.int16,
+        'col': np.int16,
+        'start_station': np.int32,
+        'end_station': np.int32,
+        'exit_station': np.int32,
+        'wagon': np.int32,
+        'travel_time': np.int32,
+        'start_tick': np.int32,
+        'boarding_tick': np.int32,
+        'alighting_tick': np.int32,
+        'move_count': np.float64,
+    }
+
+    def __init__(self, stations, initial_capacity=1024):
+        """
+        Inicializa la tabla vacía con columnas preasignadas.
+
+        Parámetros:
+            stations: Lista de estaciones; su posición en la lista es el índice guardado en la tabla.
+            initial_capacity: Número de filas reservadas inicialmente (la tabla crece al doble al llenarse).
+        """
+        self.stations = stations
+        self.station_indices = {station: i for i, station in enumerate(stations)}
+        self.size = 0
+        self.columns = {name: np.zeros(initial_capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self):
+        """Duplica la capacidad de todas las columnas."""
+        for name, column in self.columns.items():
+            grown = np.zeros(len(column) * 2, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def add(self, passenger, state, exit_station=None):
+        """
+        Agrega una fila con los datos del pasajero y retorna su índice.
+
+        Parámetros:
+            passenger: Pasajero a archivar.
+            state: Código de estado (ARRIVED, FAILED, ...).
+            exit_station: Estación donde el pasajero dejó el vagón, si corresponde.
+        """
+        if self.size == len(self.columns['passenger_id']):
+            self._grow()
+        i = self.size
+        columns = self.columns
+        row, col = passenger.wagon_position if isinstance(passenger.wagon_position, tuple) else (-1, -1)
+        wagon = passenger.current_wagon
+        columns['passenger_id'][i] = passenger.passenger_id
+        columns['state'][i] = state
+        columns['direction'][i] = self.DIRECTION_CODES[passenger.direction]
+        columns['row'][i] = row
+        columns['col'][i] = col
+        columns['start_station'][i] = self.station_indices.get(passenger.start_station, -1)
+        columns['end_station'][i] = self.station_indices.get(passenger.end_station, -1)
+        columns['exit_station'][i] = self.station_indices.get(exit_station, -1)
+        columns['wagon'][i] = wagon.wagon_number if wagon is not None else -1
+        columns['travel_time'][i] = passenger.travel_time
+        columns['start_tick'][i] = passenger.start_tick
+        columns['boarding_tick'][i] = passenger.boarding_tick if passenger.boarding_tick is not None else -1
+        columns['alighting_tick'][i] = passenger.alighting_tick if passenger.alighting_tick is not None else -1
+        columns['move_count'][i] = passenger.move_count
+        self.size += 1
+        return i
+
+    def column(self, name):
+        """Retorna una vista de la columna con solo las filas ocupadas."""
+        return self.columns[name][:self.size]
+
+    def select(self, state, exit_station=None):
+        """
+        Retorna una máscara booleana de las filas con el estado dado y, opcionalmente,
+        con la estación de salida dada.
+        """
+        mask = self.column('state') == state
+        if exit_station is not None:
+            mask &= self.column('exit_station') == self.station_indices[exit_station]
+        return mask
+
+    def nbytes(self):
+        """Memoria ocupada por las columnas, en bytes."""
+        return sum(column.nbytes for column in self.columns.values())
@@ -0,0 +1,153 @@
+import random
+from collections import deque
+from PassengerContainer import PassengerContainer
+
+
+class Platform:
+    """
+    Andén de una estación: los pasajeros en espera se agrupan por estación de destino. Cada destino
+    tiene un PassengerContainer (un slot por pasajero y retiro por swap-remove), con el que consultar,
+    retirar y sortear a un pasajero cuesta O(1), y una cola (deque) con su orden de llegada. Los
+    pasajeros retirados fuera del frente no se buscan en la cola: se descartan al llegar a su frente,
+    o al compactarla cuando acumula más retirados que pasajeros en espera, por lo que cada operación
+    cuesta O(1) amortizado (más una pasada por los destinos en pop_random y pop_oldest). Un contador
+    total evita recorrer el andén en el control de capacidad. El orden de llegada entre colas se
+    obtiene del passenger_id, que es creciente.
+    """
+
+    def __init__(self, passengers=()):
+        """
+        Inicializa el andén con los pasajeros dados.
+
+        Parámetros:
+            passengers: Iterable de pasajeros iniciales.
+        """
+        self.containers = {}
+        self.arrivals = {}
+        self.count = 0
+        self.extend(passengers)
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __iter__(self):
+        for destination in self.containers:
+            yield from self.waiting(destination)
+
+    def __contains__(self, passenger):
+        container = self.containers.get(passenger.end_station)
+        return container is not None and passenger in container
+
+    def count_for(self, destination):
+        """Número de pasajeros en espera con la estación de destino dada."""
+        container = self.containers.get(destination)
+        return len(container) if container is not None else 0
+
+    def waiting(self, destination):
+        """Retorna la lista de pasajeros en espera con la estación de destino dada, en orden de llegada."""
+        container = self.containers.get(destination)
+        if not container:
+            return []
+        return [passenger for passenger in self.arrivals[destination] if passenger in container]
+
+    def append(self, passenger):
+        """Agrega un pasajero al final de la cola de su estación de destino."""
+        destination = passenger.end_station
+        container = self.containers.get(destination)
+        if container is None:
+            container = self.containers[destination] = PassengerContainer()
+            self.arrivals[destination] = deque()
+        container.append(passenger)
+        self.arrivals[destination].append(passenger)
+        self.count += 1
+
+    def extend(self, passengers):
+        """Agrega todos los pasajeros del iterable."""
+        for passenger in passengers:
+            self.append(passenger)
+
+    def load(self, destination, passengers):
+        """
+        Agrega los pasajeros con el destino dado en el orden de su PassengerContainer, como los guarda
+        Checkpoint, de modo que los sorteos siguientes elijan a los mismos pasajeros. La cola de llegada
+        se reconstruye por passenger_id. El destino se crea aunque no tenga pasajeros, porque el orden
+        de los destinos también determina los sorteos.
+        """
+        container = self.containers.setdefault(destination, PassengerContainer())
+        container.extend(passengers)
+        self.arrivals[destination] = deque(sorted(container, key=lambda passenger: passenger.passenger_id))
+        self.count += len(passengers)
+
+    def remove(self, passenger):
+        """
+        Retira al pasajero de la cola de su destino en O(1).
+        Lanza ValueError si el pasajero no está en el andén.
+        """
+        destination = passenger.end_station
+        container = self.containers.get(destination)
+        if container is None or passenger not in container:
+            raise ValueError("El pasajero no está en el andén")
+        container.remove(passenger)
+        self.count -= 1
+        self.discard_removed(destination, passenger)
+
+    def popleft(self, destination):
+        """Retira y retorna el primer pasajero de la cola del destino dado, o None si está vacía."""
+        container = self.containers.get(destination)
+        if not container:
+            return None
+        passenger = self.arrivals[destination][0]
+        container.remove(passenger)
+        self.count -= 1
+        self.discard_removed(destination, passenger)
+        return passenger
+
+    def pop_oldest(self):
+        """Retira y retorna el pasajero que llegó primero al andén, comparando los primeros de cada cola."""
+        oldest = None
+        for destination, container in self.containers.items():
+            if container:
+                first = self.arrivals[destination][0]
+                if oldest is None or first.passenger_id < oldest.passenger_id:
+                    oldest = first
+        return self.popleft(oldest.end_station)
+
+    def pop_random(self, rng=None):
+        """
+        Retira y retorna un pasajero elegido de forma uniforme entre todos los del andén.
+
+        Parámetros:
+            rng: numpy.random.Generator; si es None se usa el módulo random.
+        """
+        index = random.randrange(self.count) if rng is None else int(rng.integers(self.count))
+        for destination, container in self.containers.items():
+            if index < len(container):
+                passenger = container.pop(index)
+                self.count -= 1
+                self.discard_removed(destination, passenger)
+                return passenger
+            index -= len(container)
+
+    def discard_removed(self, destination, passenger):
+        """
+        Actualiza la cola de llegada del destino tras retirar al pasajero: si era el primero, descarta
+        los retirados del frente, de modo que el primer elemento sea el pasajero en espera más antiguo;
+        si no, solo reconstruye la cola cuando acumula más retirados que pasajeros en espera.
+        """
+        container = self.containers[destination]
+        arrivals = self.arrivals[destination]
+        if arrivals[0] is passenger:
+            arrivals.popleft()
+            while arrivals and arrivals[0] not in container:
+                arrivals.popleft()
+        elif len(arrivals) > 2 * len(container) + 32:
+            self.arrivals[destination] = deque(waiting for waiting in arrivals if waiting in container)
+
+    def clear(self):
+        """Vacía el andén."""
+        self.containers = {}
+        self.arrivals = {}
+        self.count = 0
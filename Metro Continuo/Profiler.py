@@ -0,0 +1,155 @@
+import csv
+import time
+import numpy as np
+
+
+class PhaseProfiler:
+    """
+    Instrumentación opcional del avance de la simulación (ver el parámetro profile de Simulator).
+    El simulador marca el inicio de cada tick con start_tick y, al terminar cada fase, llama a lap,
+    que suma el tiempo transcurrido desde la marca anterior (reloj monótono time.perf_counter) a la
+    fase, al tick y, si se indica, al tren o a la estación, junto con un contador de elementos
+    procesados (trenes, pasajeros, vagones, ...). Cada lap suma en listas de Python (más baratas
+    que indexar arreglos de NumPy elemento a elemento); la fila del tick en curso se copia a los
+    arreglos por tick al cambiar de tick. Sin profiler, el simulador no mide nada.
+    """
+
+    def __init__(self, phases, simulator_time, number_of_trains, number_of_stations):
+        """
+        Parámetros:
+            phases: Nombres de las fases del simulador, en orden de ejecución.
+            simulator_time: Número de ticks de la simulación (filas del registro por tick).
+            number_of_trains: Número de trenes.
+            number_of_stations: Número de estaciones.
+        """
+        self.phases = tuple(phases)
+        self.phase_index = {phase: index for index, phase in enumerate(self.phases)}
+        self.clock = time.perf_counter
+        self.tick_times = np.zeros((simulator_time, len(self.phases)))
+        self.tick_items = np.zeros((simulator_time, len(self.phases)), dtype=np.int64)
+        self.profiled_ticks = np.zeros(simulator_time, dtype=bool)
+        self.calls = [0] * len(self.phases)
+        self.train_times = [[0.0] * len(self.phases) for _ in range(number_of_trains)]
+        self.train_items = [[0] * len(self.phases) for _ in range(number_of_trains)]
+        self.station_times = [[0.0] * len(self.phases) for _ in range(number_of_stations)]
+        self.station_items = [[0] * len(self.phases) for _ in range(number_of_stations)]
+        # Fila del tick en curso (se copia a tick_times y tick_items en flush)
+        self.tick = None
+        self.row_times = [0.0] * len(self.phases)
+        self.row_items = [0] * len(self.phases)
+        self.mark = self.clock()
+
+    def start_tick(self, tick):
+        """Marca el inicio del trabajo del tick dado."""
+        if tick != self.tick:
+            self.flush()
+            self.tick = tick
+            self.profiled_ticks[tick] = True
+        self.mark = self.clock()
+
+    def flush(self):
+        """Suma la fila del tick en curso a los arreglos por tick."""
+        if self.tick is not None:
+            self.tick_times[self.tick] += self.row_times
+            self.tick_items[self.tick] += self.row_items
+            self.row_times = [0.0] * len(self.phases)
+            self.row_items = [0] * len(self.phases)
+
+    def lap(self, phase, items=1, train=None, station=None):
+        """
+        Suma a la fase el tiempo transcurrido desde la marca anterior y los elementos procesados,
+        y deja la marca en el instante actual.
+
+        Parámetros:
+            phase: Nombre de la fase.
+            items: Número de elementos procesados en este tramo.
+            train: Índice del tren al que se atribuye el tramo, o None.
+            station: Índice de la estación a la que se atribuye el tramo, o None.
+        """
+        now = self.clock()
+        elapsed = now - self.mark
+        self.mark = now
+        index = self.phase_index[phase]
+        self.row_times[index] += elapsed
+        self.row_items[index] += items
+        self.calls[index] += 1
+        if train is not None:
+            self.train_times[train][index] += elapsed
+            self.train_items[train][index] += items
+        if station is not None:
+            self.station_times[station][index] += elapsed
+            self.station_items[station][index] += items
+
+    def summary(self, train_names=None, station_names=None):
+        """
+        Retorna un diccionario con el resumen del perfil:
+          - ticks, total_time y time_per_tick: ticks medidos, tiempo total medido y su promedio por tick.
+          - phases: por fase, time, share (fracción del tiempo total), calls, items, time_per_tick y
+            max_tick_time (el tick más lento de la fase).
+          - trains y stations: por tren o estación (con los nombres dados, o su índice), el tiempo y
+            los elementos de cada fase que se atribuyó a trenes o estaciones.
+        """
+        self.flush()
+        ticks = int(self.profiled_ticks.sum())
+        phase_times = self.tick_times.sum(axis=0)
+        phase_items = self.tick_items.sum(axis=0)
+        total_time = float(phase_times.sum())
+        phases = {}
+        for index, phase in enumerate(self.phases):
+            phases[phase] = {
+                'time': float(phase_times[index]),
+                'share': float(phase_times[index] / total_time) if total_time else 0.0,
+                'calls': int(self.calls[index]),
+                'items': int(phase_items[index]),
+                'time_per_tick': float(phase_times[index] / ticks) if ticks else 0.0,
+                'max_tick_time': float(self.tick_times[:, index].max()) if ticks else 0.0,
+            }
+        return {
+            'ticks': ticks,
+            'total_time': total_time,
+            'time_per_tick': total_time / ticks if ticks else 0.0,
+            'phases': phases,
+            'trains': self._entity_summary(self.train_times, self.train_items, train_names),
+            'stations': self._entity_summary(self.station_times, self.station_items, station_names),
+        }
+
+    def _entity_summary(self, times, items, names):
+        """Resume por entidad (tren o estación) las fases con tiempo atribuido."""
+        names = names or range(len(times))
+        times = np.array(times).reshape(len(times), len(self.phases))
+        items = np.array(items).reshape(len(items), len(self.phases))
+        measured = [index for index in range(len(self.phases)) if items[:, index].any()]
+        return {
+            name: {self.phases[index]: {'time': float(times[row, index]), 'items': int(items[row, index])} for index in measured}
+            for row, name in enumerate(names)
+        }
+
+    def print_summary(self, train_names=None, station_names=None):
+        """Imprime el resumen del perfil: fases ordenadas por tiempo y el reparto por estación."""
+        summary = self.summary(train_names, station_names)
+        print(f"\nPerfil de la simulación: {summary['ticks']} ticks, {summary['total_time']:.3f} s "
+              f"({summary['time_per_tick'] * 1e3:.3f} ms por tick)")
+        for phase, values in sorted(summary['phases'].items(), key=lambda item: -item[1]['time']):
+            print(f"  - {phase}: {values['time']:.3f} s ({values['share']:.1%}), {values['calls']} llamadas, "
+                  f"{values['items']} elementos, máximo {values['max_tick_time'] * 1e3:.3f} ms en un tick")
+        for label, entities in (('Tren', summary['trains']), ('Estación', summary['stations'])):
+            for name, phases in entities.items():
+                if phases:
+                    detail = ", ".join(f"{phase}: {values['time']:.3f} s ({values['items']})" for phase, values in phases.items())
+                    print(f"  {label} {name}: {detail}")
+
+    def export_ticks(self, filename):
+        """
+        Escribe un CSV con una fila por tick medido: el tick y, por cada fase, su tiempo en segundos
+        (<fase>_time) y sus elementos procesados (<fase>_items).
+        """
+        self.flush()
+        ticks = np.flatnonzero(self.profiled_ticks)
+        with open(filename, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['tick'] + [f"{phase}_{column}" for phase in self.phases for column in ('time', 'items')])
+            times = self.tick_times[ticks].tolist()
+            items = self.tick_items[ticks].tolist()
+            for tick, tick_times, tick_items in zip(ticks.tolist(), times, items):
+                writer.writerow([tick] + [value for pair in zip(tick_times, tick_items) for value in pair])
+        return filename
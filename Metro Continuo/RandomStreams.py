@@ -0,0 +1,43 @@
+import zlib
+import numpy as np
+
+
+class RandomStreams:
+    """
+    Conjunto de generadores numpy.random.Generator independientes y reproducibles de una simulación.
+    Todos derivan de una SeedSequence raíz: cada propósito (por ejemplo 'arrivals' o ('station', 0))
+    obtiene su propio generador, cuya semilla depende solo de la semilla raíz y del nombre del propósito,
+    no del orden en que se piden los generadores.
+    """
+
+    def __init__(self, seed=None):
+        """
+        Parámetros:
+            seed: Semilla raíz (entero o numpy.random.SeedSequence). Si es None, se toma entropía del
+                sistema; el valor usado queda en el atributo entropy para poder repetir la simulación.
+        """
+        self.root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.generators = {}
+
+    @property
+    def entropy(self):
+        """Entropía de la SeedSequence raíz (la semilla efectiva de la simulación)."""
+        return self.root.entropy
+
+    def get(self, *purpose):
+        """
+        Retorna el generador del propósito dado, creándolo la primera vez.
+
+        Parámetros:
+            purpose: Partes del nombre del propósito, por ejemplo get('boarding') o get('station', 3).
+        """
+        generator = self.generators.get(purpose)
+        if generator is None:
+            spawn_key = tuple(self.root.spawn_key) + tuple(zlib.crc32(str(part).encode()) for part in purpose)
+            seed_sequence = np.random.SeedSequence(self.root.entropy, spawn_key=spawn_key)
+            generator = self.generators[purpose] = np.random.Generator(np.random.PCG64(seed_sequence))
+        return generator
+
+    def spawn(self, count):
+        """Retorna count SeedSequence hijas independientes de la raíz (por ejemplo, para réplicas)."""
+        return self.root.spawn(count)
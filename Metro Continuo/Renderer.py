@@ -0,0 +1,374 @@
+from matplotlib import pyplot as plt
+from matplotlib.animation import FuncAnimation
+import numpy as np
+
+
+class SimulationRenderer:
+    """
+    Renderizador opcional que se adjunta a un Simulator y dibuja, cuadro a cuadro,
+    la posición de trenes, vagones y pasajeros. La lógica de la simulación vive
+    por completo en Simulator; este módulo es el único que depende de matplotlib.
+    """
+
+    def __init__(self, simulator):
+        """
+        Crea la figura del simulador (ver create_figure).
+
+        Parámetros:
+            simulator: Instancia de Simulator cuya simulación se va a dibujar.
+        """
+        self.simulator = simulator
+        wagon_count = sum(len(train.wagons) for train in simulator.trains) + sum(len(station.wagons) for station in simulator.stations)
+        self.create_figure(simulator.simulator_time, simulator.position_limit, simulator.stations, wagon_count)
+
+    def create_figure(self, simulator_time, position_limit, stations, wagon_count, animated=True):
+        """
+        Crea la figura, los marcadores y etiquetas reutilizables de trenes y vagones y las líneas estáticas de cada estación.
+
+        Parámetros:
+            simulator_time: Número de ticks (eje x).
+            position_limit: Límite de posición (eje y).
+            stations: Estaciones (objetos con name, position, decoupling_point y coupling_point).
+            wagon_count: Número total de vagones (trenes y estaciones).
+            animated: Si es True, los artistas dinámicos quedan fuera del fondo que guarda el blitting;
+                con False se dibujan en cada dibujo completo (por ejemplo, al exportar imágenes).
+        """
+        self.fig, self.ax = plt.subplots()
+        self.ax.set_xlim(0, simulator_time)
+        self.ax.set_ylim(0, position_limit)
+
+        x_range = self.ax.get_xlim()[1] - self.ax.get_xlim()[0]
+        y_range = self.ax.get_ylim()[1] - self.ax.get_ylim()[0]
+
+        constant = 10000
+        self.marker_size = constant / min(x_range, y_range)
+        self.animated = animated
+
+        # Artistas dinámicos: se crean una sola vez y se reutilizan en cada cuadro. Se marcan como
+        # animados para que el fondo que guarda el blitting contenga solo las líneas estáticas.
+        # Todos los trenes se dibujan con un solo Line2D, y todos los vagones con otro.
+        self.train_markers, = self.ax.plot([], [], 'bo', markersize=self.marker_size/2, animated=animated)
+        self.wagon_markers, = self.ax.plot([], [], 'ro', markersize=self.marker_size/2, animated=animated)
+
+        # El número de vagones no cambia durante la simulación (solo pasan de trenes a estaciones),
+        # por lo que basta un grupo fijo de etiquetas, una por vagón
+        self.wagon_labels = [self.create_wagon_label() for _ in range(wagon_count)]
+        self.wagon_label_texts = [None] * wagon_count
+        self.visible_wagon_labels = 0
+
+        self.station_names = [station.name for station in stations]
+        self.passenger_texts = []
+        self.station_passenger_counts = [None] * len(stations)
+
+        for station in stations:
+            self.ax.axhline(y=station.position, color='gray', linestyle='--', lw=1)
+            passenger_text = self.ax.text(simulator_time * 0.95, station.position, f"{station.name}: 0", va='center', ha='right', animated=animated)
+            self.passenger_texts.append(passenger_text)
+
+            if station.decoupling_point is not None:
+                self.ax.axhline(y=station.decoupling_point, color='red', linestyle='-', lw=1, label='Decoupling Point' if station == stations[0] else "")
+            if station.coupling_point is not None:
+                self.ax.axhline(y=station.coupling_point, color='green', linestyle='-', lw=1, label='Coupling Point' if station == stations[0] else "")
+
+    def create_wagon_label(self):
+        """Crea una etiqueta de pasajeros de vagón, oculta hasta que se use."""
+        return self.ax.text(0, 0, "", fontsize=8, ha='left', color='black', visible=False, animated=self.animated)
+
+    def run_simulation(self):
+        """
+        Ejecuta la animación de la simulación y, una vez finalizada, genera el reporte.
+        """
+        ani = FuncAnimation(
+            self.fig,
+            self.update,
+            frames=range(self.simulator.simulator_time),
+            init_func=self.init,
+            interval=self.simulator.interval,
+            blit=True
+        )
+        plt.show()
+        self.simulator.generate_report()
+
+    def init(self):
+        """
+        Limpia los marcadores y oculta las etiquetas de los vagones para el inicio de la animación.
+        Retorna la lista de artistas dinámicos.
+        """
+        self.train_markers.set_data([], [])
+        self.wagon_markers.set_data([], [])
+        for label in self.wagon_labels[:self.visible_wagon_labels]:
+            label.set_visible(False)
+        self.visible_wagon_labels = 0
+        return [self.train_markers, self.wagon_markers] + self.passenger_texts
+
+    def update(self, frame):
+        """
+        Avanza un paso la lógica de la simulación y actualiza el dibujo (ver draw_frame).
+        Retorna la lista de artistas visibles, cuyo largo está acotado por el número de vagones.
+        """
+        simulator = self.simulator
+
+        if frame >= simulator.simulator_time:
+            return
+
+        simulator.update(frame)
+        simulator.sync_trains()
+        return self.draw_frame(frame, *self.collect_frame())
+
+    def collect_frame(self):
+        """
+        Retorna el estado del simulador que se dibuja: posiciones de los trenes con vagones, posiciones,
+        desplazamientos de etiqueta y número de pasajeros de todos los vagones, y pasajeros en cada andén.
+        """
+        simulator = self.simulator
+        train_positions = [train.positions[-1] for train in simulator.trains if train.wagons]
+
+        # Etiquetas: los vagones de cada tren se desplazan a la derecha según su posición en el tren
+        wagon_positions = []
+        label_offsets = []
+        passenger_counts = []
+        for train in simulator.trains:
+            for i, wagon in enumerate(train.wagons):
+                wagon_positions.append(wagon.positions[-1])
+                label_offsets.append(i * 100)
+                passenger_counts.append(len(wagon.passengers))
+        for station in simulator.stations:
+            for wagon in station.wagons:
+                wagon_positions.append(wagon.positions[-1])
+                label_offsets.append(0)
+                passenger_counts.append(len(wagon.passengers))
+        station_counts = [len(station.passengers) for station in simulator.stations]
+        return train_positions, wagon_positions, label_offsets, passenger_counts, station_counts
+
+    def draw_frame(self, frame, train_positions, wagon_positions, label_offsets, passenger_counts, station_counts):
+        """
+        Actualiza el dibujo del tick frame:
+          - Ajusta la posición de los marcadores de trenes y vagones (acoplados y desacoplados).
+          - Reubica las etiquetas con el número de pasajeros de cada vagón, cambiando el texto
+            solo si el número cambió, y oculta las etiquetas que sobran.
+          - Actualiza el número de pasajeros de los andenes que cambiaron.
+        Retorna la lista de artistas visibles.
+        """
+        self.train_markers.set_data([frame] * len(train_positions), train_positions)
+        self.wagon_markers.set_data([frame] * len(wagon_positions), wagon_positions)
+
+        while len(self.wagon_labels) < len(wagon_positions):
+            self.wagon_labels.append(self.create_wagon_label())
+            self.wagon_label_texts.append(None)
+        for k, (position, offset, count) in enumerate(zip(wagon_positions, label_offsets, passenger_counts)):
+            label = self.wagon_labels[k]
+            label.set_position((frame + offset, position))
+            if self.wagon_label_texts[k] != count:
+                label.set_text(str(count))
+                self.wagon_label_texts[k] = count
+            if k >= self.visible_wagon_labels:
+                label.set_visible(True)
+        for label in self.wagon_labels[len(wagon_positions):self.visible_wagon_labels]:
+            label.set_visible(False)
+        self.visible_wagon_labels = len(wagon_positions)
+
+        for station_index, count in enumerate(station_counts):
+            if self.station_passenger_counts[station_index] != count:
+                self.passenger_texts[station_index].set_text(f"{self.station_names[station_index]}: {count}")
+                self.station_passenger_counts[station_index] = count
+
+        return [self.train_markers, self.wagon_markers] + self.wagon_labels[:self.visible_wagon_labels] + self.passenger_texts
+
+
+class TrainInteriorRenderer:
+    """
+    Renderizador opcional que muestra el interior de los trenes: cada vagón se dibuja
+    como una imagen de su matriz de colores con el número de pasajeros en cada celda.
+    """
+
+    # Mapa de colores precomputado (índice = valor de Wagon.color_matrix)
+    color_map_arr = np.array([
+        [0.5, 0.5, 0.5],  # gris
+        [1, 0, 0],        # rojo
+        [0, 0, 1],        # azul
+        [0, 1, 0],        # verde
+        [1, 1, 0]         # amarillo
+    ])
+
+    def __init__(self, simulator):
+        """
+        Crea la grilla de subplots de los trenes del simulador (ver create_figure).
+
+        Parámetros:
+            simulator: Instancia de Simulator cuyos trenes se van a dibujar.
+        """
+        self.simulator = simulator
+        trains = simulator.trains
+        max_wagons = max(len(train.wagons) for train in trains)
+        self.create_figure(len(trains), max_wagons, int(simulator.wagon_width_m), int(simulator.wagon_length_m))
+
+    def create_figure(self, number_of_trains, max_wagons, num_rows, num_columns, animated=True):
+        """
+        Crea una grilla de subplots con una fila por tren y una columna por vagón.
+
+        Parámetros:
+            number_of_trains: Número de trenes (filas de la grilla).
+            max_wagons: Número máximo de vagones por tren (columnas de la grilla).
+            num_rows, num_columns: Dimensiones de la matriz de celdas de cada vagón.
+            animated: Ver SimulationRenderer.create_figure.
+        """
+        self.fig, axes = plt.subplots(
+            nrows=number_of_trains,
+            ncols=max_wagons,
+            figsize=(max_wagons * 2, number_of_trains * 2),
+            gridspec_kw={'hspace': 0.5, 'wspace': 0.2},
+            squeeze=False
+        )
+        self.axes = axes
+
+        # Cada subplot crea una sola vez su imagen, su título y su grilla de textos (uno por celda),
+        # que luego se actualizan con set_data y set_text. El título va dentro de los ejes, en una
+        # franja sobre la imagen, porque el blitting solo redibuja el área de cada subplot.
+        self.empty_grid = np.zeros((num_rows, num_columns, 3))
+        self.images = []
+        self.titles = []
+        self.cell_texts = []
+        for ax in (ax for axs in axes for ax in axs):
+            ax.axis('off')
+            self.images.append(ax.imshow(self.empty_grid, aspect='equal', animated=animated))
+            ax.set_ylim(num_rows - 0.5, -2.5)
+            self.titles.append(ax.text((num_columns - 1) / 2, -1.5, "", ha='center', va='center', fontsize=8, animated=animated))
+            self.cell_texts.append([
+                [ax.text(c, r, "", ha='center', va='center', color='white', fontsize=6, animated=animated) for c in range(num_columns)]
+                for r in range(num_rows)
+            ])
+
+        # Último estado dibujado de cada subplot (None si aún no se dibuja o no tiene vagón)
+        self.shown_counts = [None] * len(self.images)
+        self.shown_colors = [None] * len(self.images)
+        self.shown_titles = [None] * len(self.images)
+
+    def animate_train_simulation(self):
+        """
+        Muestra una animación en la que se visualizan los trenes y sus vagones.
+        """
+        ani = FuncAnimation(
+            self.fig, self.update, frames=range(self.simulator.simulator_time),
+            init_func=self.init, interval=self.simulator.interval, repeat=False, blit=True
+        )
+        plt.show()
+
+    def init(self):
+        """Dibuja el estado actual de los vagones sin avanzar la simulación y retorna todos los artistas."""
+        self.shown_counts = [None] * len(self.images)
+        self.shown_colors = [None] * len(self.images)
+        self.shown_titles = [None] * len(self.images)
+        self.refresh()
+        return self.images + self.titles + [text for texts in self.cell_texts for row in texts for text in row]
+
+    def update(self, frame):
+        """
+        Se llama en cada frame de la animación.
+        Avanza la lógica de la simulación y actualiza las imágenes de las matrices
+        de colores y etiquetas de pasajeros de cada vagón.
+        """
+        self.simulator.update(frame)
+        self.simulator.sync_trains()
+        return self.refresh()
+
+    def refresh(self):
+        """Dibuja el estado actual de los vagones del simulador (ver draw_wagons)."""
+        return self.draw_wagons(self.collect_wagons())
+
+    def collect_wagons(self):
+        """
+        Retorna, por cada tren, la lista de sus vagones visibles como tuplas
+        (matriz de pasajeros, matriz de colores, título).
+        """
+        trains = []
+        for train, axs in zip(self.simulator.trains, self.axes):
+            trains.append([
+                (np.asarray(wagon.passenger_matrix), np.asarray(wagon.color_matrix), self.wagon_title(wagon.assigned_station.name, wagon.passenger_matrix))
+                for wagon in train.wagons[:len(axs)]
+            ])
+        return trains
+
+    def draw_wagons(self, trains):
+        """
+        Actualiza las imágenes, títulos y textos de los subplots cuyo vagón cambió: los colores con
+        set_data y solo los textos de las celdas cuyo número de pasajeros cambió. Retorna los artistas
+        de los subplots modificados; los demás no se redibujan.
+
+        Parámetros:
+            trains: Por cada tren, lista de tuplas (matriz de pasajeros, matriz de colores, título)
+                de sus vagones (ver collect_wagons). Los subplots sin vagón muestran un placeholder.
+        """
+        updated = []
+        index = 0
+        for wagons, axs in zip(trains, self.axes):
+            for i in range(len(axs)):
+                if i < len(wagons):
+                    changed = self.show_cells(index, *wagons[i])
+                else:
+                    changed = self.show_placeholder(index)
+                if changed:
+                    updated.append(self.images[index])
+                    updated.append(self.titles[index])
+                    if self.shown_counts[index] is not None:
+                        updated.extend(text for row in self.cell_texts[index] for text in row)
+                index += 1
+        return updated
+
+    @staticmethod
+    def wagon_title(station_name, passenger_matrix):
+        """Retorna el título de un vagón: su estación asignada y su número de pasajeros."""
+        return f'{station_name} ({np.sum(passenger_matrix)} passengers)'
+
+    def show_wagon(self, index, wagon):
+        """Dibuja el vagón en el subplot index. Retorna True si algo cambió."""
+        return self.show_cells(index, np.asarray(wagon.passenger_matrix), np.asarray(wagon.color_matrix),
+                               self.wagon_title(wagon.assigned_station.name, wagon.passenger_matrix))
+
+    def show_cells(self, index, passenger_matrix, color_matrix, title):
+        """
+        Dibuja en el subplot index un vagón dado por su matriz de pasajeros, su matriz de colores
+        (índices de color_map_arr) y su título. Retorna True si algo cambió.
+        """
+        previous_counts = self.shown_counts[index]
+        changed = False
+
+        if previous_counts is None:
+            cells = np.ndindex(passenger_matrix.shape)
+            for row in self.cell_texts[index]:
+                for text in row:
+                    text.set_visible(True)
+        else:
+            cells = zip(*np.nonzero(passenger_matrix != previous_counts))
+        for r, c in cells:
+            self.cell_texts[index][r][c].set_text(str(passenger_matrix[r, c]))
+            changed = True
+        self.shown_counts[index] = passenger_matrix
+
+        if self.shown_colors[index] is None or not np.array_equal(color_matrix, self.shown_colors[index]):
+            # Crear la cuadrícula de colores usando el mapa precomputado
+            self.images[index].set_data(self.color_map_arr[color_matrix])
+            self.shown_colors[index] = color_matrix
+            changed = True
+
+        return self.set_title(index, title) or changed
+
+    def show_placeholder(self, index):
+        """Si no hay vagón en el subplot index, muestra un placeholder. Retorna True si algo cambió."""
+        if self.shown_titles[index] == "Decouple Wagon":
+            return False
+        self.images[index].set_data(self.empty_grid)
+        for row in self.cell_texts[index]:
+            for text in row:
+                text.set_visible(False)
+        self.shown_counts[index] = None
+        self.shown_colors[index] = None
+        self.set_title(index, "Decouple Wagon")
+        return True
+
+    def set_title(self, index, title):
+        """Cambia el título del subplot index si es distinto. Retorna True si cambió."""
+        if self.shown_titles[index] == title:
+            return False
+        self.titles[index].set_text(title)
+        self.shown_titles[index] = title
+        return True
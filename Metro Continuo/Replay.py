@@ -0,0 +1,224 @@
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib import pyplot as plt
+from matplotlib.widgets import Slider
+from Renderer import SimulationRenderer, TrainInteriorRenderer
+from Trace import load_trace
+
+# Vistas disponibles para reproducir o exportar una traza
+REPLAY_VIEWS = ('simulation', 'interior')
+
+
+def create_replay_renderer(trace, view='simulation', animated=False):
+    """
+    Crea el renderizador de la vista pedida a partir de una traza (ver Trace.Trace), sin simulador.
+    Retorna un SimulationRenderer o TrainInteriorRenderer cuyo método draw_tick dibuja un tick de la traza.
+
+    Parámetros:
+        trace: Traza abierta con load_trace.
+        view: 'simulation' (posiciones de trenes y vagones) o 'interior' (interior de los trenes;
+            requiere una traza con cells=True).
+        animated: Ver SimulationRenderer.create_figure. Al reproducir con el deslizador y al exportar
+            se dibuja la figura completa, por lo que los artistas no son animados.
+    """
+    if view == 'simulation':
+        return ReplaySimulationRenderer(trace, animated)
+    if view == 'interior':
+        return ReplayInteriorRenderer(trace, animated)
+    raise ValueError(f"Vista desconocida: {view}. Opciones: {', '.join(REPLAY_VIEWS)}")
+
+
+class ReplaySimulationRenderer(SimulationRenderer):
+    """SimulationRenderer que dibuja los ticks de una traza en lugar de avanzar un simulador."""
+
+    def __init__(self, trace, animated=False):
+        self.simulator = None
+        self.trace = trace
+        self.create_figure(trace.simulator_time, trace.position_limit, trace.stations, trace.wagon_count, animated)
+
+    def draw_tick(self, tick):
+        """Dibuja el tick de la traza. Retorna los artistas modificados."""
+        return self.draw_frame(tick, *self.trace.frame(tick))
+
+
+class ReplayInteriorRenderer(TrainInteriorRenderer):
+    """TrainInteriorRenderer que dibuja los ticks de una traza en lugar de avanzar un simulador."""
+
+    def __init__(self, trace, animated=False):
+        self.simulator = None
+        self.trace = trace
+        self.create_figure(trace.number_of_trains, trace.max_wagons, trace.num_rows, trace.num_columns, animated)
+
+    def draw_tick(self, tick):
+        """Dibuja el tick de la traza. Retorna los artistas modificados."""
+        return self.draw_wagons(self.trace.wagons(tick))
+
+
+class ReplayPlayer:
+    """
+    Reproductor interactivo de una traza: un deslizador para moverse a cualquier tick y un temporizador
+    para reproducirla. Teclas: espacio (reproducir/pausar), flechas izquierda/derecha (un tick),
+    inicio/fin (primer/último tick).
+    """
+
+    def __init__(self, trace_directory, view='simulation', step=1):
+        """
+        Parámetros:
+            trace_directory: Directorio de la traza.
+            view: Vista a mostrar (ver create_replay_renderer).
+            step: Ticks que avanza cada cuadro de la reproducción.
+        """
+        self.trace = load_trace(trace_directory)
+        self.renderer = create_replay_renderer(self.trace, view)
+        self.step = step
+        self.first_tick = self.trace.first_tick
+        self.last_tick = max(len(self.trace) - 1, self.first_tick)
+        self.tick = None
+
+        fig = self.renderer.fig
+        fig.subplots_adjust(bottom=0.15)
+        slider_ax = fig.add_axes([0.15, 0.03, 0.7, 0.03])
+        self.slider = Slider(slider_ax, 'Tick', self.first_tick, self.last_tick, valinit=self.first_tick, valstep=1)
+        self.slider.on_changed(self.seek)
+        fig.canvas.mpl_connect('key_press_event', self.on_key)
+        self.timer = fig.canvas.new_timer(interval=max(int(self.trace.interval), 1))
+        self.timer.add_callback(self.advance)
+        self.playing = False
+        self.seek(self.first_tick)
+
+    def seek(self, tick):
+        """Dibuja el tick dado (acotado al rango registrado)."""
+        tick = min(max(int(tick), self.first_tick), self.last_tick)
+        if tick == self.tick:
+            return
+        self.tick = tick
+        self.renderer.draw_tick(tick)
+        if self.slider.val != tick:
+            # set_val vuelve a llamar a seek, que no hace nada porque el tick ya se dibujó
+            self.slider.set_val(tick)
+        self.renderer.fig.canvas.draw_idle()
+
+    def advance(self):
+        """Avanza step ticks; al llegar al final se detiene."""
+        if self.tick >= self.last_tick:
+            self.pause()
+            return
+        self.seek(self.tick + self.step)
+
+    def play(self):
+        self.playing = True
+        self.timer.start()
+
+    def pause(self):
+        self.playing = False
+        self.timer.stop()
+
+    def on_key(self, event):
+        if event.key == ' ':
+            self.pause() if self.playing else self.play()
+        elif event.key == 'right':
+            self.seek(self.tick + self.step)
+        elif event.key == 'left':
+            self.seek(self.tick - self.step)
+        elif event.key == 'home':
+            self.seek(self.first_tick)
+        elif event.key == 'end':
+            self.seek(self.last_tick)
+
+    def show(self, play=True):
+        """Muestra la ventana; si play es True, comienza a reproducir."""
+        if play:
+            self.play()
+        plt.show()
+
+
+def export_chunk(task):
+    """
+    Exporta un tramo contiguo de cuadros (en un proceso del pool) con el backend Agg, sin ventana.
+    Retorna las rutas de las imágenes escritas.
+
+    Parámetros:
+        task: Tupla (directorio de la traza, directorio de salida, vista, lista de (número de cuadro, tick), dpi).
+    """
+    trace_directory, output_directory, view, frames, dpi = task
+    plt.switch_backend('Agg')
+
+    trace = load_trace(trace_directory)
+    renderer = create_replay_renderer(trace, view)
+    paths = []
+    # Los renderizadores solo cambian los artistas que difieren del cuadro anterior, por lo que
+    # cada proceso recorre un tramo contiguo de ticks
+    for number, tick in frames:
+        renderer.draw_tick(tick)
+        path = os.path.join(output_directory, f"frame_{number:06d}.png")
+        renderer.fig.savefig(path, dpi=dpi)
+        paths.append(path)
+    plt.close(renderer.fig)
+    return paths
+
+
+def export_frames(trace_directory, output_directory, view='simulation', ticks=None, step=1, workers=None, dpi=100, video=None, fps=30):
+    """
+    Exporta los ticks de una traza como una secuencia de imágenes frame_000000.png, frame_000001.png, ...
+    (numeradas en orden, no por tick) y, opcionalmente, como video con ffmpeg. Los cuadros se reparten
+    en tramos contiguos entre procesos, cada uno con su propia figura y el backend Agg, por lo que la
+    exportación escala con el número de núcleos. Retorna las rutas de las imágenes (y del video, al final).
+
+    Parámetros:
+        trace_directory: Directorio de la traza (ver Simulator.record_trace).
+        output_directory: Directorio donde escribir las imágenes.
+        view: Vista a exportar (ver create_replay_renderer).
+        ticks: Ticks a exportar. Por defecto, todos los registrados cada step ticks.
+        step: Separación entre ticks exportados cuando ticks es None.
+        workers: Número de procesos (None usa os.cpu_count()).
+        dpi: Resolución de las imágenes.
+        video: Ruta del video a generar con ffmpeg (por ejemplo, 'replay.mp4'), o None.
+        fps: Cuadros por segundo del video.
+    """
+    if view not in REPLAY_VIEWS:
+        raise ValueError(f"Vista desconocida: {view}. Opciones: {', '.join(REPLAY_VIEWS)}")
+    ffmpeg = None
+    if video is not None:
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg is None:
+            raise RuntimeError("No se encontró ffmpeg para generar el video; exporte solo las imágenes (video=None)")
+
+    trace = load_trace(trace_directory)
+    if ticks is None:
+        ticks = range(trace.first_tick, len(trace), step)
+    frames = list(enumerate(ticks))
+    os.makedirs(output_directory, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(-(-len(frames) // workers), 1)
+    tasks = [(trace_directory, output_directory, view, frames[start:start + chunk_size], dpi) for start in range(0, len(frames), chunk_size)]
+    if workers == 1 or len(tasks) < 2:
+        chunks = [export_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(export_chunk, tasks))
+    paths = [path for chunk in chunks for path in chunk]
+
+    if video is not None:
+        subprocess.run([
+            ffmpeg, '-y', '-loglevel', 'error', '-framerate', str(fps),
+            '-i', os.path.join(output_directory, 'frame_%06d.png'),
+            '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', video
+        ], check=True)
+        paths.append(video)
+    return paths
+
+
+if __name__ == '__main__':
+    # Uso: python Replay.py <directorio de la traza> [simulation|interior] [directorio de imágenes]
+    # Sin directorio de imágenes se abre el reproductor interactivo; con él se exportan los cuadros.
+    trace_directory = sys.argv[1] if len(sys.argv) > 1 else 'trace'
+    view = sys.argv[2] if len(sys.argv) > 2 else 'simulation'
+    if len(sys.argv) > 3:
+        paths = export_frames(trace_directory, sys.argv[3], view)
+        print(f"{len(paths)} cuadros exportados a {sys.argv[3]}")
+    else:
+        ReplayPlayer(trace_directory, view).show()
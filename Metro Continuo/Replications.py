@@ -0,0 +1,94 @@
+import csv
+import math
+import os
+import statistics
+from statistics import NormalDist
+from Sweep import SweepRunner
+
+
+def student_t_quantile(probability, degrees_of_freedom):
+    """
+    Cuantil de la distribución t de Student sin depender de scipy: fórmulas exactas para 1 y 2 grados
+    de libertad y, para más, la expansión de Cornish-Fisher en torno al cuantil normal
+    (error relativo menor a 1% desde 3 grados de libertad para los niveles de confianza usuales).
+    """
+    if degrees_of_freedom == 1:
+        return math.tan(math.pi * (probability - 0.5))
+    if degrees_of_freedom == 2:
+        return (2 * probability - 1) / math.sqrt(2 * probability * (1 - probability))
+    z = NormalDist().inv_cdf(probability)
+    v = degrees_of_freedom
+    g1 = (z**3 + z) / 4
+    g2 = (5 * z**5 + 16 * z**3 + 3 * z) / 96
+    g3 = (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / 384
+    g4 = (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / 92160
+    return z + g1 / v + g2 / v**2 + g3 / v**3 + g4 / v**4
+
+
+def confidence_interval(values, confidence=0.95):
+    """
+    Retorna (media, semiancho, límite inferior, límite superior) del intervalo de confianza t de Student
+    para la media de los valores. Con un solo valor el semiancho es NaN.
+    """
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return mean, math.nan, math.nan, math.nan
+    standard_error = statistics.stdev(values) / math.sqrt(len(values))
+    half_width = student_t_quantile(0.5 + confidence / 2, len(values) - 1) * standard_error
+    return mean, half_width, mean - half_width, mean + half_width
+
+
+class ReplicationRunner(SweepRunner):
+    """
+    Ejecuta N réplicas Monte Carlo de una misma configuración en un pool de procesos. Cada réplica usa
+    una SeedSequence hija de la semilla raíz, por lo que las réplicas son independientes entre sí y el
+    conjunto completo se reproduce con la misma semilla. Resume las métricas con medias e intervalos de confianza.
+    """
+
+    # Métricas de generate_report que se resumen
+    summary_metrics = ('arrived_passengers', 'average_travel_time', 'median_waiting_time', 'average_move_distance')
+
+    def __init__(self, config, replications, workers=None, chunksize=1, output_directory="replication_results", seed=None):
+        """
+        Parámetros:
+            config: Diccionario de parámetros de Scenario.build_simulator.
+            replications: Número de réplicas.
+            workers, chunksize, output_directory: Igual que en SweepRunner.
+            seed: Semilla raíz de las réplicas. Si es None, se usa entropía del sistema en cada réplica.
+        """
+        super().__init__([dict(config) for _ in range(replications)], workers, chunksize, output_directory, seed)
+
+    def summary(self, confidence=0.95):
+        """
+        Retorna un diccionario métrica -> {'mean', 'half_width', 'lower', 'upper', 'replications'}
+        con el intervalo de confianza de la media de cada métrica sobre las réplicas ejecutadas.
+        """
+        summary = {}
+        for metric in self.summary_metrics:
+            values = [row[metric] for row in self.results]
+            mean, half_width, lower, upper = confidence_interval(values, confidence)
+            summary[metric] = {'mean': mean, 'half_width': half_width, 'lower': lower, 'upper': upper, 'replications': len(values)}
+        return summary
+
+    def write_summary(self, filename=None, confidence=0.95):
+        """Escribe el resumen en un CSV con una fila por métrica (por defecto, replication_summary.csv) y retorna su ruta."""
+        if filename is None:
+            filename = os.path.join(self.output_directory, "replication_summary.csv")
+        headers = ['metric', 'mean', 'half_width', 'lower', 'upper', 'replications', 'confidence']
+        with open(filename, 'w', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=headers)
+            writer.writeheader()
+            for metric, values in self.summary(confidence).items():
+                writer.writerow(dict(values, metric=metric, confidence=confidence))
+        print(f"Resumen de réplicas exportado a {filename}")
+        return filename
+
+
+if __name__ == '__main__':
+    # Réplicas de ejemplo de la configuración por defecto (línea L6)
+    runner = ReplicationRunner({}, replications=10, seed=0)
+    runner.run()
+    runner.write_table()
+    for metric, values in runner.summary().items():
+        print(f"{metric}: {values['mean']:.2f} ± {values['half_width']:.2f} (IC 95%, {values['replications']} réplicas)")
+    runner.write_summary()
@@ -0,0 +1,259 @@
+import os
+import sys
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from PassengerReport import PassengerReportWriter, report_basename
+from Replications import confidence_interval
+
+# Columnas de los CSV de pasajeros (ver PassengerReportWriter) y su nombre en los arreglos
+CSV_COLUMNS = dict(zip(PassengerReportWriter.CSV_HEADERS, PassengerReportWriter.COLUMNS))
+
+
+def read_report_csv(filename):
+    """
+    Lee un CSV de pasajeros en una sola pasada vectorizada (numpy.loadtxt) y retorna un diccionario
+    nombre de columna -> arreglo. Las celdas vacías (estaciones desplazadas de reportes antiguos con
+    estaciones fuera de la lista L6) quedan en -1.
+    """
+    with open(filename, encoding='utf-8') as csvfile:
+        headers = csvfile.readline().strip().split(',')
+    names = [CSV_COLUMNS.get(header, header) for header in headers]
+    with warnings.catch_warnings():
+        # Un reporte sin pasajeros (solo encabezado) es válido
+        warnings.simplefilter('ignore', UserWarning)
+        try:
+            data = np.loadtxt(filename, delimiter=',', skiprows=1, ndmin=2, encoding='utf-8')
+        except ValueError:
+            data = np.genfromtxt(filename, delimiter=',', skip_header=1, filling_values=-1, ndmin=2, encoding='utf-8')
+    data = data.reshape(-1, len(names))
+
+    columns = {}
+    for i, name in enumerate(names):
+        dtype = PassengerReportWriter.COLUMNS.get(name, np.float64)
+        columns[name] = data[:, i].astype(dtype)
+    return columns
+
+
+def load_report(filename, use_cache=True):
+    """
+    Carga un reporte de pasajeros como diccionario nombre de columna -> arreglo. Si junto al CSV hay un
+    .npz igual o más reciente (el que escribe PassengerReportWriter o la copia binaria de una lectura
+    anterior), se lee ese; si no, se lee el CSV y se guarda su copia .npz para las próximas cargas.
+
+    Parámetros:
+        filename: Ruta del reporte (.csv o .npz, o sin extensión).
+        use_cache: Si es False, se lee siempre el CSV y no se escribe la copia binaria.
+    """
+    basename = report_basename(filename)
+    csv_path = f"{basename}.csv"
+    npz_path = f"{basename}.npz"
+    has_csv = os.path.exists(csv_path)
+    if os.path.exists(npz_path) and (not has_csv or (use_cache and os.path.getmtime(npz_path) >= os.path.getmtime(csv_path))):
+        with np.load(npz_path) as data:
+            return {name: data[name] for name in data.files if name != 'station_names'}
+
+    columns = read_report_csv(csv_path)
+    if use_cache:
+        np.savez(npz_path, **columns)
+    return columns
+
+
+def find_reports(paths, report='passenger_report'):
+    """
+    Retorna las rutas (sin extensión) de los reportes con el nombre dado dentro de las rutas entregadas.
+    Los directorios se recorren recursivamente (por ejemplo, el directorio de un barrido con sus
+    subdirectorios run_0000, run_0001, ...); los archivos se incluyen tal cual.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    reports = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirectories, files in os.walk(path):
+                subdirectories.sort()
+                if f"{report}.csv" in files or f"{report}.npz" in files:
+                    reports.append(os.path.join(directory, report))
+        else:
+            reports.append(report_basename(path))
+    return list(dict.fromkeys(reports))
+
+
+class ReportAnalysis:
+    """
+    Análisis de uno o varios reportes de pasajeros (por ejemplo, todas las corridas de un barrido).
+    Los reportes se cargan una vez como columnas de NumPy concatenadas, con una columna run que indica
+    de qué archivo viene cada pasajero, y las distribuciones se calculan con operaciones vectorizadas
+    (bincount, histogram). Los gráficos son opcionales y matplotlib se importa solo al graficar.
+    """
+
+    def __init__(self, columns, sources):
+        """
+        Parámetros:
+            columns: Diccionario nombre de columna -> arreglo concatenado de todos los reportes,
+                incluida la columna run (índice del reporte en sources).
+            sources: Rutas de los reportes cargados.
+        """
+        self.columns = columns
+        self.sources = sources
+
+    @classmethod
+    def from_files(cls, paths, report='passenger_report', workers=1, use_cache=True):
+        """
+        Carga los reportes encontrados en las rutas dadas (ver find_reports).
+
+        Parámetros:
+            paths: Ruta o lista de rutas de reportes o directorios.
+            report: Nombre del reporte: 'passenger_report' o 'fail_passenger_report'.
+            workers: Número de procesos para leer los reportes (None usa os.cpu_count()).
+            use_cache: Ver load_report.
+        """
+        sources = find_reports(paths, report)
+        if workers == 1 or len(sources) < 2:
+            reports = [load_report(source, use_cache) for source in sources]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                reports = list(executor.map(load_report, sources, [use_cache] * len(sources)))
+
+        # Se conservan las columnas presentes en todos los reportes (los CSV antiguos tienen menos columnas)
+        columns = {}
+        for name, dtype in PassengerReportWriter.COLUMNS.items():
+            if all(name in report_columns for report_columns in reports):
+                columns[name] = np.concatenate([report_columns[name] for report_columns in reports] + [np.zeros(0, dtype=dtype)])
+        sizes = [len(report_columns['travel_time']) for report_columns in reports]
+        columns['run'] = np.repeat(np.arange(len(reports)), sizes).astype(np.int64)
+        return cls(columns, sources)
+
+    def __len__(self):
+        return len(self.columns['run'])
+
+    # Distributions
+    def station_distribution(self):
+        """Retorna (estaciones desplazadas, número de pasajeros) para cada cantidad de estaciones desplazadas."""
+        differences = self.columns['station_difference']
+        counts = np.bincount(differences[differences >= 0])
+        stations = np.flatnonzero(counts)
+        return stations, counts[stations]
+
+    def travel_time_by_stations(self):
+        """Retorna (estaciones desplazadas, tiempo de viaje promedio) para cada cantidad de estaciones desplazadas."""
+        differences = self.columns['station_difference']
+        known = differences >= 0
+        counts = np.bincount(differences[known])
+        sums = np.bincount(differences[known], weights=self.columns['travel_time'][known])
+        stations = np.flatnonzero(counts)
+        return stations, sums[stations] / counts[stations]
+
+    def move_histogram(self, bins=20):
+        """Retorna (conteos, bordes de los intervalos) del histograma de metros desplazados."""
+        return np.histogram(self.columns['move_count'], bins=bins)
+
+    def distributions(self, bins=20):
+        """Calcula de una vez las tres distribuciones y las retorna en un diccionario."""
+        return {
+            'station_distribution': self.station_distribution(),
+            'travel_time_by_stations': self.travel_time_by_stations(),
+            'move_histogram': self.move_histogram(bins),
+        }
+
+    # Grouped Statistics
+    def run_statistics(self):
+        """
+        Retorna un diccionario métrica -> arreglo con un valor por reporte: número de pasajeros, tiempo
+        de viaje promedio y mediano, metros desplazados promedio y tiempo de espera promedio en el andén.
+        """
+        runs = self.columns['run']
+        number_of_runs = len(self.sources)
+        counts = np.bincount(runs, minlength=number_of_runs)
+        safe_counts = np.maximum(counts, 1)
+        travel_times = self.columns['travel_time']
+
+        # Medianas por corrida: ordenar por (corrida, tiempo) y tomar el centro de cada tramo
+        order = np.lexsort((travel_times, runs))
+        sorted_times = travel_times[order].astype(float)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        lower = sorted_times[np.minimum(starts + (counts - 1) // 2, max(len(sorted_times) - 1, 0))] if len(sorted_times) else np.zeros(number_of_runs)
+        upper = sorted_times[np.minimum(starts + counts // 2, max(len(sorted_times) - 1, 0))] if len(sorted_times) else np.zeros(number_of_runs)
+        medians = np.where(counts > 0, (lower + upper) / 2, np.nan)
+
+        statistics = {
+            'passengers': counts,
+            'average_travel_time': np.bincount(runs, weights=travel_times, minlength=number_of_runs) / safe_counts,
+            'median_travel_time': medians,
+            'average_move_distance': np.bincount(runs, weights=self.columns['move_count'], minlength=number_of_runs) / safe_counts,
+        }
+        if 'waiting_time' in self.columns:
+            statistics['average_waiting_time'] = np.bincount(runs, weights=self.columns['waiting_time'], minlength=number_of_runs) / safe_counts
+        return statistics
+
+    def summary(self, confidence=0.95):
+        """
+        Resume las métricas por corrida entre corridas: retorna un diccionario métrica ->
+        {'mean', 'half_width', 'lower', 'upper', 'runs'} (ver Replications.confidence_interval).
+        """
+        summary = {}
+        for metric, values in self.run_statistics().items():
+            values = values[~np.isnan(values)].tolist() if values.dtype.kind == 'f' else values.tolist()
+            if not values:
+                continue
+            mean, half_width, lower, upper = confidence_interval(values, confidence)
+            summary[metric] = {'mean': mean, 'half_width': half_width, 'lower': lower, 'upper': upper, 'runs': len(values)}
+        return summary
+
+    # Plotting
+    def plot_station_distribution(self, ax=None, ylabel="Número de pasajeros fallidos",
+                                  title="Distribución de pasajeros fallidos por estaciones desplazadas"):
+        """Grafica en barras el número de pasajeros por estaciones desplazadas."""
+        import matplotlib.pyplot as plt
+        ax = ax or plt.figure(figsize=(8, 6)).gca()
+        stations, counts = self.station_distribution()
+        ax.bar(stations, counts, color='salmon', edgecolor='black')
+        ax.set_xlabel("Estaciones desplazadas")
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        ax.set_xticks(stations)
+        return ax
+
+    def plot_travel_time_by_stations(self, ax=None):
+        """Grafica en barras el tiempo de viaje promedio por estaciones desplazadas."""
+        import matplotlib.pyplot as plt
+        ax = ax or plt.figure(figsize=(8, 6)).gca()
+        stations, averages = self.travel_time_by_stations()
+        ax.bar(stations, averages, color='orchid', edgecolor='black')
+        ax.set_xlabel("Estaciones desplazadas")
+        ax.set_ylabel("Tiempo de viaje promedio (segundos)")
+        ax.set_title("Tiempo promedio de viaje por estaciones desplazadas")
+        ax.set_xticks(stations)
+        return ax
+
+    def plot_move_distribution(self, ax=None, bins=20):
+        """Grafica el histograma de metros desplazados por pasajero."""
+        import matplotlib.pyplot as plt
+        ax = ax or plt.figure(figsize=(8, 6)).gca()
+        counts, edges = self.move_histogram(bins)
+        ax.stairs(counts, edges, fill=True, color='skyblue', edgecolor='black')
+        ax.set_xlabel("Metros desplazados")
+        ax.set_ylabel("Número de pasajeros")
+        ax.set_title("Distribución de metros recorridos por pasajeros")
+        return ax
+
+
+if __name__ == '__main__':
+    # Uso: python ReportAnalysis.py [reportes o directorios ...] (por defecto, el directorio actual)
+    paths = sys.argv[1:] or ['.']
+    passengers = ReportAnalysis.from_files(paths, 'passenger_report', workers=None)
+    failed = ReportAnalysis.from_files(paths, 'fail_passenger_report', workers=None)
+    print(f"{len(passengers.sources)} reportes, {len(passengers)} pasajeros llegados y {len(failed)} fallidos")
+
+    print("Distribución de pasajeros fallidos por estaciones desplazadas:")
+    for stations, count in zip(*failed.station_distribution()):
+        print(f"Estaciones desplazadas: {stations}, Pasajeros fallidos: {count}")
+    if len(passengers.sources) > 1:
+        for metric, values in passengers.summary().items():
+            print(f"{metric}: {values['mean']:.2f} ± {values['half_width']:.2f} (IC 95%, {values['runs']} corridas)")
+
+    import matplotlib.pyplot as plt
+    failed.plot_station_distribution()
+    passengers.plot_travel_time_by_stations()
+    passengers.plot_move_distribution()
+    plt.show()
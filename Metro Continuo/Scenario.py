@@ -0,0 +1,179 @@
+import random
+from Demand import DemandProfile
+from RandomStreams import RandomStreams
+from Simulator import Simulator
+from Station import Station
+
+# =============================================================================
+# ESCENARIO L6
+# =============================================================================
+
+# Matriz real de flujos de pasajeros (filas: estación de origen, columnas: estación de destino)
+L6_PASSENGER_FLOWS = [
+    [0,   106, 28, 84, 76, 81, 185, 81, 68, 51],
+    [40,  0,   22, 20, 26, 38, 68,  24, 25, 32],
+    [19,  51,  0,  11, 21, 18, 33,  22, 23, 37],
+    [139, 152, 44, 0,  16, 34, 55,  44, 27, 40],
+    [64,  67,  18, 4,  0,  16, 26,  14, 11, 20],
+    [162, 180, 29, 29, 22, 0, 38,  63, 54, 102],
+    [132, 169, 48, 24, 27, 42, 0,   12, 21, 30],
+    [179, 191, 72, 47, 58, 91, 24,  0,  34, 73],
+    [199, 238, 61, 45, 75, 63, 53,  35, 0,  45],
+    [193, 172, 106,99, 68, 168,115, 139, 58, 0],
+]
+
+# Perfil diario ilustrativo de la demanda: factor de la matriz de flujos en cada hora del día (desde
+# las 00:00), con punta mañana y punta tarde. Se usa en intervalos de 15 minutos (DAY_DEMAND_FACTORS).
+HOURLY_DEMAND_FACTORS = [
+    0.05, 0.02, 0.02, 0.02, 0.05, 0.2, 0.6, 1.0, 0.9, 0.6, 0.45, 0.45,
+    0.5, 0.55, 0.5, 0.5, 0.6, 0.85, 1.0, 0.8, 0.5, 0.35, 0.2, 0.1,
+]
+DAY_DEMAND_FACTORS = [factor for factor in HOURLY_DEMAND_FACTORS for _ in range(4)]
+
+# Estaciones reales para la línea L6: (nombre, posición)
+L6_STATIONS = [
+    ('Cerrillos', 1670),
+    ('Lo Valledor', 3340),
+    ('Pedro Aguirre Cerda', 5010),
+    ('Franklin L6', 6680),
+    ('Bio Bio', 8350),
+    ('Nuble L6', 10020),
+    ('Estadio Nacional', 11690),
+    ('Nunoa L6', 13360),
+    ('Ines de Suarez', 15030),
+    ('Los Leones L6', 16700),
+]
+
+# Parámetros por defecto de la simulación (los mismos de main.py)
+DEFAULT_CONFIG = {
+    'number_of_trains': 5,
+    'number_of_wagons': 5,
+    'speed_km_h': 50,
+    'simulator_time': 3600,  # Tiempo total de simulación en segundos
+    'acceleration': 1,
+    'deceleration': 1,
+    'interval': 1,  # Factor para acelerar el tiempo de la animación
+    'wagon_length_m': 14,
+    'wagon_width_m': 5,
+    'station_capacity': 500,
+    'passenger_per_meter': 5,
+    'random_stations': None,  # Número de estaciones con flujos aleatorios; None usa las estaciones L6
+    'demand_multiplier': 1,  # Factor que multiplica los flujos de pasajeros de todas las estaciones
+    'demand_factors': None,  # Factores por intervalo de 15 minutos de la demanda (ej. DAY_DEMAND_FACTORS); None la deja constante
+    'engine': 'tick',  # 'tick' (Simulator) o 'event' (EventSimulator)
+}
+
+
+def scale_flows(passenger_flows, demand_multiplier):
+    """Retorna la fila o matriz de flujos multiplicada por demand_multiplier (la misma si el factor es 1)."""
+    if demand_multiplier == 1:
+        return passenger_flows
+    return [scale_flows(flows, demand_multiplier) if isinstance(flows, list) else flows * demand_multiplier for flows in passenger_flows]
+
+
+def create_l6_stations(wagon_length_m, wagon_width_m, station_capacity, passenger_per_meter, passenger_flows=None, demand_multiplier=1):
+    """
+    Crea las estaciones reales de la línea L6 con la matriz de flujos dada (por defecto, L6_PASSENGER_FLOWS)
+    multiplicada por demand_multiplier.
+    """
+    passenger_flows = scale_flows(passenger_flows or L6_PASSENGER_FLOWS, demand_multiplier)
+    return [
+        Station(name=name, position=position, wagon_length_m=wagon_length_m, wagon_width_m=wagon_width_m,
+                station_capacity=station_capacity, passenger_flows=passenger_flows[i],
+                passenger_per_meter=passenger_per_meter)
+        for i, (name, position) in enumerate(L6_STATIONS)
+    ]
+
+
+def create_stations(stations_number, wagon_length_m, wagon_width_m, station_capacity, passenger_per_meter, rng=None, demand_multiplier=1):
+    """
+    Crea estaciones equiespaciadas (cada 2000 metros) con flujos aleatorios entre 100 y 200 pasajeros por hora,
+    sorteados con el generador rng (numpy.random.Generator) o, si es None, con el módulo random, y
+    multiplicados por demand_multiplier.
+    """
+    stations = []
+    for s in range(1, stations_number + 1):
+        flows = [(random.randint(100, 200) if rng is None else int(rng.integers(100, 201))) if i != s - 1 else 0
+                 for i in range(stations_number)]
+        station = Station(name=f"Station {s}", position=s * 2000, wagon_length_m=wagon_length_m,
+                          wagon_width_m=wagon_width_m, station_capacity=station_capacity,
+                          passenger_flows=scale_flows(flows, demand_multiplier), passenger_per_meter=passenger_per_meter)
+        stations.append(station)
+    return stations
+
+
+def build_simulator(**overrides):
+    """
+    Construye un simulador nuevo (con estaciones nuevas) a partir de DEFAULT_CONFIG y los parámetros dados.
+    Calcula, igual que main.py, el límite de posición (última estación + 200 metros) y el tiempo de
+    creación de pasajeros (lo que tarda un tren en llegar a la última estación), que se suma al tiempo de simulación.
+
+    Parámetros:
+        overrides: Valores que reemplazan a los de DEFAULT_CONFIG. Además se aceptan passenger_flows
+            (matriz de flujos para las estaciones L6), seed (semilla raíz de RandomStreams, que también
+            sortea los flujos de las estaciones aleatorias), demand_multiplier (factor de los flujos de todas
+            las estaciones), demand (DemandProfile con las matrices de cada intervalo, también multiplicada
+            por demand_multiplier) y cualquier argumento opcional del simulador
+            (compact_passengers, boarding_rate, boarding_policy, ...). Con demand_factors y sin demand, la
+            demanda es la matriz de flujos de las estaciones multiplicada por cada factor (ver Demand.py).
+    """
+    config = dict(DEFAULT_CONFIG)
+    config.update(overrides)
+    random_streams = RandomStreams(config.pop('seed', None))
+    wagon_length_m = config.pop('wagon_length_m')
+    wagon_width_m = config.pop('wagon_width_m')
+    station_capacity = config.pop('station_capacity')
+    passenger_per_meter = config.pop('passenger_per_meter')
+    random_stations = config.pop('random_stations')
+    passenger_flows = config.pop('passenger_flows', None)
+    demand_multiplier = config.pop('demand_multiplier')
+    demand_factors = config.pop('demand_factors')
+    demand = config.pop('demand', None)
+
+    if random_stations:
+        stations = create_stations(random_stations, wagon_length_m, wagon_width_m, station_capacity, passenger_per_meter, random_streams.get('scenario'), demand_multiplier)
+    else:
+        stations = create_l6_stations(wagon_length_m, wagon_width_m, station_capacity, passenger_per_meter, passenger_flows, demand_multiplier)
+
+    if demand is not None:
+        demand = demand.scaled(demand_multiplier) if demand_multiplier != 1 else demand
+    elif demand_factors is not None:
+        demand = DemandProfile.from_factors([station.passenger_flows for station in stations], demand_factors)
+
+    speed_m_s = config.pop('speed_km_h') * 1000 / 3600
+
+    # Calcular el límite de posición (para definir el final del trayecto)
+    position_limit = max(station.position for station in stations) + 200
+
+    # Calcular el momento de la creacion de pasajeros para no sobrecargar al primer tren.
+    position = max(station.position for station in stations)
+    passenger_creation_time = position / speed_m_s
+    simulator_time_with_passenger_creation_time = int(config.pop('simulator_time') + passenger_creation_time)
+
+    engine = config.pop('engine')
+    if engine == 'event':
+        from EventSimulator import EventSimulator
+        simulator_class = EventSimulator
+    elif engine == 'tick':
+        simulator_class = Simulator
+    else:
+        raise ValueError(f"Motor de simulación desconocido: {engine}. Opciones: tick, event")
+
+    return simulator_class(
+        speed_m_s,
+        config.pop('number_of_trains'),
+        config.pop('number_of_wagons'),
+        wagon_length_m,
+        wagon_width_m,
+        simulator_time_with_passenger_creation_time,
+        stations,
+        config.pop('acceleration'),
+        config.pop('deceleration'),
+        position_limit,
+        config.pop('interval'),
+        passenger_per_meter,
+        passenger_creation_time,
+        seed=random_streams.root,
+        demand=demand,
+        **config
+    )
@@ -1,23 +1,33 @@
-import csv
+import math
+import os
 import statistics
-from matplotlib import pyplot as plt
-from matplotlib.animation import FuncAnimation
+from collections import Counter
 import numpy as np
 from Train import Train
 from Wagon import Wagon
-from random import choice
-import random
+from PassengerTable import PassengerTable
+from PassengerReport import PassengerReportWriter, report_basename
+from Trajectory import TrajectoryRecorder
+from CrossingIndex import CrossingIndex
+from MovementKernel import MovementKernel
+from BoardingPolicy import get_boarding_policy
+from RandomStreams import RandomStreams
+from Profiler import PhaseProfiler
 
 class Simulator:
     """
-    Simula el funcionamiento de un sistema ferroviario, gestionando trenes, estaciones, pasajeros
-    y la animación de la simulación.
+    Simula el funcionamiento de un sistema ferroviario, gestionando trenes, estaciones y pasajeros.
+    La animación es opcional y se delega a los renderizadores de Renderer.py, de modo que
+    una ejecución sin animación no importa matplotlib.
     """
 
-    def __init__(self, speed, number_of_trains, number_of_wagons, wagon_length_m, wagon_width_m, simulator_time, stations, acceleration, deceleration, position_limit, interval, passenger_per_meter, passenger_creation_time):
+    # Fases de update que mide el profiler (ver el parámetro profile)
+    PROFILE_PHASES = ('train_coordinates', 'passenger_movement', 'coupling_crossings', 'station_wagons', 'passenger_creation', 'decoupling')
+
+    def __init__(self, speed, number_of_trains, number_of_wagons, wagon_length_m, wagon_width_m, simulator_time, stations, acceleration, deceleration, position_limit, interval, passenger_per_meter, passenger_creation_time, compact_passengers=False, record_trajectories=False, trajectory_directory=None, boarding_rate=6, boarding_policy='random', seed=None, vectorized_movement=False, report_formats=('csv',), profile=False, profile_csv=False, demand=None):
         
         """
-        Inicializa la simulación configurando trenes, estaciones y parámetros de animación.
+        Inicializa la simulación configurando trenes, estaciones y puntos de interés.
 
         Parámetros:
             speed: Velocidad de los trenes.
@@ -33,6 +43,29 @@ class Simulator:
             interval: Intervalo de tiempo entre actualizaciones de la animación.
             passenger_per_meter: Capacidad de pasajeros por metro en el vagón.
             passenger_creation_time: Tiempo de "precalentamiento" en la creacion de pasajeros.
+            compact_passengers: Si es True, los pasajeros que terminan su viaje se archivan en una
+                PassengerTable (columnas de NumPy) en lugar de mantenerse como objetos en las estaciones.
+            record_trajectories: Si es True, se registra la historia completa de posiciones de trenes
+                y vagones en un TrajectoryRecorder. Si es False, solo se conservan las últimas posiciones.
+            trajectory_directory: Directorio donde guardar las posiciones registradas como archivos .npy
+                mapeados en memoria. Si es None, el registro se mantiene en memoria.
+            boarding_rate: Número máximo de pasajeros que abordan un vagón detenido en cada segundo.
+            boarding_policy: Política para elegir a los pasajeros del andén que abordan: 'random' (por defecto),
+                'fifo', 'destination_first' o un objeto con método select (ver BoardingPolicy.py).
+            seed: Semilla raíz (entero o numpy.random.SeedSequence) de los generadores aleatorios de la
+                simulación (ver RandomStreams.py). Si es None, se usa entropía del sistema y queda en self.seed.
+            vectorized_movement: Si es True, el movimiento de pasajeros dentro de los trenes se calcula con
+                MovementKernel (NumPy, todos los pasajeros de todos los trenes a la vez, con el mismo resultado
+                que el recorrido pasajero a pasajero) en lugar de ese recorrido.
+            report_formats: Formatos de los reportes de pasajeros: 'csv' y/o 'npz' (columnas de NumPy).
+            profile: Si es True, mide el tiempo y los elementos procesados de cada fase de la simulación,
+                por tick, tren y estación (ver Profiler.PhaseProfiler); el resumen se imprime con el reporte
+                y queda disponible en profile_summary().
+            profile_csv: Si es True (y profile también), generate_report escribe además profile_ticks.csv
+                con el tiempo de cada fase en cada tick.
+            demand: DemandProfile (ver Demand.py) con matrices origen-destino por intervalo de tiempo. Si se
+                entrega, las llegadas de toda la corrida se sortean antes de empezar y se consumen con un
+                cursor; si es None, cada estación genera pasajeros con su flujo constante en cada tick.
         """
         
         self.speed = speed
@@ -48,39 +81,33 @@ class Simulator:
         self.position_limit = position_limit
         self.interval = interval
         self.passenger_creation_time = passenger_creation_time
+        self.demand = demand
+        self.current_tick = 0
+        # Primer paso que falta ejecutar (distinto de 0 al continuar desde un checkpoint)
+        self.next_frame = 0
+        self.boarding_rate = boarding_rate
+        self.report_formats = tuple(report_formats)
+        self.boarding_policy = get_boarding_policy(boarding_policy)
+        self.random_streams = RandomStreams(seed)
+        self.seed = self.random_streams.entropy
+        self.boarding_distances = [
+            [math.sqrt(row**2 + (col - (wagon_length_m / 2))**2) for col in range(int(wagon_length_m))]
+            for row in range(int(wagon_width_m))
+        ]
+        self.passenger_table = PassengerTable(stations) if compact_passengers else None
+        self.movement_kernel = self.create_movement_kernel(passenger_per_meter) if vectorized_movement else None
 
         self.initialize_station_points()
         self.assign_stations_to_wagons()
+        self.initialize_passenger_creation()
 
-        # Configuración de la animación
-
-        self.fig, self.ax = plt.subplots()
-        self.ax.set_xlim(0, self.simulator_time)
-        self.ax.set_ylim(0, self.position_limit)
-
-        x_range = self.ax.get_xlim()[1] - self.ax.get_xlim()[0]
-        y_range = self.ax.get_ylim()[1] - self.ax.get_ylim()[0]
-
-        constant = 10000
-        self.marker_size = constant / min(x_range, y_range)
-
-        # Inicialización de los scatters para trenes y vagones
-
-        self.train_scatters = [self.ax.plot([], [], 'bo', markersize=self.marker_size/2)[0] for _ in self.trains]
-        self.wagon_scatters = {train: [self.ax.plot([], [], 'ro', markersize=self.marker_size/2)[0] for _ in train.wagons] for train in self.trains}
-
-        self.decoupled_wagon_scatters = {station: [] for station in self.stations}
-        self.passenger_texts = []
+        self.trajectory_recorder = None
+        if record_trajectories or trajectory_directory is not None:
+            wagons = [wagon for train in self.trains for wagon in train.wagons] + [wagon for station in self.stations for wagon in station.wagons]
+            self.trajectory_recorder = TrajectoryRecorder(simulator_time, self.trains, wagons, trajectory_directory)
 
-        for station in self.stations:
-            self.ax.axhline(y=station.position, color='gray', linestyle='--', lw=1)
-            passenger_text = self.ax.text(self.simulator_time * 0.95, station.position, f"{station.name}: 0", va='center', ha='right')
-            self.passenger_texts.append(passenger_text)
-
-            if station.decoupling_point is not None:
-                self.ax.axhline(y=station.decoupling_point, color='red', linestyle='-', lw=1, label='Decoupling Point' if station == self.stations[0] else "")
-            if station.coupling_point is not None:
-                self.ax.axhline(y=station.coupling_point, color='green', linestyle='-', lw=1, label='Coupling Point' if station == self.stations[0] else "")
+        self.profile_csv = profile_csv
+        self.profiler = PhaseProfiler(self.PROFILE_PHASES, simulator_time, len(self.trains), len(stations)) if profile else None
 
     # Train and Wagon Creation
     def create_trains(self, number_of_trains, number_of_wagons, wagon_length_m, wagon_width_m, headway, passenger_per_meter):
@@ -94,6 +121,15 @@ class Simulator:
             trains.append(Train(wagons, headway * i, False, passenger_per_meter))
         return trains
 
+    def create_movement_kernel(self, passenger_per_meter):
+        """
+        Crea un MovementKernel compartido por todos los trenes, que update avanza una vez por paso.
+        """
+        kernel = MovementKernel(self.trains, passenger_per_meter)
+        for train in self.trains:
+            train.movement_kernel = kernel
+        return kernel
+
     def assign_stations_to_wagons(self):
         """
         Asigna a cada vagón de cada tren una estación de destino de forma cíclica,
@@ -104,16 +140,23 @@ class Simulator:
             for i, wagon in enumerate(reversed(train.wagons)):
                 station_index = i % num_stations
                 wagon.assigned_station = self.stations[station_index]
+            train.rebuild_station_index()
 
 
     # Station Initialization
     def initialize_station_points(self):
         """
-        Inicializa los puntos de interés de cada estación.
+        Inicializa los puntos de interés de cada estación y los índices ordenados de puntos
+        de desacople y de inicio de acople usados para detectar cruces con búsqueda binaria.
         """
         for station in self.stations:
             self.station_add_points(station)
 
+        self.decoupling_index = CrossingIndex((station.decoupling_point, station) for station in self.stations)
+        self.coupling_index = CrossingIndex((station.start_wagon_for_coupling_point, station) for station in self.stations)
+        self.coupling_crossings = Counter()
+        self.train_coupling_stations = {}
+
     def station_add_points(self, station):
         """
         Calcula y asigna a la estación sus puntos de desacople, acople y el inicio del acople.
@@ -128,6 +171,31 @@ class Simulator:
         station.set_start_wagon_for_coupling_point(start_wagon_for_coupling_point)
 
     
+    def initialize_passenger_creation(self):
+        """
+        Precalcula las tasas de llegada de todas las estaciones y sus distribuciones acumuladas
+        de destino apiladas en un solo arreglo: la distribución de la estación s se desplaza en s,
+        de modo que sumar s a un número uniforme y hacer una sola búsqueda binaria entrega el destino
+        de los pasajeros de todas las estaciones a la vez.
+        Cada estación recibe además su propio generador, que usa Station.create_passenger.
+        Con una demanda variable (self.demand), las llegadas de todos los ticks desde el primero con
+        creación de pasajeros se compilan en self.arrival_schedule con los mismos generadores.
+        """
+        for station_index, station in enumerate(self.stations):
+            station.rng = self.random_streams.get('station', station_index)
+        self.arrival_schedule = None
+        if self.demand is not None:
+            if self.demand.number_of_stations != len(self.stations):
+                raise ValueError(f"La demanda tiene {self.demand.number_of_stations} estaciones y la simulación {len(self.stations)}")
+            self.arrival_schedule = self.demand.compile(
+                math.ceil(self.passenger_creation_time), self.simulator_time,
+                self.random_streams.get('arrivals'), self.random_streams.get('destinations')
+            )
+        self.passenger_creation_rates = np.array([station.passenger_creation for station in self.stations], dtype=float)
+        self.stacked_destination_cdf = np.concatenate([
+            station.destination_cdf + station_index for station_index, station in enumerate(self.stations)
+        ]) if self.stations else np.zeros(0)
+
     # Mathematical Calculations
     def calculate_distance(self, speed, time):
         """
@@ -195,7 +263,8 @@ class Simulator:
     def handle_decoupling_event(self, train, train_index):
         """
         Maneja el evento de desacople: si el último vagón del tren cruza el punto de desacople de alguna estación,
-        se desacopla y se asigna a la estación correspondiente.
+        se desacopla y se asigna a la estación correspondiente. Las estaciones cruzadas se obtienen
+        con una búsqueda binaria en el índice de puntos de desacople.
         """
         if len(train.positions) < 2 or train.positions[-1] == 0 or not train.wagons:
             return
@@ -207,14 +276,11 @@ class Simulator:
         if current_position < previous_position:
             return
 
-        for station in self.stations:
-            if station.decoupling_point is None:
-                continue
-            if previous_position < station.decoupling_point <= current_position:
-                train.wagons.pop()
-                last_wagon.state = 1
-                last_wagon.train_index = train_index
-                station.wagons.append(last_wagon)
+        for station in self.decoupling_index.crossed(previous_position, current_position):
+            train.pop_last_wagon()
+            last_wagon.state = 1
+            last_wagon.train_index = train_index
+            station.add_wagon(last_wagon)
 
     def handle_moving_events(self, wagon):
         """
@@ -245,65 +311,102 @@ class Simulator:
         - Incorpora nuevos pasajeros si hay espacio.
         - Verifica si se ha alcanzado el punto de acople para iniciar la aceleración.
         """
-        for station in self.stations:
-            if wagon in station.wagons:
-                self.wait(wagon)
-                self.handle_alighting_passengers(wagon, station)
-                self.handle_boarding_passengers(wagon, station)
-                self.check_coupling_point(wagon, station)
-                break
+        station = wagon.current_station
+        if station is not None:
+            self.wait(wagon)
+            self.handle_alighting_passengers(wagon, station)
+            self.handle_boarding_passengers(wagon, station)
+            self.check_coupling_point(wagon, station)
 
     def handle_alighting_passengers(self, wagon, station):
         """
-        Procesa el descenso de pasajeros:
+        Procesa el descenso de pasajeros en una sola pasada sobre el vagón:
           - Los pasajeros cuyo destino es la estación bajan y se agregan a arrived_passengers.
           - Los demás, que fallan al bajar, se agregan a fail_passengers_arrived.
+          - Los que subieron recientemente permanecen en el vagón.
+        """
+        staying_passengers = []
+        for passenger in wagon.passengers:
+            if passenger.boarded_recently:
+                staying_passengers.append(passenger)
+                continue
+            passenger.alight(self.current_tick)
+            if passenger.end_station == station:
+                self.record_arrived_passenger(passenger, station)
+            else:
+                self.record_failed_passenger(passenger, station)
+
+        if len(staying_passengers) != len(wagon.passengers):
+            wagon.replace_passengers(staying_passengers)
+
+    def record_arrived_passenger(self, passenger, station):
         """
-        passengers_to_arrive = [p for p in wagon.passengers if p.end_station == station and not p.boarded_recently]
-        for passenger in passengers_to_arrive:
-            wagon.passengers.remove(passenger)
+        Registra a un pasajero que bajó en su estación de destino, ya sea en la lista
+        arrived_passengers de la estación o en la tabla compacta de pasajeros.
+        """
+        if self.passenger_table is not None:
+            self.passenger_table.add(passenger, PassengerTable.ARRIVED, station)
+        else:
             station.arrived_passengers.append(passenger)
 
-        passengers_failed_to_arrive = [p for p in wagon.passengers if p.end_station != station and not p.boarded_recently]
-        for passenger in passengers_failed_to_arrive:
-            wagon.passengers.remove(passenger)
+    def record_failed_passenger(self, passenger, station):
+        """
+        Registra a un pasajero que tuvo que bajar en una estación distinta a su destino, ya sea
+        en la lista fail_passengers_arrived de la estación o en la tabla compacta de pasajeros.
+        """
+        if self.passenger_table is not None:
+            self.passenger_table.add(passenger, PassengerTable.FAILED, station)
+        else:
             station.fail_passengers_arrived.append(passenger)
 
     def handle_boarding_passengers(self, wagon, station):
         """
         Incorpora pasajeros al vagón si está en estado de espera y hay espacio disponible.
-        Selecciona hasta 6 pasajeros de forma aleatoria para transferirlos al vagón.
+        Selecciona hasta boarding_rate pasajeros del andén según la política de abordaje
+        y los ubica en el vagón en un solo lote.
         """
         if wagon.state == 2 and station.passengers:
             available_space = wagon.wagon_space_for_passenger - len(wagon.passengers)
             if available_space > 0:
-                num_passengers_to_transfer = min(6, len(station.passengers), available_space)
-                for _ in range(num_passengers_to_transfer):
-                    passenger = random.choice(station.passengers)
-                    station.passengers.remove(passenger)
+                num_passengers_to_transfer = min(self.boarding_rate, len(station.passengers), available_space)
+                boarding_passengers = self.boarding_policy.select(station.passengers, num_passengers_to_transfer, self.get_next_assigned_station(wagon), self.random_streams.get('boarding'))
+                for passenger in boarding_passengers:
+                    passenger.board(self.current_tick)
                     passenger.current_wagon = wagon
                     passenger.current_train = None
-                    self.add_passenger_to_ordered_position(wagon, passenger)
+                self.add_passengers_to_ordered_positions(wagon, boarding_passengers)
+                for passenger in boarding_passengers:
                     passenger.boarded_recently = True
 
     def check_coupling_point(self, wagon, station):
         """
-        Verifica si se ha alcanzado el punto de acople para iniciar la aceleración del vagón.
+        Verifica si se ha alcanzado el punto de acople para iniciar la aceleración del vagón, es decir,
+        si algún tren cruzó en este paso el punto de inicio de acople de la estación.
         Si es así, registra el tiempo de espera, cambia el estado del vagón y actualiza la bandera de los pasajeros.
         """
-        if station.start_wagon_for_coupling_point is not None:
-            for train in self.trains:
-                if len(train.positions) >= 2:
-                    previous_position = train.positions[-2]
-                    current_position = train.positions[-1]
-                    if previous_position <= station.start_wagon_for_coupling_point <= current_position:
-                        wagon.waiting_time_list.append(wagon.waiting_time)
-                        wagon.waiting_time = 0
-                        wagon.state = 3
-                        self.add_wagon_to_accelerate.append(wagon)
-                        for passenger in wagon.passengers:
-                            passenger.boarded_recently = False
-                        break
+        if self.coupling_crossings[station] > 0:
+            wagon.waiting_time_list.append(wagon.waiting_time)
+            wagon.waiting_time = 0
+            wagon.state = 3
+            self.add_wagon_to_accelerate.append(wagon)
+            for passenger in wagon.passengers:
+                passenger.boarded_recently = False
+
+    def update_train_coupling_crossings(self, train):
+        """
+        Recalcula las estaciones cuyo punto de inicio de acople cruzó el tren en su último paso
+        (búsqueda binaria en el índice de puntos) y actualiza el conteo de trenes que cruzan
+        cada estación, que check_coupling_point consulta en O(1).
+        """
+        for station in self.train_coupling_stations.get(train, ()):
+            self.coupling_crossings[station] -= 1
+
+        crossed_stations = []
+        if len(train.positions) >= 2:
+            crossed_stations = self.coupling_index.crossed(train.positions[-2], train.positions[-1], include_start=True)
+        for station in crossed_stations:
+            self.coupling_crossings[station] += 1
+        self.train_coupling_stations[train] = crossed_stations
 
     def add_passenger_to_ordered_position(self, wagon, passenger):
         """
@@ -312,29 +415,24 @@ class Simulator:
         de lo contrario, se le ubica en las primeras. Además, se actualiza el contador de movimiento
         del pasajero en función de la distancia calculada.
         """
-        import math  # Se importa una sola vez al inicio de la función
-        width = wagon.wagon_width_m
-        length = wagon.wagon_length_m
-        max_passengers = 4
-
-        if passenger.end_station == passenger.current_wagon.assigned_station:
-            # Buscar desde la última posición hacia la primera
-            for row in range(width - 1, -1, -1):
-                for col in range(length - 1, -1, -1):
-                    if wagon.passenger_matrix[row][col] < max_passengers:
-                        wagon.add_passenger(passenger, row, col)
-                        distance = math.sqrt(row**2 + (col - (length / 2))**2)
-                        passenger.move_count += distance
-                        return
-        else:
-            # Buscar desde la primera posición hacia la última
-            for row in range(width):
-                for col in range(length):
-                    if wagon.passenger_matrix[row][col] < max_passengers:
-                        wagon.add_passenger(passenger, row, col)
-                        distance = math.sqrt(row**2 + (col - (length / 2))**2)
-                        passenger.move_count += distance
-                        return
+        self.add_passengers_to_ordered_positions(wagon, [passenger])
+
+    def add_passengers_to_ordered_positions(self, wagon, passengers):
+        """
+        Ubica un lote de pasajeros en el vagón, en orden, con la misma regla que add_passenger_to_ordered_position:
+        los que van a la estación asignada al vagón ocupan la primera celda libre desde el final de la matriz
+        y los que siguen de paso la primera celda libre desde el inicio. Las celdas libres se obtienen con los
+        cursores del vagón (Wagon.find_free_cell), sin volver a recorrer la matriz por cada pasajero.
+        Si no queda una celda con espacio, el pasajero no se ubica.
+        """
+        assigned_station = wagon.assigned_station
+        for passenger in passengers:
+            cell = wagon.find_free_cell(from_back=passenger.end_station == assigned_station)
+            if cell is None:
+                continue
+            row, col = cell
+            wagon.add_passenger(passenger, row, col)
+            passenger.move_count += self.boarding_distances[row][col]
 
     def handle_acceleration_event(self, wagon):
         """
@@ -359,17 +457,16 @@ class Simulator:
     def process_wagon_transfer(self, wagon):
         """
         Transfiere el vagón de la estación actual al siguiente tren.
-        Busca la estación en la que se encuentra el vagón, obtiene el siguiente tren,
+        Toma la estación en la que se encuentra el vagón (wagon.current_station), obtiene el siguiente tren,
         transfiere los pasajeros, remueve el vagón de la estación y asigna un nuevo tren y estación.
         """
-        for station in self.stations:
-            if wagon in station.wagons:
-                next_train = self.get_next_train_for_wagon(wagon)
-                if next_train:
-                    self.transfer_passengers_to_train(wagon, next_train)
-                    self.remove_wagon_from_station(wagon, station)
-                    self.assign_new_station_and_train(wagon, next_train)
-                break
+        station = wagon.current_station
+        if station is not None:
+            next_train = self.get_next_train_for_wagon(wagon)
+            if next_train:
+                self.transfer_passengers_to_train(wagon, next_train)
+                self.remove_wagon_from_station(wagon, station)
+                self.assign_new_station_and_train(wagon, next_train)
 
     def get_next_train_for_wagon(self, wagon):
         """
@@ -411,16 +508,17 @@ class Simulator:
         """
         Elimina el vagón de la lista de vagones de la estación.
         """
-        station.wagons.remove(wagon)
+        station.remove_wagon(wagon)
 
     def assign_new_station_and_train(self, wagon, train):
         """
         Asigna una nueva estación al vagón, lo inserta al inicio del tren y ajusta la posición del tren.
         """
         self.set_new_station_to_wagon(wagon)
-        train.wagons.insert(0, wagon)
+        train.insert_first_wagon(wagon)
         train.acquired_wagons += 1
         train.positions[-1] += wagon.wagon_length_m
+        self.update_train_coupling_crossings(train)
 
     def deceleration_wagon(self, wagon):
         """
@@ -455,6 +553,18 @@ class Simulator:
         wagon.positions.append(last_position)
 
     # Station Management
+    def get_next_assigned_station(self, wagon):
+        """
+        Retorna la estación que set_new_station_to_wagon asignaría al vagón si se acoplara ahora,
+        sin modificarlo. Retorna la estación asignada actual si no puede determinarse.
+        """
+        next_train_index = 0 if wagon.is_initial_wagon else ((wagon.train_index or 0) + 1) % len(self.trains)
+        next_train = self.trains[next_train_index]
+        if next_train.wagons and next_train.wagons[0].assigned_station in self.stations:
+            station_index = self.stations.index(next_train.wagons[0].assigned_station)
+            return self.stations[(station_index + 1) % len(self.stations)]
+        return wagon.assigned_station
+
     def set_new_station_to_wagon(self, wagon):
         """
         Asigna una nueva estación al vagón basado en la asignación del tren siguiente.
@@ -479,23 +589,41 @@ class Simulator:
                 pass
 
     # Passengers Management
-    def update_all_passengers(self, time_increment):
-        """
-        Actualiza el tiempo de viaje de todos los pasajeros, tanto en las estaciones como en los trenes,
-        incrementando su contador de tiempo en el intervalo proporcionado.
-        """
-        for station in self.stations:
-            for wagon in station.wagons:
-                for passenger in wagon.passengers:
-                    passenger.update_timer(time_increment)
-
-        for train in self.trains:
-            for wagon in train.wagons:
-                for passenger in wagon.passengers:
-                    passenger.update_timer(time_increment)
+    def create_passengers(self):
+        """
+        Crea los pasajeros de todas las estaciones en un paso: los conteos de Poisson y los destinos
+        de todas las estaciones se sortean con una sola llamada vectorizada cada uno, con los generadores
+        'arrivals' y 'destinations' de la simulación. Con una demanda variable, las llegadas del tick
+        se leen de la programación precompilada. Retorna el número de pasajeros sorteados.
+        """
+        if self.arrival_schedule is not None:
+            total = 0
+            for station_index, destination_indices in self.arrival_schedule.arrivals(self.current_tick):
+                station = self.stations[station_index]
+                if len(station.passengers) < station.station_capacity:
+                    station.add_passengers(self.stations, destination_indices, self.current_tick)
+                total += len(destination_indices)
+            return total
+
+        counts = self.random_streams.get('arrivals').poisson(self.passenger_creation_rates)
+        total = int(counts.sum())
+        if total == 0:
+            return 0
+
+        num_stations = len(self.stations)
+        origins = np.repeat(np.arange(num_stations), counts)
+        stacked_indices = np.searchsorted(self.stacked_destination_cdf, origins + self.random_streams.get('destinations').random(total), side='right')
+        destination_indices = stacked_indices - origins * num_stations
+
+        start = 0
+        for station, count in zip(self.stations, counts.tolist()):
+            if count and len(station.passengers) < station.station_capacity:
+                station.add_passengers(self.stations, destination_indices[start:start + count], self.current_tick)
+            start += count
+        return total
 
     # Print INFO
-    def generate_report(self):
+    def generate_report(self, output_directory=None, verbose=True):
         """
         Genera y muestra un reporte con la siguiente información:
           - Para cada estación:
@@ -504,40 +632,73 @@ class Simulator:
               * Número de pasajeros fallidos.
           - Al final, se muestra el total de pasajeros que se movieron (llegaron a su estación)
             durante el tiempo de simulación, expresado en horas.
+        Retorna un diccionario con las métricas del reporte (ver collect_report_metrics).
+
+        Parámetros:
+            output_directory: Directorio donde exportar los CSV de pasajeros (por defecto, el directorio actual).
+            verbose: Si es False, no se imprime el reporte en la consola.
+        """
+        metrics = self.collect_report_metrics()
+
+        if verbose:
+            print("Reporte de pasajeros en estaciones:\n")
+            for station_name, station_metrics in metrics['stations'].items():
+                print(f"Estación: {station_name}")
+                print(f"  - Número de pasajeros llegados: {station_metrics['arrived_passengers']}")
+                print(f"  - Número de pasajeros fallidos: {station_metrics['failed_passengers']}")
+                print("--------------------------------------------------")
+
+            print(f"\nPromedio global de metros movidos por pasajero: {metrics['average_move_distance']:.2f}")
+            print(f"Headway: {metrics['headway']}")
+            print(f"Mediana de tiempo de espera de los wagones: {metrics['median_waiting_time']:.2f} segundos")
+            print(f"\nEn un tiempo de {metrics['simulated_hours']:.2f} horas, se movieron un total de {metrics['arrived_passengers']} pasajeros.")
+
+        # Exportar el reporte detallado de pasajeros a archivo
+        directory = output_directory or ''
+        self.export_passenger_report(os.path.join(directory, "passenger_report.csv"), True, verbose)
+        self.export_passenger_report(os.path.join(directory, "fail_passenger_report.csv"), False, verbose)
+
+        if self.profiler is not None:
+            if verbose:
+                self.profiler.print_summary([train.train_id for train in self.trains], [station.name for station in self.stations])
+            if self.profile_csv:
+                path = self.profiler.export_ticks(os.path.join(directory, "profile_ticks.csv"))
+                if verbose:
+                    print(f"Perfil por tick exportado a {path}")
+        return metrics
+
+    def collect_report_metrics(self):
+        """
+        Calcula las métricas del reporte sin imprimirlas ni exportarlas. Retorna un diccionario con:
+          - arrived_passengers y failed_passengers: totales de pasajeros llegados y fallidos.
+          - average_move_distance: promedio global de metros movidos por pasajero llegado.
+          - average_travel_time: promedio del tiempo de viaje de los pasajeros llegados.
+          - median_waiting_time: mediana del tiempo de espera de los vagones de los trenes.
+          - headway y simulated_hours: headway de los trenes y horas simuladas desde la creación de pasajeros.
+          - stations: diccionario por nombre de estación con sus pasajeros llegados y fallidos.
         """
         total_arrived = 0
+        total_failed = 0
         total_move_distance = 0
-        total_passengers_global = 0
+        station_metrics = {}
 
-        print("Reporte de pasajeros en estaciones:\n")
         for station in self.stations:
-            # Se filtran los pasajeros que han llegado a la estación (end_station coincide con la estación)
-            arrived_passengers = [p for p in station.arrived_passengers if p.end_station == station]
-            num_arrived = len(arrived_passengers)
+            num_arrived, move_distance, num_failed = self.station_passenger_totals(station)
             total_arrived += num_arrived
-            total_passengers_global += num_arrived
+            total_failed += num_failed
 
             # Acumular la distancia recorrida (move_count) de todos los pasajeros de la estación
-            total_move_distance += sum(p.move_count for p in arrived_passengers)
-
-            # Número de pasajeros fallidos de la estación
-            num_failed = len(station.fail_passengers_arrived)
-
-            print(f"Estación: {station.name}")
-            print(f"  - Número de pasajeros llegados: {num_arrived}")
-            print(f"  - Número de pasajeros fallidos: {num_failed}")
-            print("--------------------------------------------------")
+            total_move_distance += move_distance
+            station_metrics[station.name] = {'arrived_passengers': num_arrived, 'failed_passengers': num_failed}
 
         # Calcular el promedio global de metros movidos entre todos los pasajeros llegados
-        if total_passengers_global > 0:
-            global_avg_move = total_move_distance / total_passengers_global
+        if total_arrived > 0:
+            global_avg_move = total_move_distance / total_arrived
         else:
             global_avg_move = 0
 
-        print(f"\nPromedio global de metros movidos por pasajero: {global_avg_move:.2f}")
-
-        # Imprimir el headway obtenido de self.hedway
-        print(f"Headway: {self.headway}")
+        travel_times = [travel_time for _, _, travel_time, _, _ in self.iter_finished_passengers(arrived=True)]
+        average_travel_time = statistics.fmean(travel_times) if travel_times else 0
 
         # Calcular la mediana del tiempo de espera de todos los wagones (acumulando los valores de waiting_time_list)
         all_waiting_times = []
@@ -548,261 +709,214 @@ class Simulator:
             median_waiting_time = statistics.median(all_waiting_times)
         else:
             median_waiting_time = 0
-        print(f"Mediana de tiempo de espera de los wagones: {median_waiting_time:.2f} segundos")
 
-        # Convertir el tiempo de simulación de segundos a horas
-        simulator_time_hours = (self.simulator_time - self.passenger_creation_time) / 3600
-        print(f"\nEn un tiempo de {(simulator_time_hours):.2f} horas, se movieron un total de {total_arrived} pasajeros.")
-
-        # Exportar el reporte detallado de pasajeros a archivo
-        self.export_passenger_report("passenger_report.csv")
-        self.export_fail_passenger_report("fail_passenger_report.csv")
-
-    def export_passenger_report(self, filename):
-        """
-        Crea un archivo CSV con el siguiente encabezado:
-        - Tiempo de viaje de cada pasajero
-        - Metros desplazados
-        - Estaciones desplazadas
-
-        La cantidad de estaciones desplazadas se calcula a partir de la lista fija de estaciones L6,
-        considerando que si el pasajero sube en una estación y baja en otra, si el índice destino es menor que el de origen se da la vuelta a la lista.
-        """
-        station_order = [
-            "Cerrillos",
-            "Lo Valledor",
-            "Pedro Aguirre Cerda",
-            "Franklin L6",
-            "Bio Bio",
-            "Nuble L6",
-            "Estadio Nacional",
-            "Nunoa L6",
-            "Ines de Suarez",
-            "Los Leones L6"
-        ]
-
-        def compute_station_difference(start, destination, stations_list):
-            index_start = stations_list.index(start)
-            index_destination = stations_list.index(destination)
-            if index_destination >= index_start:
-                return index_destination - index_start
-            else:
-                return (len(stations_list) - index_start) + index_destination
+        return {
+            'arrived_passengers': total_arrived,
+            'failed_passengers': total_failed,
+            'average_move_distance': global_avg_move,
+            'average_travel_time': average_travel_time,
+            'median_waiting_time': median_waiting_time,
+            'headway': self.headway,
+            # Convertir el tiempo de simulación de segundos a horas
+            'simulated_hours': (self.simulator_time - self.passenger_creation_time) / 3600,
+            'stations': station_metrics,
+        }
+
+    def profile_summary(self):
+        """
+        Retorna el resumen del perfil de la simulación (ver Profiler.PhaseProfiler.summary), con los
+        trenes y estaciones identificados por su nombre. Requiere crear el simulador con profile=True.
+        """
+        if self.profiler is None:
+            raise ValueError("El simulador no se creó con profile=True")
+        return self.profiler.summary([train.train_id for train in self.trains], [station.name for station in self.stations])
+
+    def station_passenger_totals(self, station):
+        """
+        Retorna, para la estación dada, el número de pasajeros llegados (aquellos cuyo end_station
+        es la estación), la suma de sus metros desplazados y el número de pasajeros fallidos.
+        """
+        if self.passenger_table is not None:
+            table = self.passenger_table
+            arrived = table.select(PassengerTable.ARRIVED, station)
+            failed = table.select(PassengerTable.FAILED, station)
+            return int(arrived.sum()), float(table.column('move_count')[arrived].sum()), int(failed.sum())
+
+        arrived_passengers = [p for p in station.arrived_passengers if p.end_station == station]
+        return len(arrived_passengers), sum(p.move_count for p in arrived_passengers), len(station.fail_passengers_arrived)
+
+    def iter_finished_passengers(self, arrived):
+        """
+        Recorre, estación por estación, los pasajeros llegados (arrived=True) o fallidos (arrived=False).
+        Retorna tuplas (estación de origen, estación de destino, tiempo de viaje, metros desplazados,
+        tiempo de espera en el andén).
+        """
+        if self.passenger_table is not None:
+            table = self.passenger_table
+            state = PassengerTable.ARRIVED if arrived else PassengerTable.FAILED
+            rows = np.flatnonzero(table.column('state') == state)
+            rows = rows[np.argsort(table.column('exit_station')[rows], kind='stable')]
+            columns = zip(
+                table.column('start_station')[rows].tolist(),
+                table.column('end_station')[rows].tolist(),
+                table.column('travel_time')[rows].tolist(),
+                table.column('move_count')[rows].tolist(),
+                (table.column('boarding_tick')[rows] - table.column('start_tick')[rows]).tolist()
+            )
+            for start_index, end_index, travel_time, move_count, waiting_time in columns:
+                yield self.stations[start_index], self.stations[end_index], travel_time, move_count, waiting_time
+            return
 
-        rows = []
-        headers = ["Tiempo de viaje", "Metros desplazados", "Estaciones desplazadas"]
+        for station in self.stations:
+            passengers = station.arrived_passengers if arrived else station.fail_passengers_arrived
+            for passenger in passengers:
+                yield passenger.start_station, passenger.end_station, passenger.travel_time, passenger.move_count, passenger.get_platform_waiting_time()
+
+    def iter_report_batches(self, arrived, batch_size=65536):
+        """
+        Recorre los pasajeros llegados (arrived=True) o fallidos (arrived=False) en el mismo orden que
+        iter_finished_passengers, en lotes de a lo más batch_size pasajeros. Cada lote es una tupla de
+        arreglos (índice de estación de origen, índice de estación de destino, tiempo de viaje,
+        metros desplazados, tiempo de espera en el andén).
+        """
+        if self.passenger_table is not None:
+            table = self.passenger_table
+            state = PassengerTable.ARRIVED if arrived else PassengerTable.FAILED
+            rows = np.flatnonzero(table.column('state') == state)
+            rows = rows[np.argsort(table.column('exit_station')[rows], kind='stable')]
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                yield (
+                    table.column('start_station')[batch],
+                    table.column('end_station')[batch],
+                    table.column('travel_time')[batch],
+                    table.column('move_count')[batch],
+                    table.column('boarding_tick')[batch] - table.column('start_tick')[batch],
+                )
+            return
 
-        # Recorrer todas las estaciones y sus pasajeros para obtener la información de cada pasajero
+        station_indices = {station: i for i, station in enumerate(self.stations)}
+        batch = []
         for station in self.stations:
-            for passenger in station.arrived_passengers:
-                start_name = getattr(passenger.start_station, "name", passenger.start_station)
-                destination_name = getattr(passenger.end_station, "name", passenger.end_station)
-                try:
-                    stations_diff = compute_station_difference(start_name, destination_name, station_order)
-                except Exception as e:
-                    stations_diff = None
-                rows.append({
-                    "Tiempo de viaje": passenger.travel_time,
-                    "Metros desplazados": passenger.move_count,
-                    "Estaciones desplazadas": stations_diff
-                })
-
-        with open(filename, 'w', newline='') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(row)
-        print(f"Reporte detallado exportado a {filename}")
-
-
-    def export_fail_passenger_report(self, filename):
-        """
-        Crea un archivo CSV con el siguiente encabezado:
+            passengers = station.arrived_passengers if arrived else station.fail_passengers_arrived
+            for passenger in passengers:
+                batch.append((
+                    station_indices[passenger.start_station], station_indices[passenger.end_station],
+                    passenger.travel_time, passenger.move_count, passenger.get_platform_waiting_time()
+                ))
+                if len(batch) == batch_size:
+                    yield tuple(zip(*batch))
+                    batch = []
+        if batch:
+            yield tuple(zip(*batch))
+
+    def export_passenger_report(self, filename, arrived=True, verbose=True):
+        """
+        Exporta el reporte de los pasajeros llegados (arrived=True) o fallidos (arrived=False) en los
+        formatos de self.report_formats (CSV y/o .npz columnar, ver PassengerReport.py), escribiendo por
+        lotes. El CSV tiene el siguiente encabezado:
           - Tiempo de viaje de cada pasajero
           - Metros desplazados
           - Estaciones desplazadas
+          - Tiempo de espera en andén (desde la llegada a la estación hasta el abordaje)
+          - Tiempo total (espera en andén más tiempo de viaje)
 
-        La cantidad de estaciones desplazadas se calcula a partir de la lista fija de estaciones L6,
-        considerando que si el pasajero sube en una estación y baja en otra, si el índice destino es menor que el de origen se da la vuelta a la lista.
-        """
-        station_order = [
-            "Cerrillos",
-            "Lo Valledor",
-            "Pedro Aguirre Cerda",
-            "Franklin L6",
-            "Bio Bio",
-            "Nuble L6",
-            "Estadio Nacional",
-            "Nunoa L6",
-            "Ines de Suarez",
-            "Los Leones L6"
-        ]
-
-        def compute_station_difference(start, destination, stations_list):
-            index_start = stations_list.index(start)
-            index_destination = stations_list.index(destination)
-            if index_destination >= index_start:
-                return index_destination - index_start
-            else:
-                return (len(stations_list) - index_start) + index_destination
-
-        rows = []
-        headers = ["Tiempo de viaje", "Metros desplazados", "Estaciones desplazadas"]
+        Las estaciones desplazadas se cuentan en el orden de las estaciones del simulador: si el índice
+        de destino es menor que el de origen, se da la vuelta a la línea.
 
-        # Recorrer todas las estaciones y sus pasajeros fallidos para obtener la información de cada pasajero
-        for station in self.stations:
-            for passenger in station.fail_passengers_arrived:
-                start_name = getattr(passenger.start_station, "name", passenger.start_station)
-                destination_name = getattr(passenger.end_station, "name", passenger.end_station)
-                try:
-                    stations_diff = compute_station_difference(start_name, destination_name, station_order)
-                except Exception as e:
-                    stations_diff = None
-                rows.append({
-                    "Tiempo de viaje": passenger.travel_time,
-                    "Metros desplazados": passenger.move_count,
-                    "Estaciones desplazadas": stations_diff
-                })
-
-        with open(filename, 'w', newline='') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(row)
-        print(f"Reporte detallado de fallidos exportado a {filename}")
+        Parámetros:
+            filename: Ruta del reporte; la extensión (.csv o .npz) se reemplaza según el formato.
+            arrived: Si es False, se exportan los pasajeros fallidos.
+            verbose: Si es True, se imprime la ruta de cada archivo escrito.
+        """
+        station_names = [station.name for station in self.stations]
+        with PassengerReportWriter(report_basename(filename), station_names, self.report_formats) as writer:
+            for batch in self.iter_report_batches(arrived):
+                writer.write(*batch)
+        if verbose:
+            label = "Reporte detallado" if arrived else "Reporte detallado de fallidos"
+            for path in writer.paths:
+                print(f"{label} exportado a {path}")
 
     # Simulation Execution
-    def run_simulation(self):
-        """
-        Ejecuta la animación de la simulación y, una vez finalizada, genera el reporte.
-        """
-        ani = FuncAnimation(
-            self.fig,
-            self.update,
-            frames=range(self.simulator_time),
-            init_func=self.init,
-            interval=self.interval,
-            blit=True
-        )
-        plt.show()
-        self.generate_report()
-
-    def init(self):
-        """
-        Inicializa los scatter plots de trenes, vagones y vagones desacoplados, 
-        limpiando sus datos para el inicio de la animación.
-        Retorna una lista concatenada de todos los scatters para la animación.
-        """
-        for scatter in self.train_scatters:
-            scatter.set_data([], [])
-
-        for scatters in self.wagon_scatters.values():
-            for scatter in scatters:
-                scatter.set_data([], [])
-
-        for station_scatters in self.decoupled_wagon_scatters.values():
-            for scatter in station_scatters:
-                scatter.set_data([], [])
-
-        all_decoupled_scatters = [
-            scatter for scatters in self.decoupled_wagon_scatters.values() for scatter in scatters
-        ]
-
-        return (
-            self.train_scatters +
-            [scatter for scatters in self.wagon_scatters.values() for scatter in scatters] +
-            all_decoupled_scatters
-        )
-
     def update(self, frame):
         """
-        Actualiza la posición de trenes, vagones y pasajeros en cada frame de la animación.
-        También se encarga de:
-          - Ajustar las posiciones de trenes y vagones.
-          - Actualizar las etiquetas que muestran el número de pasajeros.
-          - Manejar el movimiento de vagones desacoplados.
-          - Crear nuevos pasajeros en las estaciones a partir de un tiempo de creación definido.
-          - Procesar eventos de desacople de vagones.
-          - Actualizar el tiempo de viaje de todos los pasajeros.
-        Retorna una lista con todos los objetos actualizados para la animación.
+        Avanza la lógica de la simulación un paso (un segundo). En cada paso:
+          - Ajusta las posiciones de trenes y vagones y mueve a los pasajeros dentro de los trenes.
+          - Maneja el movimiento de vagones desacoplados.
+          - Crea nuevos pasajeros en las estaciones a partir de un tiempo de creación definido.
+          - Procesa eventos de desacople de vagones.
+        Los tiempos de los pasajeros no se actualizan en cada paso: se registran los ticks de
+        llegada, abordaje y descenso (current_tick) y el tiempo de viaje se deriva al bajar.
+        Este método no depende de matplotlib; los renderizadores lo invocan antes de dibujar.
         """
-
         if frame >= self.simulator_time:
             return
 
-        all_scatters = []
-        station_wagon_labels = {station: [] for station in self.stations}
-        wagon_passenger_labels = {train: [] for train in self.trains}
-
-        for train_index, (train_scatter, train) in enumerate(zip(self.train_scatters, self.trains)):
-            self.set_train_coordinates(train, frame)
-            train.handle_moving_passengers()
-
-            if train.wagons:
-                train_scatter.set_data([frame], [train.positions[-1]])
-                all_scatters.append(train_scatter)
-
-            current_wagon_scatters = self.wagon_scatters[train]
-            while len(current_wagon_scatters) < len(train.wagons):
-                scatter, = self.ax.plot([], [], 'ro', markersize=self.marker_size/2)
-                current_wagon_scatters.insert(0, scatter)
+        self.current_tick = frame
+        self.next_frame = frame + 1
+        if self.trajectory_recorder is not None:
+            self.trajectory_recorder.tick = frame
 
-            for i, (wagon, wagon_scatter) in enumerate(zip(train.wagons, current_wagon_scatters)):
-                wagon_scatter.set_data([frame], [wagon.positions[-1]])
-                all_scatters.append(wagon_scatter)
+        # Con profile=True, cada fase se mide al terminar (ver Profiler.PhaseProfiler.lap)
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start_tick(frame)
 
-                label_offset = i * 100
-
-                # Crear o actualizar la etiqueta del número de pasajeros para cada vagón acoplado al tren
-                if i >= len(wagon_passenger_labels[train]):
-                    passenger_label = self.ax.text(frame + label_offset, wagon.positions[-1], f"{len(wagon.passengers)}", fontsize=8, ha='left', color='black')
-                    wagon_passenger_labels[train].append(passenger_label)
-                else:
-                    wagon_passenger_labels[train][i].set_position((frame + label_offset, wagon.positions[-1]))
-                    wagon_passenger_labels[train][i].set_text(f"{len(wagon.passengers)}")
+        for train_index, train in enumerate(self.trains):
+            self.set_train_coordinates(train, frame)
+            if profiler is not None:
+                profiler.lap('train_coordinates', train=train_index)
+            if self.movement_kernel is None:
+                train.handle_moving_passengers()
+                if profiler is not None:
+                    profiler.lap('passenger_movement', len(train.passengers), train=train_index)
+        if self.movement_kernel is not None:
+            self.movement_kernel.step()
+            if profiler is not None:
+                profiler.lap('passenger_movement', sum(len(train.passengers) for train in self.trains))
 
-            if len(current_wagon_scatters) > len(train.wagons):
-                for _ in range(len(current_wagon_scatters) - len(train.wagons)):
-                    scatter_to_remove = current_wagon_scatters.pop(0)
-                    scatter_to_remove.set_data([], [])
+        for train_index, train in enumerate(self.trains):
+            self.update_train_coupling_crossings(train)
+            if profiler is not None:
+                profiler.lap('coupling_crossings', train=train_index)
 
         # Manejar los vagones desacoplados
         self.add_wagon_to_accelerate = []
-        for station in self.stations:
-            while len(self.decoupled_wagon_scatters[station]) < len(station.wagons):
-                scatter, = self.ax.plot([], [], 'ro', markersize=self.marker_size/2)
-                self.decoupled_wagon_scatters[station].append(scatter)
-
-            for wagon, scatter in zip(station.wagons, self.decoupled_wagon_scatters[station]):
+        for station_index, station in enumerate(self.stations):
+            wagon_count = len(station.wagons)
+            for wagon in station.wagons:
                 self.handle_moving_events(wagon)
-                scatter.set_data([frame], [wagon.positions[-1]])
-                all_scatters.append(scatter)
+            if profiler is not None:
+                profiler.lap('station_wagons', wagon_count, station=station_index)
 
-                if wagon in station.wagons:
-                    if len(station_wagon_labels[station]) <= station.wagons.index(wagon):
-                        passenger_label = self.ax.text(frame, wagon.positions[-1], str(len(wagon.passengers)), fontsize=8, ha='left', color='black')
-                        station_wagon_labels[station].append(passenger_label)
-                    else:
-                        label_index = station.wagons.index(wagon)
-                        station_wagon_labels[station][label_index].set_position((frame, wagon.positions[-1]))
-                        station_wagon_labels[station][label_index].set_text(str(len(wagon.passengers)))
-
-            station_wagon_labels[station] = station_wagon_labels[station][:len(station.wagons)]
-
-        # Actualizar los pasajeros de las estaciones y manejar el desacoplamiento
-        for station_index, station in enumerate(self.stations):
-            if frame >= self.passenger_creation_time:
-                station.create_passenger(self.stations)
-            self.passenger_texts[station_index].set_text(f"{station.name}: {len(station.passengers)}")
+        # Crear los pasajeros de las estaciones y manejar el desacoplamiento
+        if frame >= self.passenger_creation_time:
+            created = self.create_passengers()
+            if profiler is not None:
+                profiler.lap('passenger_creation', created)
 
         for train_index, train in enumerate(self.trains):
+            wagon_count = len(train.wagons)
             self.handle_decoupling_event(train, train_index)
+            if profiler is not None:
+                profiler.lap('decoupling', wagon_count - len(train.wagons), train=train_index)
 
-        self.update_all_passengers(1)
-
-        all_scatters += [label for labels in station_wagon_labels.values() for label in labels] + self.passenger_texts + [label for labels in wagon_passenger_labels.values() for label in labels]
+    def sync_trains(self):
+        """
+        Escribe en los vagones y pasajeros de los trenes el estado del movimiento vectorizado
+        (ver Train.sync_passengers). Los renderizadores lo llaman antes de dibujar.
+        """
+        for train in self.trains:
+            train.sync_passengers()
 
-        return all_scatters
+    def run_simulation(self):
+        """
+        Ejecuta la animación de la simulación y, una vez finalizada, genera el reporte.
+        El renderizador (y matplotlib) se importa solo al llamar a este método.
+        """
+        from Renderer import SimulationRenderer
+        SimulationRenderer(self).run_simulation()
 
     def animate_train_simulation(self):
         """
@@ -810,73 +924,73 @@ class Simulator:
         Cada vagón se representa mediante una imagen que muestra su matriz de colores,
         sobre la cual se superpone el número de pasajeros en cada celda.
         """
-        plt.close(self.fig)
-        max_wagons = max(len(train.wagons) for train in self.trains)
-        fig, axes = plt.subplots(
-            nrows=len(self.trains),
-            ncols=max_wagons,
-            figsize=(max_wagons * 2, len(self.trains) * 2),
-            gridspec_kw={'hspace': 0.5, 'wspace': 0.2}
-        )
-
-        # Asegurar que axes sea una lista de listas para facilitar la iteración
-        if len(self.trains) == 1:
-            axes = [axes]
-        elif len(self.trains) > 1 and isinstance(axes[0], np.ndarray):
-            axes = axes
-        else:
-            axes = [ax if isinstance(ax, np.ndarray) else [ax] for ax in axes]
-
-        # Precomputar el mapa de colores para mayor eficiencia
-        color_map_arr = np.array([
-            [0.5, 0.5, 0.5],  # gris
-            [1, 0, 0],        # rojo
-            [0, 0, 1],        # azul
-            [0, 1, 0],        # verde
-            [1, 1, 0]         # amarillo
-        ])
-
-        def update(frame):
-            """
-            Función interna que se llama en cada frame de la animación.
-            Actualiza la lógica de la simulación, la posición de cada tren, vagón y
-            actualiza las imágenes de las matrices de colores y etiquetas de pasajeros.
-            """
+        from Renderer import TrainInteriorRenderer
+        TrainInteriorRenderer(self).animate_train_simulation()
+
+    def execute_simulation_logic(self, output_directory=None, verbose=True, checkpoint_interval=None, checkpoint_directory="checkpoints"):
+        """
+        Ejecuta la simulación lógica sin mostrar la animación gráfica, desde el primer paso pendiente
+        (0, o el siguiente al guardado si el simulador se restauró de un checkpoint).
+        Una vez finalizada, genera el reporte final y retorna sus métricas (ver generate_report).
+
+        Parámetros:
+            output_directory: Directorio donde escribir los reportes.
+            verbose: Si es True, imprime el resumen del reporte.
+            checkpoint_interval: Si se indica, guarda un checkpoint cada checkpoint_interval pasos
+                (ver save_checkpoint) como checkpoint_<paso>.npz en checkpoint_directory.
+            checkpoint_directory: Directorio de los checkpoints periódicos.
+        """
+        for frame in range(self.next_frame, self.simulator_time):
             self.update(frame)
+            if checkpoint_interval and self.next_frame % checkpoint_interval == 0:
+                self.save_checkpoint(os.path.join(checkpoint_directory, f"checkpoint_{self.next_frame:06d}.npz"))
+        if self.trajectory_recorder is not None:
+            self.trajectory_recorder.flush()
+        self.sync_trains()
+        return self.generate_report(output_directory, verbose)
+
+    def record_trace(self, directory, cells=False, output_directory=None, verbose=True):
+        """
+        Ejecuta la simulación sin animación registrando en cada paso el estado que dibujan los
+        renderizadores (ver Trace.TraceRecorder), para reproducirla o exportarla después con Replay.py
+        sin volver a simularla. Funciona con ambos motores, ya que avanza con update: EventSimulator.update
+        ubica en cada tick los vagones en estación (ver EventSimulator.place_station_wagons), por lo que
+        sus posiciones y estados coinciden con los del motor por pasos.
+        Una vez finalizada, genera el reporte final y retorna sus métricas (ver generate_report).
 
-            for train, axs in zip(self.trains, axes):
-                num_active_wagons = len(train.wagons)
-                for i, ax in enumerate(axs):
-                    ax.clear()
-                    if i < num_active_wagons:
-                        wagon = train.wagons[i]
-                        # Convertir las matrices a NumPy para procesamiento vectorizado
-                        passenger_matrix = np.asarray(wagon.passenger_matrix)
-                        color_matrix = np.asarray(wagon.color_matrix)
-                        # Crear la cuadrícula de colores usando el mapa precomputado
-                        color_grid = color_map_arr[color_matrix]
-                        ax.imshow(color_grid, aspect='equal')
-                        # Mostrar el número de pasajeros en cada celda
-                        for (r, c), val in np.ndenumerate(passenger_matrix):
-                            ax.text(c, r, str(val), ha='center', va='center', color='white', fontsize=6)
-                        ax.set_title(f'{wagon.assigned_station.name} ({passenger_matrix.sum()} passengers)')
-                    else:
-                        # Si no hay vagón, se muestra un placeholder
-                        ax.matshow(np.zeros((5, 5)), cmap='gray', aspect='equal')
-                        ax.set_title("Decouple Wagon")
-                        ax.axis('off')
-
-        ani = FuncAnimation(
-            fig, update, frames=range(self.simulator_time),
-            interval=self.interval, repeat=False
-        )
-        plt.show()
-
-    def execute_simulation_logic(self):
-        """
-        Ejecuta la simulación lógica sin mostrar la animación gráfica.
-        Una vez finalizada, genera el reporte final.
-        """
-        for frame in range(self.simulator_time):
+        Parámetros:
+            directory: Directorio de la traza.
+            cells: Si es True, registra también la ocupación y el color de cada celda de los vagones
+                (necesario para reproducir el interior de los trenes).
+            output_directory: Directorio donde escribir los reportes.
+            verbose: Si es True, imprime el resumen del reporte.
+        """
+        from Trace import TraceRecorder
+        recorder = TraceRecorder(self, directory, cells)
+        for frame in range(self.next_frame, self.simulator_time):
             self.update(frame)
-        self.generate_report()
+            self.sync_trains()
+            recorder.record(frame)
+        recorder.flush()
+        if self.trajectory_recorder is not None:
+            self.trajectory_recorder.flush()
+        return self.generate_report(output_directory, verbose)
+
+    # Checkpoints
+    def save_checkpoint(self, filename):
+        """
+        Guarda el estado actual de la simulación (incluidos los generadores aleatorios) en un archivo
+        .npz versionado, desde el que restore_checkpoint continúa la corrida o inicia otra rama.
+        Ver Checkpoint.save_checkpoint.
+        """
+        from Checkpoint import save_checkpoint
+        return save_checkpoint(self, filename)
+
+    @classmethod
+    def restore_checkpoint(cls, filename, **overrides):
+        """
+        Crea un simulador con el estado guardado en filename, que continúa desde el paso siguiente al guardado.
+        Ver Checkpoint.load_checkpoint para los parámetros que se pueden cambiar en la rama restaurada.
+        """
+        from Checkpoint import load_checkpoint
+        return load_checkpoint(filename, **overrides)
@@ -1,5 +1,6 @@
 import numpy as np
 from Passenger import Passenger
+from Platform import Platform
 from Wagon import Wagon
 
 class Station:
@@ -27,7 +28,8 @@ class Station:
         self.decoupling_point = None
         self.start_wagon_for_coupling_point = None
         self.coupling_point = None
-        self.passengers = []
+        self.passengers = Platform()
+        self.rng = None
         self.arrived_passengers = []
         self.fail_passengers_arrived = []
         self.wagon_length_m = wagon_length_m
@@ -36,6 +38,7 @@ class Station:
         self.passenger_flows = passenger_flows
         self.passenger_creation = sum(passenger_flows) / 3600
         self.destination_probabilities = self.calculate_probabilities()
+        self.destination_cdf = self.calculate_cumulative_probabilities()
         self.create_initial_wagon(passenger_per_meter)
 
     def calculate_probabilities(self):
@@ -50,6 +53,16 @@ class Station:
             return [0] * len(self.passenger_flows)
         return [flow / flow_sum for flow in self.passenger_flows]
 
+    def calculate_cumulative_probabilities(self):
+        """
+        Calcula la distribución acumulada de destinos, usada para muestrear todos los destinos
+        de un paso con una sola búsqueda binaria vectorizada (np.searchsorted).
+
+        Retorna:
+            Arreglo de NumPy con las probabilidades acumuladas de cada destino.
+        """
+        return np.cumsum(np.asarray(self.destination_probabilities, dtype=float))
+
     def create_initial_wagon(self, passenger_per_meter):
         """
         Crea el vagón inicial de la estación que se mantiene en espera hasta que llegue un tren.
@@ -62,7 +75,32 @@ class Station:
         initial_wagon.assigned_station = self
         initial_wagon.positions.append(self.position)
         initial_wagon.is_initial_wagon = True
-        self.wagons.append(initial_wagon)
+        self.add_wagon(initial_wagon)
+
+    def add_wagon(self, wagon):
+        """
+        Agrega un vagón a la estación y le guarda la referencia a la estación y su slot
+        (posición en self.wagons), para ubicarlo en O(1) sin recorrer las estaciones.
+
+        Parámetros:
+            wagon: Vagón que se detiene en la estación.
+        """
+        wagon.current_station = self
+        wagon.station_slot = len(self.wagons)
+        self.wagons.append(wagon)
+
+    def remove_wagon(self, wagon):
+        """
+        Retira un vagón de la estación usando su slot y actualiza el slot de los vagones siguientes.
+
+        Parámetros:
+            wagon: Vagón que abandona la estación.
+        """
+        del self.wagons[wagon.station_slot]
+        for slot in range(wagon.station_slot, len(self.wagons)):
+            self.wagons[slot].station_slot = slot
+        wagon.current_station = None
+        wagon.station_slot = None
 
     def set_decoupling_point(self, decoupling_point):
         """
@@ -91,25 +129,47 @@ class Station:
         """
         self.coupling_point = coupling_point
 
-    def create_passenger(self, stations):
+    def create_passenger(self, stations, num_passengers=None, tick=0):
         """
         Crea pasajeros en la estación usando una distribución de Poisson.
         Esta distribución se usa ya que pueden generarse más de un pasajero por segundo.
-        A cada pasajero se le asigna un destino de forma probabilística basado en destination_probabilities.
-        Si se supera la capacidad de la estación, se limita el número de pasajeros.
+        Los destinos de todos los pasajeros nuevos se sortean en una sola llamada vectorizada
+        sobre la distribución acumulada destination_cdf.
+        Una vez alcanzada la capacidad de la estación, los pasajeros restantes no se agregan.
 
         Parámetros:
             stations: Lista de estaciones para asignar destinos.
+            num_passengers: Número de pasajeros que llegan; si es None se sortea con Poisson.
+            tick: Tick de llegada de los pasajeros al andén.
+        Los números aleatorios se toman del generador de la estación (self.rng, asignado por el
+        simulador) o, si no tiene uno, de numpy.random.
         """
         if len(self.passengers) >= self.station_capacity:
             return []
-        num_passengers = np.random.poisson(self.passenger_creation)
-        for _ in range(num_passengers):
-            if self.destination_probabilities:
-                end_station = np.random.choice(stations, p=self.destination_probabilities)
-                if end_station != self:
-                    new_passenger = Passenger(self, end_station)
-                    new_passenger.start_timer()
-                    self.passengers.append(new_passenger)
-        if len(self.passengers) > self.station_capacity:
-            self.passengers = self.passengers[:self.station_capacity]
+        rng = self.rng if self.rng is not None else np.random
+        if num_passengers is None:
+            num_passengers = rng.poisson(self.passenger_creation)
+        if num_passengers and self.destination_probabilities:
+            destination_indices = np.searchsorted(self.destination_cdf, rng.random(num_passengers), side='right')
+            self.add_passengers(stations, destination_indices, tick)
+
+    def add_passengers(self, stations, destination_indices, tick=0):
+        """
+        Crea un pasajero por cada índice de destino, omitiendo los que tienen como destino
+        la propia estación y deteniéndose al alcanzar la capacidad de la estación.
+
+        Parámetros:
+            stations: Lista de estaciones para asignar destinos.
+            destination_indices: Índices (en stations) de los destinos sorteados.
+            tick: Tick de llegada de los pasajeros al andén.
+        """
+        last_index = len(stations) - 1
+        for destination_index in destination_indices.tolist():
+            end_station = stations[min(destination_index, last_index)]
+            if end_station == self:
+                continue
+            if len(self.passengers) >= self.station_capacity:
+                break
+            new_passenger = Passenger(self, end_station)
+            new_passenger.start_timer(tick)
+            self.passengers.append(new_passenger)
@@ -0,0 +1,121 @@
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from Scenario import build_simulator
+
+
+def expand_grid(grid):
+    """
+    Retorna la lista de configuraciones (diccionarios) del producto cartesiano de la grilla.
+
+    Parámetros:
+        grid: Diccionario nombre de parámetro -> lista de valores, por ejemplo
+            {'number_of_trains': [4, 5, 6], 'number_of_wagons': [4, 5]}.
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def run_configuration(task):
+    """
+    Ejecuta una configuración sin animación (en un proceso del pool) y retorna su fila de resultados:
+    el número de corrida, los parámetros de la configuración, la semilla efectiva (entropía y spawn_key
+    de la SeedSequence raíz, que permiten repetir la corrida) y las métricas de generate_report.
+    Los CSV de pasajeros de cada corrida se escriben en su propio subdirectorio (run_0000, run_0001, ...).
+
+    Parámetros:
+        task: Tupla (índice, configuración, directorio de salida, semilla). La semilla es una
+            numpy.random.SeedSequence o None (entropía del sistema).
+    """
+    index, config, output_directory, seed = task
+
+    run_directory = os.path.join(output_directory, f"run_{index:04d}")
+    os.makedirs(run_directory, exist_ok=True)
+
+    simulator = build_simulator(**dict(config, seed=seed))
+    metrics = simulator.execute_simulation_logic(run_directory, verbose=False)
+
+    row = {'run': index}
+    row.update(config)
+    row['seed'] = simulator.seed
+    row['spawn_key'] = simulator.random_streams.root.spawn_key
+    row.update((name, value) for name, value in metrics.items() if name != 'stations')
+    row['output_directory'] = run_directory
+    return row
+
+
+class SweepRunner:
+    """
+    Ejecuta un barrido de parámetros: corre cada configuración (ver Scenario.build_simulator)
+    sin animación en un pool de procesos y reúne las métricas de generate_report en una tabla.
+    """
+
+    def __init__(self, configurations, workers=None, chunksize=1, output_directory="sweep_results", seed=None):
+        """
+        Parámetros:
+            configurations: Lista de diccionarios de parámetros, o una grilla (diccionario de listas)
+                que se expande con expand_grid.
+            workers: Número de procesos del pool (por defecto, os.cpu_count()). Con 1 se ejecuta en el proceso actual.
+            chunksize: Número de configuraciones que se envían juntas a cada proceso.
+            output_directory: Directorio donde se crean los subdirectorios de cada corrida y la tabla de resultados.
+            seed: Semilla raíz; la corrida i usa la i-ésima SeedSequence hija de numpy.random.SeedSequence(seed),
+                de modo que las corridas son independientes y reproducibles. Si es None, cada corrida
+                usa entropía del sistema (queda registrada en la columna seed).
+        """
+        if isinstance(configurations, dict):
+            configurations = expand_grid(configurations)
+        self.configurations = list(configurations)
+        self.workers = workers or os.cpu_count()
+        self.chunksize = chunksize
+        self.output_directory = output_directory
+        self.seed = seed
+        self.results = []
+
+    def run(self):
+        """Ejecuta todas las configuraciones y retorna la lista de filas de resultados, en el orden de entrada."""
+        os.makedirs(self.output_directory, exist_ok=True)
+        if self.seed is None:
+            seeds = [None] * len(self.configurations)
+        else:
+            seeds = np.random.SeedSequence(self.seed).spawn(len(self.configurations))
+        tasks = [
+            (index, config, self.output_directory, seed)
+            for index, (config, seed) in enumerate(zip(self.configurations, seeds))
+        ]
+        if self.workers == 1:
+            self.results = [run_configuration(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                self.results = list(executor.map(run_configuration, tasks, chunksize=self.chunksize))
+        return self.results
+
+    def write_table(self, filename=None):
+        """
+        Escribe los resultados en un CSV con una fila por configuración (por defecto,
+        sweep_results.csv dentro del directorio de salida) y retorna su ruta.
+        """
+        if filename is None:
+            filename = os.path.join(self.output_directory, "sweep_results.csv")
+        headers = []
+        for row in self.results:
+            headers.extend(name for name in row if name not in headers)
+
+        with open(filename, 'w', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=headers)
+            writer.writeheader()
+            for row in self.results:
+                writer.writerow(row)
+        print(f"Resultados del barrido exportados a {filename}")
+        return filename
+
+
+if __name__ == '__main__':
+    # Barrido de ejemplo: tamaño de la flota para la línea L6
+    runner = SweepRunner({'number_of_trains': [4, 5, 6], 'number_of_wagons': [4, 5, 6]}, seed=0)
+    for result in runner.run():
+        print(f"Trenes: {result['number_of_trains']}, vagones: {result['number_of_wagons']} -> "
+              f"{result['arrived_passengers']} pasajeros llegados, "
+              f"espera mediana de vagones {result['median_waiting_time']:.2f} s")
+    runner.write_table()
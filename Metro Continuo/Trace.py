@@ -0,0 +1,269 @@
+import json
+import os
+from collections import namedtuple
+from itertools import chain
+import numpy as np
+from Wagon import Wagon
+
+TRACE_VERSION = 1
+
+# Datos de una estación que necesitan los renderizadores (los mismos atributos que Station)
+StationInfo = namedtuple('StationInfo', ['name', 'position', 'decoupling_point', 'coupling_point'])
+
+
+def cell_colors(color_counts):
+    """
+    Versión vectorizada de Wagon._determine_cell_color: retorna los índices de color (0 a 4) de las
+    celdas a partir de sus contadores por categoría (arreglo con la categoría en el último eje).
+    """
+    total = color_counts.sum(axis=-1)
+    return np.select(
+        [total == 0,
+         color_counts[..., Wagon.AT_DESTINATION] == total,
+         color_counts[..., Wagon.MOVING_RIGHT] == total,
+         color_counts[..., Wagon.MOVING_LEFT] == total],
+        [0, 1, 2, 3], 4
+    ).astype(np.uint8)
+
+
+class TraceRecorder:
+    """
+    Registro compacto del estado visible de una corrida sin animación, para reproducirla después sin
+    volver a simularla (ver Replay.py). En cada tick se guardan, en archivos .npy mapeados en memoria
+    (tiempo x entidad), las posiciones de trenes y vagones, el estado de cada vagón, dónde está
+    (tren y lugar en el tren, o estación), su estación asignada, su número de pasajeros y los
+    pasajeros en cada andén. Opcionalmente se guarda también la ocupación y el color de cada celda
+    de los vagones, que necesita el renderizador del interior de los trenes.
+
+    El número de vagones no cambia durante la simulación (solo pasan de trenes a estaciones), por lo
+    que cada vagón tiene una columna fija en todos los arreglos.
+    """
+
+    def __init__(self, simulator, directory, cells=False):
+        """
+        Parámetros:
+            simulator: Instancia de Simulator (o EventSimulator) a registrar.
+            directory: Directorio donde se escriben los arreglos .npy y meta.json.
+            cells: Si es True, guarda también las matrices de pasajeros y colores de cada vagón.
+        """
+        self.simulator = simulator
+        self.directory = directory
+        self.cells = cells
+        self.ticks = 0
+        os.makedirs(directory, exist_ok=True)
+
+        trains = simulator.trains
+        stations = simulator.stations
+        wagons = [wagon for train in trains for wagon in train.wagons] + [wagon for station in stations for wagon in station.wagons]
+        self.columns = {wagon.wagon_id: column for column, wagon in enumerate(wagons)}
+        self.station_indices = {id(station): index for index, station in enumerate(stations)}
+        self.num_rows = int(simulator.wagon_width_m)
+        self.num_columns = int(simulator.wagon_length_m)
+
+        shape = (simulator.simulator_time, len(wagons))
+        self.train_positions = self._allocate('train_positions', (simulator.simulator_time, len(trains)), np.float32, np.nan)
+        self.wagon_positions = self._allocate('wagon_positions', shape, np.float32, np.nan)
+        self.wagon_states = self._allocate('wagon_states', shape, np.int8, -1)
+        self.wagon_trains = self._allocate('wagon_trains', shape, np.int8, -1)
+        self.wagon_slots = self._allocate('wagon_slots', shape, np.int16, -1)
+        self.wagon_stations = self._allocate('wagon_stations', shape, np.int8, -1)
+        self.wagon_assigned = self._allocate('wagon_assigned', shape, np.int8, -1)
+        self.wagon_passengers = self._allocate('wagon_passengers', shape, np.int16, 0)
+        self.platform_passengers = self._allocate('platform_passengers', (simulator.simulator_time, len(stations)), np.int32, 0)
+        if cells:
+            cell_shape = shape + (self.num_rows, self.num_columns)
+            self.cell_counts = self._allocate('cell_counts', cell_shape, np.uint16, 0)
+            self.cell_colors = self._allocate('cell_colors', cell_shape, np.uint8, 0)
+
+        self.meta = {
+            'version': TRACE_VERSION,
+            'simulator_time': simulator.simulator_time,
+            'position_limit': simulator.position_limit,
+            'interval': simulator.interval,
+            'stations': [
+                [station.name, station.position, station.decoupling_point, station.coupling_point]
+                for station in stations
+            ],
+            'number_of_trains': len(trains),
+            'max_wagons': max(len(train.wagons) for train in trains),
+            'wagon_ids': [wagon.wagon_id for wagon in wagons],
+            'num_rows': self.num_rows,
+            'num_columns': self.num_columns,
+            'cells': cells,
+            'first_tick': None,
+            'ticks': 0,
+        }
+
+    def _allocate(self, name, shape, dtype, fill):
+        """Crea un arreglo .npy mapeado en memoria, lleno con el valor fill."""
+        array = np.lib.format.open_memmap(os.path.join(self.directory, f"{name}.npy"), mode='w+', dtype=dtype, shape=shape)
+        array.fill(fill)
+        return array
+
+    def record(self, tick):
+        """
+        Guarda el estado del simulador en la fila tick. Con el movimiento vectorizado hay que llamar
+        antes a simulator.sync_trains(). Los valores del tick se reúnen en listas y cada arreglo se
+        escribe una sola vez por tick, ya que escribir elemento a elemento en un memmap es lento.
+        """
+        simulator = self.simulator
+        wagon_count = len(self.columns)
+        positions = [np.nan] * wagon_count
+        states = [-1] * wagon_count
+        trains = [-1] * wagon_count
+        slots = [-1] * wagon_count
+        stations = [-1] * wagon_count
+        assigned = [-1] * wagon_count
+        passengers = [0] * wagon_count
+        matrices = [None] * wagon_count
+        color_counts = [None] * wagon_count
+        train_positions = [np.nan] * len(simulator.trains)
+
+        located = [(train_index, -1, train.wagons) for train_index, train in enumerate(simulator.trains)]
+        located += [(-1, station_index, station.wagons) for station_index, station in enumerate(simulator.stations)]
+        for train_index, station_index, wagons in located:
+            for slot, wagon in enumerate(wagons):
+                column = self.columns[wagon.wagon_id]
+                positions[column] = wagon.positions[-1]
+                states[column] = wagon.state
+                trains[column] = train_index
+                slots[column] = slot
+                stations[column] = station_index
+                assigned_station = wagon.assigned_station
+                assigned[column] = -1 if assigned_station is None else self.station_indices[id(assigned_station)]
+                passengers[column] = len(wagon.passengers)
+                if self.cells:
+                    matrices[column] = wagon.passenger_matrix
+                    color_counts[column] = wagon.color_counts
+        for train_index, train in enumerate(simulator.trains):
+            if train.wagons:
+                train_positions[train_index] = train.positions[-1]
+
+        self.train_positions[tick] = train_positions
+        self.wagon_positions[tick] = positions
+        self.wagon_states[tick] = states
+        self.wagon_trains[tick] = trains
+        self.wagon_slots[tick] = slots
+        self.wagon_stations[tick] = stations
+        self.wagon_assigned[tick] = assigned
+        self.wagon_passengers[tick] = passengers
+        self.platform_passengers[tick] = [len(station.passengers) for station in simulator.stations]
+        if self.cells:
+            self.cell_counts[tick] = np.array(matrices, dtype=np.uint16)
+            # Los contadores (vagón x fila x columna x categoría) se aplanan con fromiter, bastante más
+            # rápido que convertir la lista anidada con np.array
+            counts = np.fromiter(chain.from_iterable(chain.from_iterable(chain.from_iterable(color_counts))),
+                                 dtype=np.int32, count=wagon_count * self.num_rows * self.num_columns * 3)
+            self.cell_colors[tick] = cell_colors(counts.reshape(wagon_count, self.num_rows, self.num_columns, 3))
+
+        if self.meta['first_tick'] is None:
+            self.meta['first_tick'] = tick
+        self.ticks = tick + 1
+
+    def flush(self):
+        """Escribe a disco los arreglos y meta.json con el número de ticks registrados."""
+        for name, array in vars(self).items():
+            if isinstance(array, np.memmap):
+                array.flush()
+        self.meta['ticks'] = self.ticks
+        if self.meta['first_tick'] is None:
+            self.meta['first_tick'] = 0
+        with open(os.path.join(self.directory, 'meta.json'), 'w', encoding='utf-8') as metafile:
+            json.dump(self.meta, metafile, ensure_ascii=False, indent=1)
+
+
+class Trace:
+    """
+    Traza registrada por TraceRecorder, abierta en modo solo lectura con los arreglos mapeados en
+    memoria: leer un tick no carga la traza completa. Entrega el estado de cada tick en el formato
+    que esperan SimulationRenderer.draw_frame y TrainInteriorRenderer.draw_wagons.
+    """
+
+    ARRAYS = ('train_positions', 'wagon_positions', 'wagon_states', 'wagon_trains', 'wagon_slots',
+              'wagon_stations', 'wagon_assigned', 'wagon_passengers', 'platform_passengers')
+
+    def __init__(self, directory):
+        """
+        Parámetros:
+            directory: Directorio de la traza (el de TraceRecorder).
+        """
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as metafile:
+            meta = json.load(metafile)
+        if meta.get('version') != TRACE_VERSION:
+            raise ValueError(f"Versión de traza no soportada: {meta.get('version')} (se esperaba {TRACE_VERSION})")
+        self.directory = directory
+        self.meta = meta
+        self.simulator_time = meta['simulator_time']
+        self.position_limit = meta['position_limit']
+        self.interval = meta['interval']
+        self.stations = [StationInfo(*station) for station in meta['stations']]
+        self.number_of_trains = meta['number_of_trains']
+        self.max_wagons = meta['max_wagons']
+        self.wagon_count = len(meta['wagon_ids'])
+        self.num_rows = meta['num_rows']
+        self.num_columns = meta['num_columns']
+        self.cells = meta['cells']
+        self.first_tick = meta['first_tick']
+        self.ticks = meta['ticks']
+
+        names = self.ARRAYS + (('cell_counts', 'cell_colors') if self.cells else ())
+        for name in names:
+            setattr(self, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r'))
+
+    def __len__(self):
+        return self.ticks
+
+    def wagon_order(self, tick):
+        """
+        Retorna las columnas de los vagones en el orden de los renderizadores: los de cada tren según su
+        lugar en el tren, y luego los de cada estación.
+        """
+        trains = self.wagon_trains[tick].astype(np.int64)
+        stations = self.wagon_stations[tick].astype(np.int64)
+        locations = np.where(trains >= 0, trains, self.number_of_trains + stations)
+        return np.lexsort((self.wagon_slots[tick], locations))
+
+    def frame(self, tick):
+        """
+        Retorna el estado del tick en el formato de SimulationRenderer.draw_frame: posiciones de los
+        trenes con vagones, posiciones, desplazamientos de etiqueta y pasajeros de los vagones, y
+        pasajeros en cada andén.
+        """
+        train_positions = self.train_positions[tick]
+        order = self.wagon_order(tick)
+        slots = self.wagon_slots[tick][order].astype(np.int64)
+        in_train = self.wagon_trains[tick][order] >= 0
+        return (
+            train_positions[~np.isnan(train_positions)].tolist(),
+            self.wagon_positions[tick][order].tolist(),
+            np.where(in_train, slots * 100, 0).tolist(),
+            self.wagon_passengers[tick][order].tolist(),
+            self.platform_passengers[tick].tolist(),
+        )
+
+    def wagons(self, tick):
+        """
+        Retorna el interior de los vagones del tick en el formato de TrainInteriorRenderer.draw_wagons:
+        por cada tren, la lista de tuplas (matriz de pasajeros, matriz de colores, título) de sus vagones.
+        Requiere una traza registrada con cells=True.
+        """
+        if not self.cells:
+            raise ValueError("La traza no tiene la ocupación por celda (regístrela con cells=True)")
+        from Renderer import TrainInteriorRenderer
+        trains = [[] for _ in range(self.number_of_trains)]
+        wagon_trains = self.wagon_trains[tick]
+        for column in self.wagon_order(tick):
+            train_index = wagon_trains[column]
+            if train_index < 0:
+                break
+            counts = np.array(self.cell_counts[tick, column], dtype=np.int64)
+            assigned = self.wagon_assigned[tick, column]
+            station_name = self.stations[assigned].name if assigned >= 0 else ""
+            trains[train_index].append((counts, np.array(self.cell_colors[tick, column], dtype=np.intp),
+                                        TrainInteriorRenderer.wagon_title(station_name, counts)))
+        return trains
+
+
+def load_trace(directory):
+    """Abre la traza registrada en directory (ver Trace)."""
+    return Trace(directory)
@@ -1,4 +1,6 @@
 import uuid
+from PassengerContainer import PassengerContainer
+from Trajectory import Trajectory
 
 class Train:
     """
@@ -19,28 +21,99 @@ class Train:
         self.headway = headway
         self.active = active
         self.train_id = self.generate_unique_id()
-        self.passengers = []
-        self.positions = []
+        self.passengers = PassengerContainer()
+        self.positions = Trajectory()
         self.cycles = 1
         self.acquired_wagons = 0
         self.passenger_per_meter = passenger_per_meter
+        self.front_slot = 0
+        self.station_index = {}
+        # MovementKernel que mueve a los pasajeros del tren (None: recorrido pasajero a pasajero)
+        self.movement_kernel = None
+        self.rebuild_station_index()
 
     def generate_unique_id(self):
         return str(uuid.uuid4())
 
+    # Wagon Composition
+    def rebuild_station_index(self):
+        """
+        Reconstruye el índice que asocia cada estación asignada con los vagones del tren
+        que la tienen, ordenados de adelante hacia atrás. Cada vagón guarda un slot
+        (train_slot) cuya diferencia con front_slot es su posición en el tren.
+        """
+        self.invalidate_movement()
+        self.front_slot = 0
+        self.station_index = {}
+        for i, wagon in enumerate(self.wagons):
+            wagon.train_slot = i
+            self.station_index.setdefault(wagon.assigned_station, []).append(wagon)
+
+    def pop_last_wagon(self):
+        """
+        Retira el último vagón del tren (desacople), lo elimina del índice de estaciones
+        y quita sus pasajeros de la lista de pasajeros del tren.
+        """
+        self.invalidate_movement()
+        wagon = self.wagons.pop()
+        for passenger in wagon.passengers:
+            self.passengers.remove(passenger)
+        wagons_for_station = self.station_index[wagon.assigned_station]
+        wagons_for_station.pop()
+        if not wagons_for_station:
+            del self.station_index[wagon.assigned_station]
+        wagon.train_slot = None
+        return wagon
+
+    def insert_first_wagon(self, wagon):
+        """Inserta un vagón al inicio del tren (acople) y lo registra en el índice de estaciones."""
+        self.invalidate_movement()
+        self.wagons.insert(0, wagon)
+        self.front_slot -= 1
+        wagon.train_slot = self.front_slot
+        self.station_index.setdefault(wagon.assigned_station, []).insert(0, wagon)
+
+    def sync_passengers(self):
+        """
+        Con el movimiento vectorizado, escribe en los vagones y pasajeros el estado que mantiene
+        MovementKernel (posiciones, matrices de ocupación, direcciones y metros movidos).
+        """
+        if self.movement_kernel is not None:
+            self.movement_kernel.sync(self)
+
+    def invalidate_movement(self):
+        """
+        Sincroniza los pasajeros del tren y marca su bloque de MovementKernel para reconstruirlo
+        antes de un cambio de composición (los bloques de los demás trenes se conservan).
+        """
+        if self.movement_kernel is not None:
+            self.movement_kernel.invalidate(self)
+
+    def has_wagon_for_station(self, station):
+        """Indica en O(1) si algún vagón del tren tiene asignada la estación dada."""
+        return station in self.station_index
+
+    def get_wagon_position_for_station(self, station):
+        """
+        Retorna la posición (índice en self.wagons) del primer vagón con la estación asignada,
+        o None si no hay ninguno.
+        """
+        wagons_for_station = self.station_index.get(station)
+        if not wagons_for_station:
+            return None
+        return wagons_for_station[0].train_slot - self.front_slot
+
     def move_passenger_right(self, wagon, passenger, row, col):
         """
         Mueve al pasajero una celda hacia la derecha si es posible.
         """
         next_col = col + 1
         if next_col < wagon.wagon_length_m and wagon.passenger_matrix[row][next_col] < self.passenger_per_meter:
-            wagon.passenger_matrix[row][col] -= 1
-            wagon.passenger_matrix[row][next_col] += 1
-            passenger.wagon_position = (row, next_col)
+            wagon.move_passenger(passenger, row, next_col)
             if row != wagon.wagon_width_m - 1:
                 passenger.move_count += 1
         else:
-            passenger.direction = 'left'
+            wagon.set_passenger_direction(passenger, 'left')
 
     def move_passenger_left(self, wagon, passenger, row, col):
         """
@@ -48,13 +121,11 @@ class Train:
         """
         prev_col = col - 1
         if prev_col >= 0 and wagon.passenger_matrix[row][prev_col] < self.passenger_per_meter:
-            wagon.passenger_matrix[row][col] -= 1
-            wagon.passenger_matrix[row][prev_col] += 1
-            passenger.wagon_position = (row, prev_col)
+            wagon.move_passenger(passenger, row, prev_col)
             if row != wagon.wagon_width_m - 1:
                 passenger.move_count += 1
         else:
-            passenger.direction = 'right'
+            wagon.set_passenger_direction(passenger, 'right')
 
     def move_passenger_down(self, wagon, passenger, row, col):
         """
@@ -62,9 +133,7 @@ class Train:
         """
         next_row = row + 1
         if next_row < wagon.wagon_width_m and wagon.passenger_matrix[next_row][col] < self.passenger_per_meter:
-            wagon.passenger_matrix[row][col] -= 1
-            wagon.passenger_matrix[next_row][col] += 1
-            passenger.wagon_position = (next_row, col)
+            wagon.move_passenger(passenger, next_row, col)
             passenger.move_count += 1
             return True
         return False
@@ -94,33 +163,18 @@ class Train:
         # Intentar moverse a la posición (row, 0) del siguiente vagón
         if next_wagon.passenger_matrix[row][0] < self.passenger_per_meter:
             # Movimiento exitoso a la primera columna del siguiente vagón
-            wagon.passenger_matrix[row][col] -= 1
-            next_wagon.passenger_matrix[row][0] += 1
-            passenger.wagon_position = (row, 0)
-            passenger.current_wagon = next_wagon
-            wagon.passengers.remove(passenger)
-            next_wagon.passengers.append(passenger)
+            wagon.transfer_passenger(passenger, next_wagon, row, 0)
             passenger.move_count += 1
         else:
             # Si no hay espacio en la posición (row, 0), intentar moverse hacia arriba (row-1)
             if row > 0 and next_wagon.passenger_matrix[row - 1][0] < self.passenger_per_meter:
                 # Movimiento exitoso hacia arriba
-                wagon.passenger_matrix[row][col] -= 1
-                next_wagon.passenger_matrix[row - 1][0] += 1
-                passenger.wagon_position = (row - 1, 0)
-                passenger.current_wagon = next_wagon
-                wagon.passengers.remove(passenger)
-                next_wagon.passengers.append(passenger)
+                wagon.transfer_passenger(passenger, next_wagon, row - 1, 0)
                 passenger.move_count += 1
             # Si no hay espacio arriba, intentar moverse hacia abajo (row+1)
             elif row < next_wagon.wagon_width_m - 1 and next_wagon.passenger_matrix[row + 1][0] < self.passenger_per_meter:
                 # Movimiento exitoso hacia abajo
-                wagon.passenger_matrix[row][col] -= 1
-                next_wagon.passenger_matrix[row + 1][0] += 1
-                passenger.wagon_position = (row + 1, 0)
-                passenger.current_wagon = next_wagon
-                wagon.passengers.remove(passenger)
-                next_wagon.passengers.append(passenger)
+                wagon.transfer_passenger(passenger, next_wagon, row + 1, 0)
                 passenger.move_count += 1
 
     def move_passenger_up_right_or_down_right(self, wagon, passenger, row, col):
@@ -132,21 +186,15 @@ class Train:
         if passenger.end_station != passenger.current_wagon.assigned_station:
             # Intentar mover en diagonal arriba a la derecha si hay espacio
             if row > 0 and col + 1 < wagon.wagon_length_m and wagon.passenger_matrix[row - 1][col + 1] < self.passenger_per_meter:
-                wagon.passenger_matrix[row][col] -= 1
-                wagon.passenger_matrix[row - 1][col + 1] += 1
-                passenger.wagon_position = (row - 1, col + 1)
+                wagon.move_passenger(passenger, row - 1, col + 1)
                 passenger.move_count += 1
             # Si no puede, intentar mover a la derecha
             elif col + 1 < wagon.wagon_length_m and wagon.passenger_matrix[row][col + 1] < self.passenger_per_meter:
-                wagon.passenger_matrix[row][col] -= 1
-                wagon.passenger_matrix[row][col + 1] += 1
-                passenger.wagon_position = (row, col + 1)
+                wagon.move_passenger(passenger, row, col + 1)
                 passenger.move_count += 1
             # Si no puede, intentar mover en diagonal abajo a la derecha
             elif row + 1 < wagon.wagon_width_m and col + 1 < wagon.wagon_length_m and wagon.passenger_matrix[row + 1][col + 1] < self.passenger_per_meter:
-                wagon.passenger_matrix[row][col] -= 1
-                wagon.passenger_matrix[row + 1][col + 1] += 1
-                passenger.wagon_position = (row + 1, col + 1)
+                wagon.move_passenger(passenger, row + 1, col + 1)
                 passenger.move_count += 1
 
     def move_passenger_left_if_no_wagon(self, wagon, passenger, row, col):
@@ -163,51 +211,37 @@ class Train:
         if row == 0:
             # Intentar mover en diagonal abajo a la izquierda
             if row < wagon.wagon_width_m - 1 and col > 0 and wagon.passenger_matrix[row + 1][col - 1] < self.passenger_per_meter:
-                wagon.passenger_matrix[row][col] -= 1
-                wagon.passenger_matrix[row + 1][col - 1] += 1
-                passenger.wagon_position = (row + 1, col - 1)
+                wagon.move_passenger(passenger, row + 1, col - 1)
                 passenger.move_count += 1
             # Si no puede moverse abajo a la izquierda, intentar moverse a la izquierda
             elif col > 0 and wagon.passenger_matrix[row][col - 1] < self.passenger_per_meter:
-                wagon.passenger_matrix[row][col] -= 1
-                wagon.passenger_matrix[row][col - 1] += 1
-                passenger.wagon_position = (row, col - 1)
+                wagon.move_passenger(passenger, row, col - 1)
                 passenger.move_count += 1
 
         # Si el pasajero está en la última fila (row n-1)
         elif row == wagon.wagon_width_m - 1:
             # Intentar mover en diagonal arriba a la izquierda
             if row > 0 and col > 0 and wagon.passenger_matrix[row - 1][col - 1] < self.passenger_per_meter:
-                wagon.passenger_matrix[row][col] -= 1
-                wagon.passenger_matrix[row - 1][col - 1] += 1
-                passenger.wagon_position = (row - 1, col - 1)
+                wagon.move_passenger(passenger, row - 1, col - 1)
                 passenger.move_count += 1
             # Si no puede moverse arriba a la izquierda, intentar moverse a la izquierda
             elif col > 0 and wagon.passenger_matrix[row][col - 1] < self.passenger_per_meter:
-                wagon.passenger_matrix[row][col] -= 1
-                wagon.passenger_matrix[row][col - 1] += 1
-                passenger.wagon_position = (row, col - 1)
+                wagon.move_passenger(passenger, row, col - 1)
                 passenger.move_count += 1
 
         # Si el pasajero está en una fila intermedia
         else:
             # Intentar moverse a la izquierda
             if col > 0 and wagon.passenger_matrix[row][col - 1] < self.passenger_per_meter:
-                wagon.passenger_matrix[row][col] -= 1
-                wagon.passenger_matrix[row][col - 1] += 1
-                passenger.wagon_position = (row, col - 1)
+                wagon.move_passenger(passenger, row, col - 1)
                 passenger.move_count += 1
             # Si no puede moverse a la izquierda, intentar moverse abajo a la izquierda
             elif row < wagon.wagon_width_m - 1 and col > 0 and wagon.passenger_matrix[row + 1][col - 1] < self.passenger_per_meter:
-                wagon.passenger_matrix[row][col] -= 1
-                wagon.passenger_matrix[row + 1][col - 1] += 1
-                passenger.wagon_position = (row + 1, col - 1)
+                wagon.move_passenger(passenger, row + 1, col - 1)
                 passenger.move_count += 1
             # Si no puede moverse abajo a la izquierda, intentar moverse arriba a la izquierda
             elif row > 0 and col > 0 and wagon.passenger_matrix[row - 1][col - 1] < self.passenger_per_meter:
-                wagon.passenger_matrix[row][col] -= 1
-                wagon.passenger_matrix[row - 1][col - 1] += 1
-                passenger.wagon_position = (row - 1, col - 1)
+                wagon.move_passenger(passenger, row - 1, col - 1)
                 passenger.move_count += 1
 
     def move_passenger_to_previous_wagon(self, wagon, passenger, row, col, prev_wagon):
@@ -219,33 +253,18 @@ class Train:
         # Intentar moverse a la última columna (row, última columna) del vagón anterior
         if prev_wagon.passenger_matrix[row][prev_wagon.wagon_length_m - 1] < self.passenger_per_meter:
             # Movimiento exitoso al último asiento del vagón anterior
-            wagon.passenger_matrix[row][col] -= 1
-            prev_wagon.passenger_matrix[row][prev_wagon.wagon_length_m - 1] += 1
-            passenger.wagon_position = (row, prev_wagon.wagon_length_m - 1)
-            passenger.current_wagon = prev_wagon
-            wagon.passengers.remove(passenger)
-            prev_wagon.passengers.append(passenger)
+            wagon.transfer_passenger(passenger, prev_wagon, row, prev_wagon.wagon_length_m - 1)
             passenger.move_count += 1
         else:
             # Si no hay espacio en la posición (row, última columna), intentar moverse hacia arriba (row-1)
             if row > 0 and prev_wagon.passenger_matrix[row - 1][prev_wagon.wagon_length_m - 1] < self.passenger_per_meter:
                 # Movimiento exitoso hacia arriba
-                wagon.passenger_matrix[row][col] -= 1
-                prev_wagon.passenger_matrix[row - 1][prev_wagon.wagon_length_m - 1] += 1
-                passenger.wagon_position = (row - 1, prev_wagon.wagon_length_m - 1)
-                passenger.current_wagon = prev_wagon
-                wagon.passengers.remove(passenger)
-                prev_wagon.passengers.append(passenger)
+                wagon.transfer_passenger(passenger, prev_wagon, row - 1, prev_wagon.wagon_length_m - 1)
                 passenger.move_count += 1
             # Si no hay espacio arriba, intentar moverse hacia abajo (row+1)
             elif row < prev_wagon.wagon_width_m - 1 and prev_wagon.passenger_matrix[row + 1][prev_wagon.wagon_length_m - 1] < self.passenger_per_meter:
                 # Movimiento exitoso hacia abajo
-                wagon.passenger_matrix[row][col] -= 1
-                prev_wagon.passenger_matrix[row + 1][prev_wagon.wagon_length_m - 1] += 1
-                passenger.wagon_position = (row + 1, prev_wagon.wagon_length_m - 1)
-                passenger.current_wagon = prev_wagon
-                wagon.passengers.remove(passenger)
-                prev_wagon.passengers.append(passenger)
+                wagon.transfer_passenger(passenger, prev_wagon, row + 1, prev_wagon.wagon_length_m - 1)
                 passenger.move_count += 1
 
     def handle_moving_passengers(self):
@@ -253,8 +272,14 @@ class Train:
         Gestiona el movimiento de los pasajeros dentro del tren.
         Si el vagón de destino está en el tren, el pasajero sigue moviéndose a la derecha.
         Si el vagón de destino no está en el tren, el pasajero cambia la dirección a la izquierda.
+        Si el tren tiene un MovementKernel, el paso lo calcula el núcleo para todos sus pasajeros a la vez
+        (si el núcleo es compartido, avanza a todos sus trenes).
         """
-        moved_passengers = []
+        if self.movement_kernel is not None:
+            self.movement_kernel.step()
+            return
+
+        moved_passengers = set()
 
         for wagon_number, wagon in enumerate(self.wagons):
             for passenger in list(wagon.passengers):
@@ -269,13 +294,11 @@ class Train:
                         continue
 
                     # Verificar si el vagón de destino está presente en el tren
-                    destination_wagon_present = any(
-                        w.assigned_station == passenger.end_station for w in self.wagons
-                    )
+                    destination_wagon_present = self.has_wagon_for_station(passenger.end_station)
 
                     # Cambiar la dirección a 'left' si el vagón de destino no está presente
                     if not destination_wagon_present and passenger.assigned_direction == False:
-                        passenger.direction = 'left'
+                        wagon.set_passenger_direction(passenger, 'left')
                     
                     # Manejar movimiento hacia la derecha
                     if passenger.direction == 'right':
@@ -287,7 +310,7 @@ class Train:
                             if wagon_number + 1 < len(self.wagons):
                                 next_wagon = self.wagons[wagon_number + 1]
                                 self.move_passenger_to_next_wagon(wagon, passenger, row, col, next_wagon)
-                                moved_passengers.append(passenger)
+                                moved_passengers.add(passenger)
                         passenger.assigned_direction = True
                     
                     # Manejar movimiento hacia la izquierda
@@ -297,9 +320,7 @@ class Train:
                             if wagon_number > 0:
                                 prev_wagon = self.wagons[wagon_number - 1]
                                 self.move_passenger_to_previous_wagon(wagon, passenger, row, col, prev_wagon)
-                                moved_passengers.append(passenger)
+                                moved_passengers.add(passenger)
                         else:
                             # Intentar mover en diagonal arriba a la izquierda, a la izquierda o abajo a la izquierda
-                            self.move_passenger_left_if_no_wagon(wagon, passenger, row, col)
-
-            wagon.update_color_matrix()
\ No newline at end of file
+                            self.move_passenger_left_if_no_wagon(wagon, passenger, row, col)
\ No newline at end of file
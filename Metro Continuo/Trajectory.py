@@ -0,0 +1,99 @@
+import os
+from collections import deque
+import numpy as np
+
+
+class Trajectory:
+    """
+    Historial acotado de posiciones de un tren o vagón. La lógica de la simulación solo lee las
+    últimas posiciones ([-1] y [-2]), por lo que se guardan en un buffer circular de tamaño fijo
+    y la memoria no crece con el tiempo de simulación. len() retorna el número total de posiciones
+    agregadas, igual que con la lista original. Opcionalmente, cada posición se envía a un
+    TrajectoryRecorder que guarda la historia completa.
+    """
+
+    def __init__(self, history=2):
+        """
+        Parámetros:
+            history: Número de posiciones recientes que se conservan.
+        """
+        self._buffer = deque(maxlen=history)
+        self.count = 0
+        self.recorder = None
+        self.column = None
+
+    def attach(self, recorder, column):
+        """Envía las posiciones siguientes a la columna dada del arreglo del recorder."""
+        self.recorder = recorder
+        self.column = column
+
+    def append(self, position):
+        """Agrega una posición al historial."""
+        self._buffer.append(position)
+        self.count += 1
+        if self.recorder is not None:
+            self.recorder.record(self.column, position)
+
+    def __getitem__(self, index):
+        return self._buffer[index]
+
+    def __setitem__(self, index, position):
+        self._buffer[index] = position
+        if self.recorder is not None and (index == -1 or index == len(self._buffer) - 1):
+            self.recorder.record(self.column, position)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self._buffer)
+
+
+class TrajectoryRecorder:
+    """
+    Registro opcional de la historia completa de posiciones en arreglos de NumPy preasignados
+    (tiempo x entidad), o en archivos .npy mapeados en memoria si se indica un directorio.
+    Cada entidad escribe en su columna y en la fila del tick actual; las celdas sin dato quedan en NaN.
+    """
+
+    def __init__(self, simulator_time, trains, wagons, directory=None):
+        """
+        Parámetros:
+            simulator_time: Número de ticks de la simulación (filas de los arreglos).
+            trains: Lista de trenes a registrar.
+            wagons: Lista de vagones a registrar.
+            directory: Directorio donde crear train_positions.npy y wagon_positions.npy como
+                memmap. Si es None, los arreglos se mantienen en memoria.
+        """
+        self.tick = 0
+        self.directory = directory
+        self.train_positions = self._allocate('train_positions', (simulator_time, len(trains)))
+        self.wagon_positions = self._allocate('wagon_positions', (simulator_time, len(wagons)))
+        self.wagon_ids = [wagon.wagon_id for wagon in wagons]
+
+        for column, train in enumerate(trains):
+            train.positions.attach(self, (self.train_positions, column))
+        for column, wagon in enumerate(wagons):
+            wagon.positions.attach(self, (self.wagon_positions, column))
+
+    def _allocate(self, name, shape):
+        """Crea un arreglo float32 lleno de NaN, en memoria o como memmap .npy."""
+        if self.directory is None:
+            array = np.empty(shape, dtype=np.float32)
+        else:
+            os.makedirs(self.directory, exist_ok=True)
+            array = np.lib.format.open_memmap(os.path.join(self.directory, f"{name}.npy"), mode='w+', dtype=np.float32, shape=shape)
+        array.fill(np.nan)
+        return array
+
+    def record(self, column, position):
+        """Escribe la posición en la fila del tick actual de la columna dada."""
+        array, index = column
+        if self.tick < array.shape[0]:
+            array[self.tick, index] = position
+
+    def flush(self):
+        """Escribe a disco los arreglos mapeados en memoria (no hace nada si están en memoria)."""
+        for array in (self.train_positions, self.wagon_positions):
+            if isinstance(array, np.memmap):
+                array.flush()
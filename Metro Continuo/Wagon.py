@@ -1,3 +1,6 @@
+from PassengerContainer import PassengerContainer
+from Trajectory import Trajectory
+
 class Wagon:
     """
     Clase que representa un vagón de tren, gestionando dimensiones, velocidad, pasajeros
@@ -6,24 +9,38 @@ class Wagon:
     
     wagon_counter = 0
 
+    # Categorías de pasajeros usadas por los contadores de color de cada celda
+    AT_DESTINATION = 0
+    MOVING_RIGHT = 1
+    MOVING_LEFT = 2
+
+    # Máximo de pasajeros por celda al ubicar a los pasajeros que abordan
+    boarding_cell_capacity = 4
+
     def __init__(self, wagon_length_m, wagon_width_m, speed, passenger_per_meter):
         """Inicializa una instancia de Wagon."""
         self.wagon_length_m = wagon_length_m
         self.wagon_width_m = wagon_width_m
         self.wagon_space_for_passenger = wagon_length_m * wagon_width_m * passenger_per_meter
         self.times = []
-        self.positions = []
+        self.positions = Trajectory()
         self.speed = speed
         self.waiting_time = 0
         self.waiting_time_list = []
         self.train_index = None
-        self.passengers = []
+        self.train_slot = None
+        self.current_station = None
+        self.station_slot = None
+        self.passengers = PassengerContainer()
         Wagon.wagon_counter += 1
+        self.wagon_number = Wagon.wagon_counter
         self.wagon_id = self.generate_wagon_name()
         self.state = 0
+        self._color_counts = None
         self.assigned_station = None
         self.passenger_matrix = self.initialize_passenger_matrix()
-        self.color_matrix = [[0 for _ in range(wagon_length_m)] for _ in range(wagon_width_m)]
+        self._front_free_cell = 0
+        self._back_free_cell = 0
         self.is_initial_wagon = False
 
     def initialize_passenger_matrix(self):
@@ -40,15 +57,137 @@ class Wagon:
         """Genera un identificador único para el vagón."""
         return f"Wagon{Wagon.wagon_counter}"
     
+    @property
+    def assigned_station(self):
+        """Estación asignada al vagón."""
+        return self._assigned_station
+
+    @assigned_station.setter
+    def assigned_station(self, station):
+        """
+        Cambia la estación asignada. Como la categoría de cada pasajero depende de ella,
+        los contadores de color (si están activos) se reconstruyen.
+        """
+        self._assigned_station = station
+        if self._color_counts is not None:
+            self._rebuild_color_counts()
+
     def add_passenger(self, passenger, row, col):
         """Agrega un pasajero al vagón y actualiza su posición."""
         self.passenger_matrix[row][col] += 1
         self.passengers.append(passenger)
         passenger.wagon_position = (row, col)
+        if self._color_counts is not None:
+            self._count_passenger(passenger, 1)
+
+    def replace_passengers(self, passengers):
+        """
+        Reemplaza los pasajeros del vagón por los dados (por ejemplo, los que permanecen
+        tras el descenso en una estación). Al igual que el descenso original, no modifica
+        la matriz de ocupación.
+        """
+        self.passengers.replace(passengers)
+        if self._color_counts is not None:
+            self._rebuild_color_counts()
+
+    def move_passenger(self, passenger, new_row, new_col):
+        """Mueve al pasajero a otra celda del mismo vagón."""
+        row, col = passenger.wagon_position
+        if self._color_counts is not None:
+            self._count_passenger(passenger, -1)
+        self.passenger_matrix[row][col] -= 1
+        self._release_cell(row, col)
+        self.passenger_matrix[new_row][new_col] += 1
+        passenger.wagon_position = (new_row, new_col)
+        if self._color_counts is not None:
+            self._count_passenger(passenger, 1)
+
+    def transfer_passenger(self, passenger, other_wagon, new_row, new_col):
+        """Traslada al pasajero a la celda (new_row, new_col) de otro vagón del tren."""
+        row, col = passenger.wagon_position
+        if self._color_counts is not None:
+            self._count_passenger(passenger, -1)
+        self.passenger_matrix[row][col] -= 1
+        self._release_cell(row, col)
+        self.passengers.remove(passenger)
+        passenger.current_wagon = other_wagon
+        other_wagon.add_passenger(passenger, new_row, new_col)
+
+    def set_passenger_direction(self, passenger, direction):
+        """Cambia la dirección de movimiento de un pasajero del vagón."""
+        if passenger.direction == direction:
+            return
+        if self._color_counts is None:
+            passenger.direction = direction
+            return
+        self._count_passenger(passenger, -1)
+        passenger.direction = direction
+        self._count_passenger(passenger, 1)
+
+    # Free Cells
+    def find_free_cell(self, from_back=False):
+        """
+        Retorna la primera celda (fila, columna) con menos de boarding_cell_capacity pasajeros,
+        recorriendo la matriz por filas desde la primera celda o, si from_back es True, desde la última.
+        Retorna None si todas las celdas están llenas.
+        Cada sentido mantiene un cursor: todas las celdas anteriores a él están llenas, de modo que la
+        búsqueda continúa donde terminó la anterior y el costo no crece a medida que el vagón se llena.
+        """
+        matrix = self.passenger_matrix
+        num_columns = len(matrix[0])
+        total_cells = len(matrix) * num_columns
+        capacity = self.boarding_cell_capacity
+        cursor = self._back_free_cell if from_back else self._front_free_cell
+        while cursor < total_cells:
+            cell = total_cells - 1 - cursor if from_back else cursor
+            row, col = divmod(cell, num_columns)
+            if matrix[row][col] < capacity:
+                break
+            cursor += 1
+
+        if from_back:
+            self._back_free_cell = cursor
+        else:
+            self._front_free_cell = cursor
+        if cursor == total_cells:
+            return None
+        return row, col
+
+    def _release_cell(self, row, col):
+        """Retrocede los cursores de find_free_cell si la celda dada volvió a tener espacio."""
+        if self.passenger_matrix[row][col] < self.boarding_cell_capacity:
+            num_columns = len(self.passenger_matrix[0])
+            cell = row * num_columns + col
+            if cell < self._front_free_cell:
+                self._front_free_cell = cell
+            cell = len(self.passenger_matrix) * num_columns - 1 - cell
+            if cell < self._back_free_cell:
+                self._back_free_cell = cell
 
-    def _determine_cell_color(self, passengers_in_cell):
+    # Color Matrix
+    def _passenger_category(self, passenger):
+        """Clasifica al pasajero según su destino y su dirección para los contadores de color."""
+        if passenger.end_station == self._assigned_station:
+            return Wagon.AT_DESTINATION
+        if passenger.direction == 'right':
+            return Wagon.MOVING_RIGHT
+        return Wagon.MOVING_LEFT
+
+    def _count_passenger(self, passenger, delta):
+        """Suma delta al contador de la categoría del pasajero en su celda actual."""
+        row, col = passenger.wagon_position
+        self._color_counts[row][col][self._passenger_category(passenger)] += delta
+
+    def _rebuild_color_counts(self):
+        """Recalcula desde cero los contadores por celda a partir de los pasajeros del vagón."""
+        self._color_counts = [[[0, 0, 0] for _ in range(self.wagon_length_m)] for _ in range(self.wagon_width_m)]
+        for passenger in self.passengers:
+            self._count_passenger(passenger, 1)
+
+    @staticmethod
+    def _determine_cell_color(counts):
         """
-        Determina el color de una celda basado en los pasajeros presentes.
+        Determina el color de una celda a partir de sus contadores por categoría.
         Retorna:
             0 si la celda está vacía,
             1 si todos tienen la estación destino igual a la asignada,
@@ -56,20 +195,42 @@ class Wagon:
             3 si todos se mueven a la izquierda sin tener la estación asignada,
             4 en otros casos.
         """
-        if not passengers_in_cell:
+        total = counts[0] + counts[1] + counts[2]
+        if total == 0:
             return 0
-        if all(p.end_station == p.current_wagon.assigned_station for p in passengers_in_cell):
+        if counts[Wagon.AT_DESTINATION] == total:
             return 1
-        elif all(p.direction == 'right' and p.end_station != p.current_wagon.assigned_station for p in passengers_in_cell):
+        elif counts[Wagon.MOVING_RIGHT] == total:
             return 2
-        elif all(p.direction == 'left' and p.end_station != p.current_wagon.assigned_station for p in passengers_in_cell):
+        elif counts[Wagon.MOVING_LEFT] == total:
             return 3
         else:
             return 4
 
     def update_color_matrix(self):
-        """Actualiza la matriz de colores según la distribución de pasajeros."""
-        for row in range(self.wagon_width_m):
-            for col in range(self.wagon_length_m):
-                passengers_in_cell = [p for p in self.passengers if p.wagon_position == (row, col)]
-                self.color_matrix[row][col] = self._determine_cell_color(passengers_in_cell)
\ No newline at end of file
+        """
+        Activa los contadores de color del vagón reconstruyéndolos desde cero.
+        A partir de ese momento se mantienen de forma incremental en cada movimiento.
+        """
+        self._rebuild_color_counts()
+
+    @property
+    def color_counts(self):
+        """
+        Contadores por celda de pasajeros en cada categoría (AT_DESTINATION, MOVING_RIGHT, MOVING_LEFT),
+        de los que se deriva color_matrix. Igual que color_matrix, la primera lectura los activa.
+        """
+        if self._color_counts is None:
+            self._rebuild_color_counts()
+        return self._color_counts
+
+    @property
+    def color_matrix(self):
+        """
+        Matriz de colores según la distribución de pasajeros. Solo se calcula cuando
+        un renderizador la solicita: la primera lectura activa los contadores por celda,
+        que luego se actualizan incrementalmente en los métodos de movimiento.
+        """
+        if self._color_counts is None:
+            self._rebuild_color_counts()
+        return [[self._determine_cell_color(counts) for counts in row] for row in self._color_counts]